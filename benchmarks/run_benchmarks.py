@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+
+import argparse
+import json
+import logging
+import os
+import statistics
+import tempfile
+import time
+
+from benchmarks.stub_llm import StubLLMServer
+from benchmarks.synthetic import generate_screencast
+from frameflow import processor
+from frameflow.decoder import DECODERS
+from frameflow.local_llm_client import LocalLLMClient
+from frameflow.logging_config import setup_logging
+from frameflow.ocr import OCREngine
+from frameflow import transcription
+
+logger = logging.getLogger("frameflow.benchmarks")
+
+
+class StubTranscriber:
+    # Stand-in for Whisper when no model is cached locally: one segment per 5 s of audio.
+    # Audio is still decoded, so the stage keeps its ffmpeg cost.
+    def __init__(self, model_name, device=None, compute_type=None):
+        self.model_name = model_name
+
+    def transcribe(self, audio):
+        seconds = len(audio) / transcription.SAMPLE_RATE
+        return [
+            {"start": float(start), "end": float(min(start + 5, seconds)), "text": f" Narration at {start} seconds."}
+            for start in range(0, int(seconds), 5)
+        ]
+
+
+transcription.BACKENDS.setdefault("stub", StubTranscriber)
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return result, time.perf_counter() - start
+
+
+def bench_extract(video, work_dir, fps, decoder="opencv", keyframes_only=False):
+    frames, elapsed = timed(processor.extract_frames, video["path"], os.path.join(work_dir, "frames"), fps,
+                            decoder=decoder, keyframes_only=keyframes_only)
+    return frames, {
+        "seconds": elapsed,
+        "source_frames_per_s": video["frames"] / elapsed,
+        "kept_frames": len(frames),
+    }
+
+
+def bench_ocr(frames, workers, incremental=False):
+    with OCREngine(workers, incremental=incremental) as engine:
+        # Start the worker processes before timing so pages/s reflects steady state
+        list(engine.map(frame.path for frame in frames[:engine.workers]))
+        texts, elapsed = timed(lambda: [text for _, text in engine.map(frame.path for frame in frames)])
+    return texts, {
+        "seconds": elapsed,
+        "pages_per_s": len(texts) / elapsed if elapsed else 0.0,
+        "workers": engine.workers,
+        "incremental": incremental,
+        "empty_pages": sum(1 for text in texts if not text),
+    }
+
+
+def bench_transcription(video, model_name, backend, workers=1):
+    segments, elapsed = timed(processor.transcribe_segments, video["path"], model_name, backend, workers=workers)
+    return segments, {
+        "seconds": elapsed,
+        "real_time_factor": elapsed / video["duration"],
+        "segments": len(segments),
+        "workers": workers,
+    }
+
+
+def bench_summarization(endpoint, chunks, concurrency):
+    client = LocalLLMClient(endpoint=endpoint)
+    latencies = []
+    complete = client.complete
+
+    def timed_complete(prompt):
+        start = time.perf_counter()
+        try:
+            return complete(prompt)
+        finally:
+            latencies.append(time.perf_counter() - start)
+
+    client.complete = timed_complete
+    _, elapsed = timed(lambda: list(client.summarize_chunks(chunks, concurrency)))
+    return {
+        "seconds": elapsed,
+        "requests": len(chunks),
+        "requests_per_s": len(chunks) / elapsed if elapsed else 0.0,
+        "latency_p50_s": statistics.median(latencies) if latencies else 0.0,
+        "latency_max_s": max(latencies) if latencies else 0.0,
+        "concurrency": concurrency,
+    }
+
+
+def bench_end_to_end(video, work_dir, endpoint, args):
+    output = os.path.join(work_dir, "howto.md")
+    _, elapsed = timed(
+        processor.process_video, video["path"], output, args.fps, args.whisper_model, False, False,
+        "local", None, None, ocr_workers=args.ocr_workers, llm_concurrency=args.llm_concurrency,
+        cache_dir=None, transcription_backend=args.transcription_backend, work_dir=work_dir,
+        decoder=args.decoder, keyframes_only=args.keyframes_only, client=LocalLLMClient(endpoint=endpoint),
+    )
+    return {"seconds": elapsed, "real_time_factor": elapsed / video["duration"]}
+
+
+def run_stage(report, name, fn, *args):
+    logger.info(f"Benchmarking {name}...")
+    try:
+        return fn(*args)
+    except Exception as e:
+        logger.error(f"Stage {name} failed: {e}")
+        report[name] = {"error": str(e)}
+        return None
+
+
+def print_report(report):
+    print(f"\n{'stage':<16} {'seconds':>9}  metrics")
+    for stage, metrics in report.items():
+        if stage == "video":
+            continue
+        seconds = metrics.get("seconds")
+        seconds = f"{seconds:9.2f}" if seconds is not None else f"{'-':>9}"
+        extra = ", ".join(
+            f"{key}={value:.3f}" if isinstance(value, float) else f"{key}={value}"
+            for key, value in metrics.items() if key != "seconds"
+        )
+        print(f"{stage:<16} {seconds}  {extra}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline FrameFlow throughput benchmarks on a synthetic screencast.")
+    parser.add_argument("--duration", type=float, default=60.0, help="Synthetic video length in seconds (default: 60)")
+    parser.add_argument("--scene-seconds", type=float, default=5.0, help="Seconds between scene changes (default: 5)")
+    parser.add_argument("--video-fps", type=int, default=10, help="Synthetic video frame rate (default: 10)")
+    parser.add_argument("--fps", type=float, default=None, help="Extraction FPS passed to FrameFlow (default: scene change)")
+    parser.add_argument("--decoder", default="opencv", choices=DECODERS, help="Frame decoder (default: opencv)")
+    parser.add_argument("--keyframes-only", action="store_true", help="ffmpeg decoder: decode only keyframes")
+    parser.add_argument("--ocr-workers", type=int, default=None, help="OCR worker processes (default: CPU count)")
+    parser.add_argument("--ocr-incremental", action="store_true", help="Benchmark incremental region OCR")
+    parser.add_argument("--whisper-model", default="tiny", help="Whisper model for the transcription stage (default: tiny)")
+    parser.add_argument("--transcription-backend", default="stub", help="Transcription backend; 'whisper' downloads its model on first use (default: stub, no model)")
+    parser.add_argument("--transcription-workers", type=int, default=1, help="Parallel chunked transcription workers (default: 1)")
+    parser.add_argument("--skip-transcription", action="store_true", help="Skip the transcription and end-to-end stages")
+    parser.add_argument("--llm-latency", type=float, default=0.05, help="Stub LLM response latency in seconds (default: 0.05)")
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="Concurrent summarization requests (default: 4)")
+    parser.add_argument("--json", default=None, help="Also write the report to this JSON file")
+    parser.add_argument("--log-level", default="WARNING", help="Log level (default: WARNING)")
+    args = parser.parse_args()
+
+    setup_logging(level=getattr(logging, args.log_level.upper(), logging.WARNING))
+    report = {}
+
+    with tempfile.TemporaryDirectory(prefix="frameflow-bench-") as work_dir, \
+            StubLLMServer(latency=args.llm_latency) as stub:
+        video = generate_screencast(
+            os.path.join(work_dir, "synthetic.mp4"), args.duration, args.video_fps, args.scene_seconds
+        )
+        report["video"] = video
+
+        result = run_stage(report, "extract_frames", bench_extract, video, work_dir, args.fps, args.decoder,
+                           args.keyframes_only)
+        frames = []
+        if result:
+            frames, report["extract_frames"] = result
+
+        result = run_stage(report, "ocr", bench_ocr, frames, args.ocr_workers, args.ocr_incremental)
+        texts = [""] * len(frames)
+        if result:
+            texts, report["ocr"] = result
+
+        if not args.skip_transcription:
+            result = run_stage(report, "transcription", bench_transcription, video, args.whisper_model,
+                               args.transcription_backend, args.transcription_workers)
+            if result:
+                report["transcription"] = result[1]
+
+        chunks = [f"OCR Text:\n{text}\n\nTranscript:\n\n\n" for text in texts] or ["OCR Text:\n\n"]
+        result = run_stage(report, "summarization", bench_summarization, stub.endpoint, chunks, args.llm_concurrency)
+        if result:
+            report["summarization"] = result
+
+        if not args.skip_transcription:
+            e2e_dir = os.path.join(work_dir, "e2e")
+            os.makedirs(e2e_dir)
+            result = run_stage(report, "end_to_end", bench_end_to_end, video, e2e_dir, stub.endpoint, args)
+            if result:
+                report["end_to_end"] = result
+
+    print_report(report)
+    if args.json:
+        os.makedirs(os.path.dirname(os.path.abspath(args.json)), exist_ok=True)
+        with open(args.json, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nReport written to {args.json}")
+
+
+if __name__ == "__main__":
+    main()
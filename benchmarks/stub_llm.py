@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+def _summary(prompt):
+    return f"Step summary ({len(prompt)} chars in)."
+
+
+class StubLLMServer:
+    # OpenAI-compatible /v1/chat/completions endpoint (optionally streamed) and a
+    # /v1/completions endpoint taking a list of prompts, with a fixed artificial latency
+    # per request, so summarization can be benchmarked offline and without API keys.
+    def __init__(self, latency=0.05, host="127.0.0.1", port=0):
+        self.latency = latency
+        self.requests = 0
+        self.connections = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                stub.connections += 1
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+                stub.requests += 1
+                time.sleep(stub.latency)
+                if self.path.endswith("/chat/completions"):
+                    prompt = body.get("messages", [{}])[-1].get("content", "")
+                    if body.get("stream"):
+                        self.send_stream(_summary(prompt))
+                        return
+                    choices = [{"index": 0, "message": {"role": "assistant", "content": _summary(prompt)}}]
+                    prompts = [prompt]
+                else:
+                    prompts = body.get("prompt", [])
+                    prompts = [prompts] if isinstance(prompts, str) else prompts
+                    choices = [{"index": i, "text": _summary(prompt)} for i, prompt in enumerate(prompts)]
+                self.send_json({
+                    "choices": choices,
+                    "usage": {"prompt_tokens": sum(len(p) for p in prompts) // 4, "completion_tokens": 8 * len(prompts)},
+                })
+
+            def send_json(self, body):
+                payload = json.dumps(body).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def send_stream(self, text):
+                events = [{"choices": [{"index": 0, "delta": {"content": word}}]} for word in text.split(" ")]
+                for event in events[1:]:
+                    event["choices"][0]["delta"]["content"] = " " + event["choices"][0]["delta"]["content"]
+                events.append({"choices": [], "usage": {"prompt_tokens": 1, "completion_tokens": len(events)}})
+                payload = "".join(f"data: {json.dumps(event)}\n\n" for event in events) + "data: [DONE]\n\n"
+                payload = payload.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), Handler)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def endpoint(self):
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}/v1/chat/completions"
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
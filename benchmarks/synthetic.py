@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+
+import logging
+import os
+import random
+import shutil
+import subprocess
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+COMMANDS = [
+    "sudo apt-get install build-essential",
+    "git clone https://github.com/example/project.git",
+    "cd project && make install",
+    "python -m venv venv && source venv/bin/activate",
+    "pip install -r requirements.txt",
+    "docker build -t project .",
+    "kubectl apply -f deployment.yaml",
+    "pytest -q tests/",
+]
+
+
+def render_scene(scene_index, width, height, rng, typed_chars=None):
+    # Terminal-like screen: dark background, a title bar and a growing list of commands
+    frame = np.full((height, width, 3), (30, 30, 30), dtype=np.uint8)
+    cv2.rectangle(frame, (0, 0), (width, 36), (70, 70, 70), -1)
+    cv2.putText(frame, f"Terminal - step {scene_index + 1}", (12, 25), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (220, 220, 220), 1)
+    lines = [COMMANDS[(scene_index + i) % len(COMMANDS)] for i in range(1 + scene_index % 4)]
+    for row, line in enumerate(lines):
+        text = f"$ {line}"
+        if typed_chars is not None and row == len(lines) - 1:
+            text = text[:typed_chars]
+        cv2.putText(frame, text, (16, 80 + 34 * row), cv2.FONT_HERSHEY_SIMPLEX, 0.8, (80, 230, 80), 2)
+    # Small random widget so scenes differ in layout, not only in text
+    x, y = rng.randint(width // 2, width - 120), rng.randint(height // 2, height - 80)
+    cv2.rectangle(frame, (x, y), (x + 100, y + 60), (rng.randint(60, 255), 120, 200), -1)
+    return frame
+
+
+def generate_screencast(path, duration=60.0, fps=10, scene_seconds=5.0, size=(1280, 720), with_audio=True, seed=0):
+    width, height = size
+    rng = random.Random(seed)
+    total_frames = int(duration * fps)
+    frames_per_scene = max(1, int(scene_seconds * fps))
+    silent_path = path if not with_audio else path + ".video.mp4"
+
+    writer = cv2.VideoWriter(silent_path, cv2.VideoWriter_fourcc(*"mp4v"), fps, (width, height))
+    scene = None
+    for index in range(total_frames):
+        scene_index, offset = divmod(index, frames_per_scene)
+        if offset == 0:
+            scene = render_scene(scene_index, width, height, rng)
+        frame = scene
+        # The first second of each scene "types" the last command, like a real screencast
+        if offset < fps:
+            frame = render_scene(scene_index, width, height, random.Random(seed + scene_index), typed_chars=2 + offset * 4)
+        writer.write(frame)
+    writer.release()
+
+    if with_audio:
+        if shutil.which("ffmpeg") is None:
+            logger.warning("ffmpeg not found; synthetic video has no audio track")
+            os.replace(silent_path, path)
+        else:
+            # A tone track gives the transcription stage a realistic amount of audio to decode
+            subprocess.run([
+                "ffmpeg", "-y", "-loglevel", "error", "-i", silent_path,
+                "-f", "lavfi", "-i", f"sine=frequency=440:duration={duration}",
+                "-c:v", "copy", "-c:a", "aac", "-shortest", path,
+            ], check=True)
+            os.remove(silent_path)
+
+    logger.info(f"Generated {duration:.0f}s synthetic screencast with {total_frames // frames_per_scene} scenes: {path}")
+    return {"path": path, "duration": duration, "frames": total_frames, "scenes": -(-total_frames // frames_per_scene)}
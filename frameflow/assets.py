@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import cv2
+
+from frameflow.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ASSET_FORMAT = "webp"
+DEFAULT_ASSET_QUALITY = 80
+ASSET_WRITERS = 4
+
+
+def encoding_for(image_format, quality):
+    # File extension and cv2.imencode parameters; quality (0-100) does not apply to PNG
+    if image_format == "webp":
+        return ".webp", [cv2.IMWRITE_WEBP_QUALITY, quality]
+    if image_format == "jpeg":
+        return ".jpg", [cv2.IMWRITE_JPEG_QUALITY, quality, cv2.IMWRITE_JPEG_OPTIMIZE, 1]
+    if image_format == "png":
+        return ".png", [cv2.IMWRITE_PNG_COMPRESSION, 9]
+    raise ValueError(f"Unknown asset format: {image_format}")
+
+
+def downscale(image, max_width):
+    height, width = image.shape[:2]
+    if not max_width or width <= max_width:
+        return image
+    return cv2.resize(image, (max_width, max(1, round(height * max_width / width))), interpolation=cv2.INTER_AREA)
+
+
+class AssetWriter:
+    # The images the document links to. A frame is only converted once a step references
+    # it, so frames merged away or never shown cost nothing; conversion (downscale,
+    # re-encode, thumbnail) runs on a thread pool while later steps are still summarized.
+    def __init__(self, assets_dir, link, image_format=DEFAULT_ASSET_FORMAT, quality=DEFAULT_ASSET_QUALITY,
+                 max_width=None, thumbnail_width=None, workers=ASSET_WRITERS):
+        self.assets_dir = assets_dir
+        self.link = link
+        self.extension, self.params = encoding_for(image_format, quality)
+        self.max_width = max_width
+        self.thumbnail_width = thumbnail_width
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="assets")
+        self.futures = {}
+        os.makedirs(assets_dir, exist_ok=True)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def name_of(self, frame_name, suffix=""):
+        return os.path.splitext(frame_name)[0] + suffix + self.extension
+
+    def add(self, frame):
+        # Returns the frame's Markdown right away; the image is written in the background
+        if frame.name not in self.futures:
+            self.futures[frame.name] = self.executor.submit(self.write, frame.path, frame.name)
+        image = f"{self.link}/{self.name_of(frame.name)}"
+        if not self.thumbnail_width:
+            return f"![{frame.name}]({image})"
+        # The thumbnail is shown inline and links to the full image
+        return f"[![{frame.name}]({self.link}/{self.name_of(frame.name, '_thumb')})]({image})"
+
+    def write(self, path, frame_name):
+        with metrics.timer("asset_write", items=1) as timer:
+            image = cv2.imread(path)
+            if image is None:
+                raise ValueError(f"Could not read frame {path}")
+            size = self.encode(downscale(image, self.max_width), self.name_of(frame_name))
+            if self.thumbnail_width:
+                size += self.encode(downscale(image, self.thumbnail_width), self.name_of(frame_name, "_thumb"))
+            timer.add(bytes=size)
+        return size
+
+    def encode(self, image, name):
+        ok, encoded = cv2.imencode(self.extension, image, self.params)
+        if not ok:
+            raise ValueError(f"Could not encode {name}")
+        with open(os.path.join(self.assets_dir, name), "wb") as f:
+            f.write(encoded.tobytes())
+        return encoded.size
+
+    def close(self):
+        # Waits for every image; one that fails leaves a broken link but not a failed run
+        self.executor.shutdown(wait=True)
+        total = 0
+        failed = 0
+        for name, future in self.futures.items():
+            if future.exception() is not None:
+                failed += 1
+                logger.error(f"❌ Could not write asset for {name}: {future.exception()}")
+            else:
+                total += future.result()
+        if failed:
+            metrics.increment("assets_failed", failed)
+        logger.info(f"Wrote {len(self.futures) - failed} images ({total / 1024 / 1024:.1f} MB) to {self.assets_dir}")
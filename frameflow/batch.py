@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from frameflow.cache import DEFAULT_CACHE_MAX_MB, Cache
+from frameflow.metrics import metrics
+from frameflow.ocr import OCREngine
+from frameflow.processor import build_client, process_video
+
+logger = logging.getLogger(__name__)
+
+VIDEO_EXTENSIONS = (".mp4", ".mkv", ".mov", ".webm", ".avi", ".m4v")
+
+
+def discover_jobs(source):
+    # A directory is scanned for videos. A manifest lists one video path per line, or
+    # JSON objects with "input" and an optional "output" per line (.jsonl).
+    # Relative manifest paths are resolved against the manifest's directory. A single
+    # video is a one-job batch.
+    if source.lower().endswith(VIDEO_EXTENSIONS):
+        return [{"input": source}]
+    if os.path.isdir(source):
+        return [
+            {"input": os.path.join(source, name)}
+            for name in sorted(os.listdir(source))
+            if name.lower().endswith(VIDEO_EXTENSIONS)
+        ]
+
+    base_dir = os.path.dirname(os.path.abspath(source))
+    jobs = []
+    with open(source, "r") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            job = json.loads(line) if line.startswith("{") else {"input": line}
+            job["input"] = os.path.join(base_dir, job["input"])
+            if job.get("output"):
+                job["output"] = os.path.join(base_dir, job["output"])
+            jobs.append(job)
+    return jobs
+
+
+def job_work_dir(output_dir, input_file):
+    # Unique per source path, so identically named videos from different folders never collide
+    stem = os.path.splitext(os.path.basename(input_file))[0]
+    digest = hashlib.sha256(os.path.abspath(input_file).encode("utf-8")).hexdigest()[:8]
+    return os.path.join(output_dir, f"{stem}-{digest}")
+
+
+def _run_job(*args, **kwargs):
+    # Runs on a batch thread, which the main-thread profiler does not see
+    with metrics.profiled("batch-job"):
+        return process_video(*args, **kwargs)
+
+
+def run_batch(source, output_dir, jobs=2, client_name="openai", client_token=None, client_model=None,
+              llm_retries=5, requests_per_minute=None, tokens_per_minute=None, ocr_workers=None,
+              ocr_grayscale=False, ocr_scale=1.0, ocr_binarize=False, ocr_incremental=False, cache_dir=None,
+              cache_max_mb=DEFAULT_CACHE_MAX_MB, client_options=None, **options):
+    batch_jobs = discover_jobs(source)
+    logger.info(f"Batch: {len(batch_jobs)} videos from {source}, {jobs} concurrent jobs")
+    os.makedirs(output_dir, exist_ok=True)
+
+    # Shared across every job: one LLM client (and so one rate limiter), one OCR process
+    # pool sized to the machine, and the Whisper model, which transcription keeps loaded
+    # process-wide after the first job.
+    # The cache is evicted before and after the batch, never while jobs read from it.
+    cache = Cache(cache_dir, cache_max_mb * 1024 * 1024) if cache_dir else None
+    if cache is not None:
+        cache.evict()
+    client = build_client(client_name, client_token, client_model, llm_retries, requests_per_minute,
+                          tokens_per_minute, client_options)
+    client.cache = cache
+
+    results = {}
+    with OCREngine(ocr_workers, ocr_grayscale, ocr_scale, ocr_binarize, cache, ocr_incremental) as engine, \
+            ThreadPoolExecutor(max_workers=jobs, thread_name_prefix="batch") as executor:
+        futures = {}
+        for job in batch_jobs:
+            work_dir = job_work_dir(output_dir, job["input"])
+            os.makedirs(work_dir, exist_ok=True)
+            output = job.get("output") or os.path.join(work_dir, "howto.md")
+            future = executor.submit(
+                _run_job, job["input"], output,
+                client_name=client_name, client_token=client_token, client_model=client_model,
+                cache_dir=cache_dir, cache_max_mb=cache_max_mb, work_dir=work_dir,
+                client=client, ocr_engine=engine, cache=cache, **options
+            )
+            futures[future] = job["input"]
+
+        for future in as_completed(futures):
+            input_file = futures[future]
+            try:
+                future.result()
+                results[input_file] = None
+                logger.info(f"✅ Finished {input_file}")
+            except Exception as e:
+                results[input_file] = e
+                logger.error(f"❌ Failed {input_file}: {e}")
+
+    if cache is not None:
+        cache.evict()
+    failed = [path for path, error in results.items() if error is not None]
+    logger.info(f"Batch complete: {len(results) - len(failed)} succeeded, {len(failed)} failed")
+    return results
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+
+import hashlib
+import json
+import logging
+import os
+import shutil
+import tempfile
+
+from frameflow.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "frameflow")
+DEFAULT_CACHE_MAX_MB = 5000
+
+
+def hash_bytes(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def hash_file(path, chunk_size=1 << 20):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(chunk_size), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def cache_key(*parts):
+    return hash_bytes(json.dumps(parts, sort_keys=True, default=str).encode("utf-8"))
+
+
+def _entry_size(path):
+    if os.path.isfile(path):
+        return os.path.getsize(path)
+    total = 0
+    for dirpath, _, filenames in os.walk(path):
+        for filename in filenames:
+            total += os.path.getsize(os.path.join(dirpath, filename))
+    return total
+
+
+class Cache:
+    # Content-addressed store: <root>/<namespace>/<key[:2]>/<key>. An entry is a JSON
+    # file or a directory, published with an atomic rename so an interrupted run never
+    # leaves a half-written entry behind. Access refreshes mtime, which drives LRU eviction.
+    def __init__(self, root=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_CACHE_MAX_MB * 1024 * 1024):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+        logger.info(f"Cache directory: {root} (limit {max_bytes // (1024 * 1024)} MB)")
+
+    def entry_path(self, namespace, key):
+        return os.path.join(self.root, namespace, key[:2], key)
+
+    def _touch(self, path):
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def _publish(self, tmp_path, path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        if os.path.isdir(path):
+            shutil.rmtree(path, ignore_errors=True)
+        os.replace(tmp_path, path)
+
+    def get_json(self, namespace, key):
+        path = self.entry_path(namespace, key)
+        try:
+            with open(path, "r") as f:
+                value = json.load(f)
+        except (OSError, ValueError):
+            metrics.increment("cache_misses", namespace=namespace)
+            return None
+        metrics.increment("cache_hits", namespace=namespace)
+        self._touch(path)
+        return value
+
+    def put_json(self, namespace, key, value):
+        path = self.entry_path(namespace, key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(value, f)
+        self._publish(tmp_path, path)
+
+    def get_dir(self, namespace, key):
+        path = self.entry_path(namespace, key)
+        if not os.path.isdir(path):
+            metrics.increment("cache_misses", namespace=namespace)
+            return None
+        metrics.increment("cache_hits", namespace=namespace)
+        self._touch(path)
+        return path
+
+    def new_dir(self, namespace):
+        # Scratch directory on the cache filesystem, later published with put_dir
+        staging = os.path.join(self.root, namespace, "tmp")
+        os.makedirs(staging, exist_ok=True)
+        return tempfile.mkdtemp(dir=staging)
+
+    def put_dir(self, namespace, key, tmp_dir):
+        path = self.entry_path(namespace, key)
+        self._publish(tmp_dir, path)
+        return path
+
+    def file_digest(self, path):
+        # Hashing a multi-GB video takes seconds, so digests are memoized by path, size and mtime
+        stat = os.stat(path)
+        stat_key = cache_key("digest", os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+        digest = self.get_json("digests", stat_key)
+        if digest is None:
+            digest = hash_file(path)
+            self.put_json("digests", stat_key, digest)
+        return digest
+
+    def evict(self):
+        entries = []
+        total = 0
+        for namespace in os.listdir(self.root):
+            namespace_dir = os.path.join(self.root, namespace)
+            if not os.path.isdir(namespace_dir):
+                continue
+            for shard in os.listdir(namespace_dir):
+                shard_dir = os.path.join(namespace_dir, shard)
+                if shard == "tmp" or not os.path.isdir(shard_dir):
+                    continue
+                for name in os.listdir(shard_dir):
+                    path = os.path.join(shard_dir, name)
+                    try:
+                        size = _entry_size(path)
+                        entries.append((os.path.getmtime(path), size, path))
+                    except OSError:
+                        # Removed concurrently by another run sharing the cache
+                        continue
+                    total += size
+
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+            else:
+                try:
+                    os.remove(path)
+                except FileNotFoundError:
+                    pass
+            total -= size
+            removed += 1
+        if removed:
+            logger.info(f"Evicted {removed} cache entries; cache now {total // (1024 * 1024)} MB")
+        return removed
@@ -2,12 +2,17 @@
 
 import logging
 from anthropic import Anthropic
+from anthropic import APIConnectionError, InternalServerError, RateLimitError
 from frameflow.client import BaseClient
 
 logger = logging.getLogger(__name__)
 
 class ClaudeClient(BaseClient):
-    def __init__(self, api_key=None, model="claude-3-opus-20240229"):
+    retryable_errors = (RateLimitError, APIConnectionError, InternalServerError)
+    # 200k context, less max_tokens for the answer
+    max_prompt_tokens = 190000
+
+    def __init__(self, api_key=None, model="claude-3-opus-20240229", stream=False):
         logger.info("Initializing Claude client")
         if api_key:
             self.client = Anthropic(api_key=api_key)
@@ -16,19 +21,29 @@ class ClaudeClient(BaseClient):
             self.client = Anthropic()
             logger.debug("Claude client initialized using environment variable.")
         self.model = model
+        self.stream = stream
         logger.info(f"Using Claude model: {model}")
 
-    def summarize_chunk(self, chunk_text):
-        logger.debug("Summarizing chunk with Claude.")
-        prompt = f"Summarize this chunk:\n\n{chunk_text}"
+    def complete(self, prompt):
         response = self.client.messages.create(
             model=self.model,
             max_tokens=2048,
             messages=[{"role": "user", "content": prompt}]
         )
-        summary = response.content[0].text
-        logger.debug(f"Received summary from Claude: {summary}")
-        return summary
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            self.record_usage(usage.input_tokens, usage.output_tokens)
+        return response.content[0].text
+
+    def complete_stream(self, prompt):
+        with self.client.messages.stream(
+            model=self.model,
+            max_tokens=2048,
+            messages=[{"role": "user", "content": prompt}]
+        ) as stream:
+            yield from stream.text_stream
+            usage = stream.get_final_message().usage
+        self.record_usage(usage.input_tokens, usage.output_tokens)
 
     def list_models(self):
         logger.info("✅ Known available Claude models:")
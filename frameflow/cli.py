@@ -1,25 +1,259 @@
 #!/usr/bin/env python3
 
 import argparse
-from frameflow.processor import process_video
+import json
+import os
+import sys
 from frameflow.logging_config import setup_logging
+from frameflow.cache import DEFAULT_CACHE_DIR, DEFAULT_CACHE_MAX_MB
+from frameflow.client import available_clients
+from frameflow.decoder import DECODERS
+from frameflow.metrics import metrics
+from frameflow.prompts import DEFAULT_PROMPT_BUDGET
+from frameflow.transcription import DEFAULT_CHUNK_SECONDS, available_backends
+from frameflow.workqueue import DEFAULT_CACHE, DEFAULT_LEASE_SECONDS, DEFAULT_MAX_ATTEMPTS, STAGES, WorkQueue
 import logging
 
-def main():
-    parser = argparse.ArgumentParser(description="FrameFlow: Transcribe technical videos into visual How-To documents.")
-    parser.add_argument("--input-file", required=False, help="Path to input video file")
-    parser.add_argument("--output", default="howto.md", help="Output Markdown file")
+def add_processing_arguments(parser):
     parser.add_argument("--fps", type=float, default=None, help="Frame extraction FPS. If not set, uses scene change.")
-    parser.add_argument("--fps-smart-mode", action="store_true", help="Enable smart FPS extraction based on video length.")
+    parser.add_argument("--fps-smart-mode", action="store_true", help="Scan every frame and keep only scene changes.")
+    parser.add_argument("--scene-method", default="pixel", choices=["pixel", "histogram"], help="Scene change scoring method (default: pixel)")
+    parser.add_argument("--scene-threshold", type=float, default=None, help="Minimum scene change score (0-1) for a frame to be kept (default: 0.002 for pixel, 0.2 for histogram)")
+    parser.add_argument("--hash-threshold", type=int, default=6, help="Max perceptual-hash distance treated as a duplicate frame (default: 6)")
+    parser.add_argument("--dedup-window", type=int, default=8, help="Number of recently kept frames checked for duplicates (default: 8)")
+    parser.add_argument("--decode-mode", default="grab", choices=["grab", "seek"], help="Skip unused frames without converting them (grab) or seek to each sampled timestamp (seek)")
+    parser.add_argument("--decoder", default="opencv", choices=DECODERS, help="Frame decoder: OpenCV, or an ffmpeg subprocess that samples, selects and resizes frames before they reach Python (default: opencv)")
+    parser.add_argument("--keyframes-only", action="store_true", help="ffmpeg decoder: decode only keyframes; much faster, but frames are at most as frequent as the video's keyframes")
+    parser.add_argument("--decode-threads", type=int, default=0, help="ffmpeg decoder: decoding threads (default: 0, automatic)")
+    parser.add_argument("--decode-width", type=int, default=None, help="ffmpeg decoder: downscale frames wider than this many pixels (default: keep full size)")
+    parser.add_argument("--decoder-scene-threshold", type=float, default=None, help="ffmpeg decoder: drop sampled frames whose ffmpeg scene score (0-1) is below this, before FrameFlow's own scene detection")
+    parser.add_argument("--ocr-workers", type=int, default=None, help="Number of OCR worker processes (default: CPU count)")
+    parser.add_argument("--ocr-grayscale", action="store_true", help="Convert frames to grayscale before OCR")
+    parser.add_argument("--ocr-scale", type=float, default=1.0, help="Resize factor applied to frames before OCR (default: 1.0)")
+    parser.add_argument("--ocr-binarize", action="store_true", help="Apply Otsu binarization to frames before OCR")
+    parser.add_argument("--ocr-incremental", action="store_true", help="OCR only the rows that changed since the previous frame and reuse the rest of its text")
     parser.add_argument("--whisper-model", default="large", help="Whisper model size (tiny, base, small, medium, large)")
-    parser.add_argument("--client", default="openai", choices=["openai", "local", "gemini", "claude"], help="AI client to use for summarization")
+    parser.add_argument("--transcript-window", type=float, default=30.0, help="Seconds of transcript around each frame sent to the AI client; 0 sends the full transcript (default: 30)")
+    parser.add_argument("--transcription-backend", default="whisper", choices=available_backends(), help="Speech-to-text engine (default: whisper)")
+    parser.add_argument("--transcription-device", default=None, help="Device for transcription, e.g. cpu or cuda (default: auto-detect)")
+    parser.add_argument("--transcription-workers", type=int, default=1, help="Transcribe long audio in chunks split at silences, one model per worker process (default: 1, no chunking)")
+    parser.add_argument("--transcription-chunk-seconds", type=float, default=DEFAULT_CHUNK_SECONDS, help=f"Target chunk length for --transcription-workers (default: {DEFAULT_CHUNK_SECONDS:g})")
+    parser.add_argument("--compute-type", default=None, help="Model precision, e.g. int8, float16, float32 (default: int8 for faster-whisper)")
+    parser.add_argument("--client", default="openai", choices=available_clients(), help="AI client to use for summarization")
     parser.add_argument("--client-model", default=None, help="AI model name for the selected client")
     parser.add_argument("--client-token", default=None, help="API token for the AI client (overrides environment variable if provided)")
+    parser.add_argument("--prompt-budget", type=int, default=DEFAULT_PROMPT_BUDGET, help=f"Tokens of OCR and transcript packed into each summarization request; 0 for no limit (default: {DEFAULT_PROMPT_BUDGET})")
+    parser.add_argument("--no-ocr-dedup", action="store_true", help="Resend OCR lines that earlier requests already contained")
+    parser.add_argument("--summary-mode", default="frame", choices=["frame", "hierarchical"], help="One step per frame, or group similar adjacent frames into steps and merge them in a reduce pass (default: frame)")
+    parser.add_argument("--step-similarity", type=float, default=0.5, help="Hierarchical mode: minimum word overlap (0-1) between adjacent frames to share a step (default: 0.5)")
+    parser.add_argument("--max-frames-per-step", type=int, default=8, help="Hierarchical mode: maximum frames summarized together (default: 8)")
+    parser.add_argument("--llm-endpoint", default=None, help="Chat completions URL of the local client (default: http://localhost:8000/v1/chat/completions)")
+    parser.add_argument("--llm-timeout", type=float, default=None, help="Local client connect/read timeout in seconds (default: 120)")
+    parser.add_argument("--llm-stream", action="store_true", default=None, help="Stream responses token by token; see --stream-log")
+    parser.add_argument("--llm-batch-size", type=int, default=None, help="Frames sent per local client request via the /v1/completions route, for servers that batch prompts (default: 1)")
+    parser.add_argument("--router-backends", default=None, help="Router client: comma-separated clients to balance over, each optionally name:model (default: openai,claude,gemini)")
+    parser.add_argument("--router-hedge", action="store_true", default=None, help="Router client: duplicate a request on the next-best backend once it runs past its backend's p95 latency")
+    parser.add_argument("--stream-log", default=None, help="Write LLM output as it arrives, with each request's time to first token, to this JSON-lines file, relative to the output file (default: off)")
+    parser.add_argument("--llm-concurrency", type=int, default=4, help="Maximum concurrent summarization requests (default: 4)")
+    parser.add_argument("--requests-per-minute", type=int, default=None, help="Client request rate limit shared by all concurrent requests")
+    parser.add_argument("--tokens-per-minute", type=int, default=None, help="Client token rate limit shared by all concurrent requests")
+    parser.add_argument("--llm-retries", type=int, default=5, help="Attempts per summarization request on rate limits and transient errors (default: 5)")
+    parser.add_argument("--queue-size", type=int, default=8, help="Decoded frames buffered between the decode and OCR stages (default: 8)")
+    parser.add_argument("--max-memory-mb", type=int, default=None, help="Bounded mode: memory for decoded frames, half for frames queued for OCR and a quarter for frames in flight to OCR workers (pickled copies included) and an eighth for decoded audio, transcribed one window at a time; the transcript is kept on disk. Not counted: up to five frames being encoded and written to disk, OCR worker processes, models and the cache (default: unbounded)")
+    parser.add_argument("--max-disk-mb", type=int, default=None, help="Bounded mode: disk budget for extracted frames, spread evenly over the video, including the cache's copy of them; scene changes beyond it are skipped. Not counted: --assets-dir images, transcripts and other cache entries (default: unbounded)")
+    parser.add_argument("--assets-dir", default=None, help="Write the images the document links to into this directory, relative to the output file, and keep extracted frames only as scratch files (default: link the extracted frames)")
+    parser.add_argument("--asset-format", default="webp", choices=["webp", "jpeg", "png"], help="Image format for --assets-dir (default: webp)")
+    parser.add_argument("--asset-quality", type=int, default=80, help="WebP/JPEG quality (0-100) for --assets-dir (default: 80)")
+    parser.add_argument("--asset-max-width", type=int, default=None, help="Downscale images in --assets-dir wider than this many pixels (default: keep full size)")
+    parser.add_argument("--thumbnail-width", type=int, default=None, help="Also write thumbnails this many pixels wide to --assets-dir; the document shows them linked to the full image (default: no thumbnails)")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Cache for frames, OCR, transcripts and summaries (default: ~/.cache/frameflow)")
+    parser.add_argument("--cache-max-size", type=int, default=DEFAULT_CACHE_MAX_MB, help=f"Cache size limit in MB; least recently used entries are evicted (default: {DEFAULT_CACHE_MAX_MB})")
+    parser.add_argument("--no-cache", action="store_true", help="Disable the cache and recompute every stage")
     parser.add_argument("--transcribe", action="store_true", help="If set, generate transcript only.")
+
+
+def add_reporting_arguments(parser):
+    parser.add_argument("--metrics-file", default=None, help="Write per-stage timings, throughput and counters to this JSON file")
+    parser.add_argument("--prometheus-file", default=None, help="Write metrics in Prometheus textfile-collector format to this file")
+    parser.add_argument("--profile", default=None, metavar="DIR", help="Write cProfile stats for each pipeline stage and OCR worker to DIR")
+
+
+def start_reporting(args):
+    metrics.reset()
+    if args.profile:
+        os.makedirs(args.profile, exist_ok=True)
+        metrics.profile_dir = os.path.abspath(args.profile)
+
+
+def finish_reporting(args):
+    metrics.log_summary()
+    if args.metrics_file:
+        metrics.write_json(args.metrics_file)
+    if args.prometheus_file:
+        metrics.write_prometheus(args.prometheus_file)
+
+
+def processing_options(args):
+    return {
+        "fps": args.fps,
+        "whisper_model": args.whisper_model,
+        "fps_smart_mode": args.fps_smart_mode,
+        "transcribe": args.transcribe,
+        "client_name": args.client,
+        "client_token": args.client_token,
+        "client_model": args.client_model,
+        "client_options": {
+            "endpoint": args.llm_endpoint,
+            "timeout": args.llm_timeout,
+            "stream": args.llm_stream,
+            "batch_size": args.llm_batch_size,
+            "backends": args.router_backends,
+            "hedge": args.router_hedge,
+        },
+        "scene_method": args.scene_method,
+        "scene_threshold": args.scene_threshold,
+        "hash_threshold": args.hash_threshold,
+        "dedup_window": args.dedup_window,
+        "decode_mode": args.decode_mode,
+        "decoder": args.decoder,
+        "keyframes_only": args.keyframes_only,
+        "decode_threads": args.decode_threads,
+        "decode_width": args.decode_width,
+        "decoder_scene_threshold": args.decoder_scene_threshold,
+        "ocr_workers": args.ocr_workers,
+        "ocr_grayscale": args.ocr_grayscale,
+        "ocr_scale": args.ocr_scale,
+        "ocr_binarize": args.ocr_binarize,
+        "ocr_incremental": args.ocr_incremental,
+        "transcript_window": args.transcript_window,
+        "prompt_budget": args.prompt_budget,
+        "ocr_dedup": not args.no_ocr_dedup,
+        "summary_mode": args.summary_mode,
+        "step_similarity": args.step_similarity,
+        "max_frames_per_step": args.max_frames_per_step,
+        "llm_concurrency": args.llm_concurrency,
+        "requests_per_minute": args.requests_per_minute,
+        "tokens_per_minute": args.tokens_per_minute,
+        "llm_retries": args.llm_retries,
+        "cache_dir": None if args.no_cache else args.cache_dir,
+        "cache_max_mb": args.cache_max_size,
+        "queue_size": args.queue_size,
+        "max_memory_mb": args.max_memory_mb,
+        "max_disk_mb": args.max_disk_mb,
+        "assets_dir": args.assets_dir,
+        "asset_format": args.asset_format,
+        "asset_quality": args.asset_quality,
+        "asset_max_width": args.asset_max_width,
+        "thumbnail_width": args.thumbnail_width,
+        "stream_log": args.stream_log,
+        "transcription_backend": args.transcription_backend,
+        "transcription_device": args.transcription_device,
+        "compute_type": args.compute_type,
+        "transcription_workers": args.transcription_workers,
+        "transcription_chunk_seconds": args.transcription_chunk_seconds,
+    }
+
+
+def batch_main(argv):
+    parser = argparse.ArgumentParser(prog="frameflow batch", description="FrameFlow batch mode: process a directory or manifest of videos.")
+    parser.add_argument("source", help="Directory of videos, or a manifest with one video path (or JSON job) per line")
+    parser.add_argument("--output-dir", default="frameflow_batch", help="Directory holding one isolated work directory per video (default: frameflow_batch)")
+    parser.add_argument("--jobs", type=int, default=2, help="Number of videos processed concurrently (default: 2)")
+    add_processing_arguments(parser)
+    add_reporting_arguments(parser)
+    parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"], help="Set log verbosity level (default: INFO)")
+    args = parser.parse_args(argv)
+
+    setup_logging(level=getattr(logging, args.log_level.upper(), logging.INFO))
+
+    from frameflow.batch import run_batch
+    start_reporting(args)
+    try:
+        results = run_batch(args.source, args.output_dir, args.jobs, **processing_options(args))
+    finally:
+        finish_reporting(args)
+    if any(error is not None for error in results.values()):
+        sys.exit(1)
+
+
+def queue_main(argv):
+    parser = argparse.ArgumentParser(prog="frameflow queue", description="FrameFlow work queue: split videos into extract, OCR, transcribe and summarize tasks run by workers on any number of machines.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    submit = commands.add_parser("submit", help="Queue a video, a directory of videos, or a manifest")
+    submit.add_argument("source", help="Video file, directory of videos, or a manifest with one video path (or JSON job) per line")
+    submit.add_argument("--output-dir", default="frameflow_batch", help="Directory holding one work directory per video; must be reachable by every worker (default: frameflow_batch)")
+    add_processing_arguments(submit)
+
+    worker = commands.add_parser("worker", help="Claim and run queued tasks")
+    worker.add_argument("--stages", default=",".join(STAGES), help=f"Comma-separated stages this worker runs (default: {','.join(STAGES)})")
+    worker.add_argument("--client-token", default=None, help="API token for the AI client (overrides environment variable if provided)")
+    worker.add_argument("--ocr-workers", type=int, default=None, help="OCR worker processes, overriding the submitted value (default: as submitted)")
+    worker.add_argument("--cache-dir", default=None, help="Cache directory for jobs submitted with a cache, overriding the submitted one (default: as submitted; jobs using the default cache use this worker's ~/.cache/frameflow)")
+    worker.add_argument("--poll-interval", type=float, default=2.0, help="Seconds between polls when no task is ready (default: 2)")
+    worker.add_argument("--exit-when-idle", action="store_true", help="Exit once every queued job has finished or failed")
+    add_reporting_arguments(worker)
+
+    commands.add_parser("status", help="Print job and task counts as JSON")
+
+    for command in commands.choices.values():
+        command.add_argument("--db", default="frameflow_queue.db", help="Queue database; put it on storage shared by all workers (default: frameflow_queue.db)")
+        command.add_argument("--lease-seconds", type=int, default=DEFAULT_LEASE_SECONDS, help=f"Seconds without a heartbeat before a running task is handed to another worker (default: {DEFAULT_LEASE_SECONDS})")
+        command.add_argument("--max-attempts", type=int, default=DEFAULT_MAX_ATTEMPTS, help=f"Attempts per task before its job is marked failed (default: {DEFAULT_MAX_ATTEMPTS})")
+        command.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"], help="Set log verbosity level (default: INFO)")
+    args = parser.parse_args(argv)
+
+    setup_logging(level=getattr(logging, args.log_level.upper(), logging.INFO))
+
+    from frameflow.queue_worker import QueueWorker, submit_jobs
+    queue = WorkQueue(args.db, args.lease_seconds, args.max_attempts)
+    if args.command == "submit":
+        options = processing_options(args)
+        # Tokens stay out of the shared database; workers bring their own
+        options.pop("client_token")
+        if options["cache_dir"] == DEFAULT_CACHE_DIR:
+            # The expanded default points into the submitter's home directory
+            options["cache_dir"] = DEFAULT_CACHE
+        job_ids = submit_jobs(queue, args.source, args.output_dir, options)
+        print(f"Queued {len(job_ids)} job(s)")
+    elif args.command == "worker":
+        stages = [stage.strip() for stage in args.stages.split(",") if stage.strip()]
+        unknown = set(stages) - set(STAGES)
+        if unknown:
+            parser.error(f"unknown stage(s): {', '.join(sorted(unknown))}")
+        start_reporting(args)
+        try:
+            with metrics.profiled("queue-worker"):
+                QueueWorker(queue, stages, args.client_token, args.ocr_workers, args.poll_interval,
+                            cache_dir=args.cache_dir).run(args.exit_when_idle)
+        finally:
+            finish_reporting(args)
+    else:
+        print(json.dumps(queue.status(), indent=2))
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if argv and argv[0] == "batch":
+        batch_main(argv[1:])
+        return
+    if argv and argv[0] == "queue":
+        queue_main(argv[1:])
+        return
+
+    parser = argparse.ArgumentParser(
+        description="FrameFlow: Transcribe technical videos into visual How-To documents.",
+        epilog="Run 'frameflow batch --help' to process a directory or manifest of videos, or "
+               "'frameflow queue --help' to spread videos over workers on several machines."
+    )
+    parser.add_argument("--input-file", required=False, help="Path to input video file")
+    parser.add_argument("--output", default="howto.md", help="Output Markdown file")
+    add_processing_arguments(parser)
+    add_reporting_arguments(parser)
     parser.add_argument("--log-level", default="INFO", choices=["DEBUG", "INFO", "WARNING", "ERROR", "CRITICAL"], help="Set log verbosity level (default: INFO)")
     parser.add_argument("--list-available-models", action="store_true", help="List available models for the selected client")
 
-    args = parser.parse_args()
+    args = parser.parse_args(argv)
 
     # Initialize logging with selected level
     setup_logging(level=getattr(logging, args.log_level.upper(), logging.INFO))
@@ -29,17 +263,17 @@ def main():
         list_models_for_client(args.client, args.client_token)
         return
 
-    process_video(
-        args.input_file,
-        args.output,
-        args.fps,
-        args.whisper_model,
-        args.fps_smart_mode,
-        args.transcribe,
-        args.client,
-        args.client_token,
-        args.client_model
-    )
+    # Imported only now: the pipeline pulls in OpenCV, Tesseract and friends, which
+    # --help and --list-available-models never need
+    from frameflow.processor import process_video
+    options = processing_options(args)
+    start_reporting(args)
+    try:
+        # Reports are written even when a run fails part-way, which is when they matter most
+        with metrics.profiled("main"):
+            process_video(args.input_file, args.output, **options)
+    finally:
+        finish_reporting(args)
 
 if __name__ == "__main__":
     main()
@@ -1,5 +1,344 @@
 #!/usr/bin/env python3
 
+import importlib
+import inspect
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from frameflow.cache import cache_key
+from frameflow.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Built-in clients as "module:Class" so an SDK (openai, anthropic, google-generativeai)
+# is only imported when its client is used. Third-party packages can add clients under
+# the "frameflow.clients" entry-point group.
+CLIENTS = {
+    "openai": "frameflow.openai_client:OpenAIClient",
+    "local": "frameflow.local_llm_client:LocalLLMClient",
+    "gemini": "frameflow.gemini_client:GeminiClient",
+    "claude": "frameflow.claude_client:ClaudeClient",
+    "router": "frameflow.router_client:RouterClient",
+}
+CLIENT_ENTRY_POINT_GROUP = "frameflow.clients"
+
+
+def load_object(target):
+    module_name, _, attribute = target.partition(":")
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def registered_entry_points(group):
+    # Only package metadata is read here; nothing is imported until load()
+    from importlib.metadata import entry_points
+    return {entry_point.name: entry_point for entry_point in entry_points(group=group)}
+
+
+def available_clients():
+    plugins = set(registered_entry_points(CLIENT_ENTRY_POINT_GROUP)) - set(CLIENTS)
+    return list(CLIENTS) + sorted(plugins)
+
+
+def get_client_class(name):
+    if name in CLIENTS:
+        return load_object(CLIENTS[name])
+    entry_point = registered_entry_points(CLIENT_ENTRY_POINT_GROUP).get(name)
+    if entry_point is None:
+        raise ValueError(f"Unknown client: {name}")
+    return entry_point.load()
+
+
+def accepted_options(cls, options):
+    # Command-line client settings (e.g. --llm-timeout) apply to the clients that take them;
+    # the others ignore them instead of failing at startup
+    parameters = inspect.signature(cls).parameters
+    if any(parameter.kind is parameter.VAR_KEYWORD for parameter in parameters.values()):
+        return options
+    ignored = sorted(set(options) - set(parameters))
+    if ignored:
+        logger.warning(f"⚠️ {cls.__name__} does not use {', '.join(ignored)}; ignoring")
+    return {key: value for key, value in options.items() if key in parameters}
+
+
+def create_client(name, api_key=None, model=None, **options):
+    # Only forward settings that were chosen so each client keeps its own defaults
+    options = {key: value for key, value in options.items() if value is not None}
+    options["api_key"] = api_key
+    if model:
+        options["model"] = model
+    cls = get_client_class(name)
+    return cls(**accepted_options(cls, options))
+
+
+def estimate_tokens(text):
+    # Rough BPE average for English and code; good enough for budgeting a rate limit
+    return max(1, len(text) // 4)
+
+
+class RateLimiter:
+    # Token bucket over requests/min and tokens/min. One instance is shared by every
+    # thread calling a client so concurrent requests respect a single provider quota.
+    def __init__(self, requests_per_minute=None, tokens_per_minute=None):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        self.request_allowance = float(requests_per_minute or 0)
+        self.token_allowance = float(tokens_per_minute or 0)
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        elapsed = now - self.updated
+        self.updated = now
+        if self.requests_per_minute:
+            self.request_allowance = min(
+                self.requests_per_minute, self.request_allowance + elapsed * self.requests_per_minute / 60.0
+            )
+        if self.tokens_per_minute:
+            self.token_allowance = min(
+                self.tokens_per_minute, self.token_allowance + elapsed * self.tokens_per_minute / 60.0
+            )
+
+    def _wait_time(self, now, tokens):
+        wait = max(0.0, self.paused_until - now)
+        if self.requests_per_minute and self.request_allowance < 1:
+            wait = max(wait, (1 - self.request_allowance) * 60.0 / self.requests_per_minute)
+        if self.tokens_per_minute:
+            # A request larger than the whole bucket is let through once the bucket is full
+            needed = min(tokens, self.tokens_per_minute)
+            if self.token_allowance < needed:
+                wait = max(wait, (needed - self.token_allowance) * 60.0 / self.tokens_per_minute)
+        return wait
+
+    def acquire(self, tokens=1):
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self._refill(now)
+                wait = self._wait_time(now, tokens)
+                if wait <= 0:
+                    if self.requests_per_minute:
+                        self.request_allowance -= 1
+                    if self.tokens_per_minute:
+                        self.token_allowance -= tokens
+                    return waited
+            time.sleep(wait)
+            waited += wait
+
+    def pause(self, seconds):
+        # Called when the provider rejects a request: every thread holds off, not just the caller
+        with self.lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+class RetryPolicy:
+    def __init__(self, retries=5, initial_wait=2, max_wait=60, jitter=0.1):
+        self.retries = retries
+        self.initial_wait = initial_wait
+        self.max_wait = max_wait
+        self.jitter = jitter
+
+    def wait_time(self, attempt):
+        wait = min(self.initial_wait * (2 ** attempt), self.max_wait)
+        return wait * (1 + random.uniform(-self.jitter, self.jitter))
+
+
 class BaseClient:
+    # Exceptions worth retrying (rate limits, timeouts, transient server errors)
+    retryable_errors = ()
+    prompt_prefix = "Summarize this chunk:\n\n"
+    failure_message = "Rate limit exceeded or error occurred repeatedly."
+    rate_limiter = None
+    retry_policy = RetryPolicy()
+    # Prompts per request; clients whose server accepts several prompts at once override complete_batch
+    batch_size = 1
+    # Largest prompt (tokens) sent to the model, and which part survives when a prompt is
+    # longer: "head" drops the end, "tail" the start, "middle" keeps both ends
+    max_prompt_tokens = None
+    truncation = "head"
+    # Optional frameflow.cache.Cache; summaries are keyed by prompt hash and model
+    cache = None
+    # Summaries are requested through complete_stream, so text arrives as it is generated
+    stream = False
+
+    @property
+    def name(self):
+        return self.__class__.__name__
+
+    @property
+    def model_id(self):
+        return getattr(self, "model_name", None) or getattr(self, "model", None)
+
+    def complete(self, prompt):
+        raise NotImplementedError("complete must be implemented in client subclasses.")
+
+    def complete_stream(self, prompt):
+        # Yields the completion piece by piece; clients whose provider streams override this
+        yield self.complete(prompt)
+
+    def complete_batch(self, prompts):
+        return [self.complete(prompt) for prompt in prompts]
+
+    def record_usage(self, tokens_in, tokens_out):
+        # Called by complete() with the provider-reported token counts
+        metrics.record("llm_request", calls=0, tokens_in=tokens_in or 0, tokens_out=tokens_out or 0)
+
+    def is_retryable(self, error):
+        return isinstance(error, self.retryable_errors)
+
+    @property
+    def token_counter(self):
+        counter = self.__dict__.get("_token_counter")
+        if counter is None:
+            from frameflow.prompts import TokenCounter
+            counter = self.__dict__["_token_counter"] = TokenCounter(self.model_id)
+        return counter
+
+    def count_tokens(self, text):
+        return self.token_counter.count(text)
+
+    def truncate_prompt(self, prompt):
+        if self.max_prompt_tokens is None:
+            return prompt
+        truncated = self.token_counter.truncate(prompt, self.max_prompt_tokens, self.truncation)
+        if truncated is not prompt:
+            logger.warning(f"⚠️ Prompt over {self.max_prompt_tokens} tokens truncated for {self.name}")
+            metrics.increment("prompts_truncated", client=self.name)
+        return truncated
+
+    def build_prompt(self, chunk_text):
+        return self.truncate_prompt(f"{self.prompt_prefix}{chunk_text}")
+
     def summarize_chunk(self, chunk_text):
-        raise NotImplementedError("summarize_chunk must be implemented in client subclasses.")
+        return self.summarize_batch([chunk_text])[0]
+
+    def summarize_batch(self, chunks, streams=None):
+        # Cached summaries are reused; the remaining prompts go out in a single request.
+        # streams (frameflow.streaming.RequestStream, one per chunk) receive the text as it arrives.
+        streams = streams or [None] * len(chunks)
+        prompts = [self.build_prompt(chunk) for chunk in chunks]
+        keys = [cache_key("summary", self.name, str(self.model_id), prompt) for prompt in prompts]
+        summaries = [None] * len(prompts)
+        if self.cache is not None:
+            summaries = [self.cache.get_json("summaries", key) for key in keys]
+        missing = [i for i, summary in enumerate(summaries) if summary is None]
+
+        results = []
+        if len(missing) == 1:
+            results = [self._summarize(prompts[missing[0]], streams[missing[0]])]
+        elif missing:
+            results = self._summarize_many([prompts[i] for i in missing])
+        for i, summary in zip(missing, results):
+            summaries[i] = summary
+            # Failures are not cached so a rerun retries them
+            if self.cache is not None and summary != self.failure_message:
+                self.cache.put_json("summaries", keys[i], summary)
+        for stream, summary in zip(streams, summaries):
+            if stream is not None:
+                stream.finish(summary, failed=summary == self.failure_message)
+        return summaries
+
+    def _summarize(self, prompt, stream=None):
+        summary = self._request(partial(self._complete_streamed, stream=stream), prompt, self.count_tokens(prompt))
+        return self.failure_message if summary is None else summary
+
+    def _complete_streamed(self, prompt, stream=None):
+        # Time to first token is recorded for every request; without streaming the first
+        # piece is the whole completion, so it equals the request latency
+        if stream is not None:
+            stream.attempt()
+        start = time.perf_counter()
+        pieces = self.complete_stream(prompt) if self.stream else iter([self.complete(prompt)])
+        parts = []
+        for piece in pieces:
+            if not parts:
+                first_token = time.perf_counter() - start
+                metrics.record("llm_first_token", wall_seconds=first_token, items=1)
+                if stream is not None:
+                    stream.first_token(first_token)
+            parts.append(piece)
+            if stream is not None and piece:
+                stream.delta(piece)
+        return "".join(parts)
+
+    def _summarize_many(self, prompts):
+        tokens = sum(self.count_tokens(prompt) for prompt in prompts)
+        summaries = self._request(self.complete_batch, prompts, tokens, items=len(prompts))
+        return [self.failure_message] * len(prompts) if summaries is None else summaries
+
+    def _request(self, call, payload, tokens, items=1):
+        # Runs call(payload) under the rate limiter and retry policy; None once it gives up
+        policy = self.retry_policy
+        for attempt in range(policy.retries):
+            if self.rate_limiter is not None:
+                waited = self.rate_limiter.acquire(tokens)
+                if waited:
+                    metrics.increment("rate_limit_sleeps", client=self.name)
+                    metrics.increment("rate_limit_sleep_seconds", waited, client=self.name)
+            try:
+                with metrics.timer("llm_request", items=items):
+                    summary = call(payload)
+                logger.debug(f"Received summary from {self.name}: {summary}")
+                return summary
+            except Exception as e:
+                if not self.is_retryable(e):
+                    logger.error(f"Unexpected {self.name} error summarizing chunk: {e}")
+                    return None
+                if attempt + 1 >= policy.retries:
+                    break
+                wait_time = policy.wait_time(attempt)
+                logger.warning(
+                    f"⚠️ {self.name} request failed ({e.__class__.__name__}). "
+                    f"Retry {attempt + 1}/{policy.retries} in {wait_time:.1f}s."
+                )
+                metrics.increment("llm_retries", client=self.name)
+                metrics.increment("llm_backoff_seconds", wait_time, client=self.name)
+                if self.rate_limiter is not None:
+                    self.rate_limiter.pause(wait_time)
+                time.sleep(wait_time)
+
+        logger.error(f"❌ Exceeded maximum retries for {self.name}.")
+        return None
+
+    def summarize_chunks(self, chunks, max_workers=4, stream_log=None, stage="step"):
+        # Summaries are yielded in input order while up to max_workers requests are in
+        # flight. chunks may be a generator fed by earlier pipeline stages; it is consumed
+        # lazily so the first summaries come back before the last chunk exists. With a
+        # stream_log, each request's text is also logged as it arrives, numbered from 1.
+        batches = _batched(enumerate(chunks, start=1), self.batch_size)
+
+        def summarize(batch):
+            streams = None if stream_log is None else [stream_log.request(stage, step) for step, _ in batch]
+            return self.summarize_batch([chunk for _, chunk in batch], streams)
+
+        if max_workers <= 1:
+            for batch in batches:
+                yield from summarize(batch)
+            return
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="summarize") as executor:
+            pending = deque()
+            for batch in batches:
+                pending.append(executor.submit(summarize, batch))
+                if len(pending) >= max_workers * 2:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+
+
+def _batched(items, size):
+    # Lazily groups items into lists of up to size. A partial batch is sent as soon
+    # as it fills, so with size 1 every chunk is submitted the moment it exists.
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= max(1, size):
+            yield batch
+            batch = []
+    if batch:
+        yield batch
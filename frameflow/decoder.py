@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+
+import logging
+import re
+import subprocess
+import threading
+from collections import deque
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DECODERS = ("opencv", "ffmpeg")
+
+SHOWINFO_PTS = re.compile(r"Parsed_showinfo.*\bn:\s*\d+.*\bpts_time:\s*(-?[\d.]+)")
+
+
+def scaled_size(width, height, max_width):
+    # Downscale only, keeping the aspect ratio; most encoders and filters want even sizes
+    if not max_width or max_width >= width:
+        return width, height
+    return max_width - max_width % 2, max(2, int(round(height * max_width / width / 2)) * 2)
+
+
+def select_filters(sample_seconds=None, scene_threshold=None):
+    # Frame selection happens inside ffmpeg, so dropped frames are never converted or piped.
+    # Sampling is by timestamp rather than frame number so it also works on keyframes only.
+    filters = []
+    if sample_seconds:
+        filters.append(f"select='isnan(prev_selected_t)+gte(t-prev_selected_t\\,{sample_seconds:.6f})'")
+    if scene_threshold:
+        # ffmpeg's own scene score (0-1) against the previous sampled frame; the first frame always passes
+        filters.append(f"select='eq(n\\,0)+gt(scene\\,{scene_threshold})'")
+    return filters
+
+
+def _grow_pipe(stream, size):
+    # The default 64 KiB pipe makes ffmpeg and Python take turns dozens of times per frame;
+    # Linux allows raising it (up to /proc/sys/fs/pipe-max-size, 1 MiB by default)
+    try:
+        import fcntl
+        fcntl.fcntl(stream.fileno(), fcntl.F_SETPIPE_SZ, min(size, 1 << 20))
+    except (ImportError, AttributeError, OSError):
+        pass
+
+
+class FFmpegDecoder:
+    # Streams raw BGR frames from an ffmpeg subprocess. Decoding runs multi-threaded inside
+    # ffmpeg and overlaps with whatever consumes the frames; keyframe skipping, sampling,
+    # scene selection and downscaling all happen before frames reach the pipe. Frame
+    # timestamps are read from the showinfo filter on stderr, which reports frames in
+    # the order they are written to stdout.
+    def __init__(self, video_path, width, height, sample_seconds=None, keyframes_only=False, threads=0,
+                 max_width=None, scene_threshold=None):
+        self.video_path = video_path
+        self.width, self.height = scaled_size(width, height, max_width)
+        filters = select_filters(sample_seconds, scene_threshold)
+        if (self.width, self.height) != (width, height):
+            filters.append(f"scale={self.width}:{self.height}:flags=area")
+        filters.append("showinfo")
+        self.cmd = ["ffmpeg", "-nostdin", "-hide_banner", "-nostats", "-loglevel", "info"]
+        if keyframes_only:
+            self.cmd += ["-skip_frame", "nokey"]
+        # -noautorotate keeps the output size equal to the probed (stored) size
+        self.cmd += [
+            "-threads", str(threads), "-noautorotate", "-i", video_path, "-an", "-sn", "-dn",
+            "-vf", ",".join(filters), "-fps_mode", "passthrough", "-f", "rawvideo", "-pix_fmt", "bgr24", "-",
+        ]
+
+    def frames(self):
+        # Yields (timestamp_seconds, frame). Each frame is read straight into its own numpy
+        # array, so downstream stages can hold on to it without another copy.
+        logger.debug(f"Decoding with: {' '.join(self.cmd)}")
+        try:
+            process = subprocess.Popen(self.cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, bufsize=0)
+        except FileNotFoundError as e:
+            raise RuntimeError("ffmpeg is required for --decoder ffmpeg; see the README prerequisites") from e
+
+        timestamps = deque()
+        errors = deque(maxlen=20)
+        ready = threading.Condition()
+        stderr_done = []
+
+        def read_stderr():
+            for line in iter(process.stderr.readline, b""):
+                line = line.decode("utf-8", errors="ignore").rstrip()
+                match = SHOWINFO_PTS.search(line)
+                with ready:
+                    if match:
+                        timestamps.append(float(match.group(1)))
+                    elif "Parsed_showinfo" not in line:
+                        errors.append(line)
+                    ready.notify()
+            with ready:
+                stderr_done.append(True)
+                ready.notify()
+
+        frame_bytes = self.width * self.height * 3
+        _grow_pipe(process.stdout, frame_bytes)
+        reader = threading.Thread(target=read_stderr, name="ffmpeg-stderr", daemon=True)
+        reader.start()
+        finished = False
+        try:
+            while True:
+                frame = np.empty((self.height, self.width, 3), dtype=np.uint8)
+                if not self._read_into(process.stdout, memoryview(frame).cast("B"), frame_bytes):
+                    finished = True
+                    break
+                with ready:
+                    # showinfo logs a frame before it is encoded, so its line is normally already here
+                    while not timestamps and not stderr_done:
+                        ready.wait()
+                    timestamp = timestamps.popleft() if timestamps else None
+                if timestamp is None:
+                    logger.warning("ffmpeg reported fewer frames than it wrote; stopping")
+                    break
+                yield timestamp, frame
+        finally:
+            if not finished:
+                # The consumer stopped early (or failed); there is no one left to read the pipe
+                process.kill()
+            process.stdout.close()
+            returncode = process.wait()
+            reader.join()
+            process.stderr.close()
+        if finished and returncode != 0:
+            details = "\n".join(errors)
+            raise RuntimeError(f"ffmpeg failed to decode {self.video_path} (exit {returncode}): {details}")
+
+    @staticmethod
+    def _read_into(stream, buffer, size):
+        filled = 0
+        while filled < size:
+            count = stream.readinto(buffer[filled:])
+            if not count:
+                if filled:
+                    logger.warning(f"Truncated frame from ffmpeg ({filled}/{size} bytes); stopping")
+                return False
+            filled += count
+        return True
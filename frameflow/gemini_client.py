@@ -1,15 +1,18 @@
 #!/usr/bin/env python3
 
 import logging
-import time
 import google.generativeai as genai
-from google.api_core.exceptions import ResourceExhausted
+from google.api_core.exceptions import DeadlineExceeded, ResourceExhausted, ServiceUnavailable
 from frameflow.client import BaseClient
 
 logger = logging.getLogger(__name__)
 
 class GeminiClient(BaseClient):
-    def __init__(self, api_key=None, model="gemini-pro"):
+    retryable_errors = (ResourceExhausted, ServiceUnavailable, DeadlineExceeded)
+    # gemini-pro accepts about 30k input tokens
+    max_prompt_tokens = 30000
+
+    def __init__(self, api_key=None, model="gemini-pro", stream=False):
         logger.info("Initializing Gemini client")
         if api_key:
             genai.configure(api_key=api_key)
@@ -19,24 +22,25 @@ class GeminiClient(BaseClient):
             logger.debug("Gemini client configured using environment variable.")
         self.model_name = model
         self.model = genai.GenerativeModel(self.model_name)
+        self.stream = stream
+
+    def complete(self, prompt):
+        response = self.model.generate_content(prompt)
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None:
+            self.record_usage(usage.prompt_token_count, usage.candidates_token_count)
+        return response.text
 
-    def summarize_chunk(self, chunk_text, retries=5, initial_wait=2, max_wait=60):
-        attempt = 0
-        while attempt < retries:
-            try:
-                prompt = f"Summarize this chunk:\n\n{chunk_text}"
-                response = self.model.generate_content(prompt)
-                return response.text
-            except ResourceExhausted as e:
-                wait_time = min(initial_wait * (2 ** attempt), max_wait)
-                logger.warning(f"⚠️ Gemini rate limit exceeded. Retry {attempt+1}/{retries} in {wait_time}s.")
-                time.sleep(wait_time)
-                attempt += 1
-            except Exception as e:
-                logger.error(f"Unexpected Gemini error: {e}")
-                break
-        logger.error("❌ Exceeded maximum retries for Gemini.")
-        return "Rate limit exceeded or persistent error."
+    def complete_stream(self, prompt):
+        response = self.model.generate_content(prompt, stream=True)
+        for chunk in response:
+            # Chunks without text (e.g. only safety ratings) raise on .text
+            if chunk.parts:
+                yield chunk.text
+        # Usage covers the whole response once it has been read to the end
+        usage = getattr(response, "usage_metadata", None)
+        if usage is not None:
+            self.record_usage(usage.prompt_token_count, usage.candidates_token_count)
 
     def list_models(self):
         models = genai.list_models()
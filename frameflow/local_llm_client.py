@@ -1,29 +1,101 @@
 #!/usr/bin/env python3
 
+import json
 import logging
 import requests
+from requests.adapters import HTTPAdapter
 from frameflow.client import BaseClient
 
 logger = logging.getLogger(__name__)
 
+# Statuses a busy or restarting inference server answers with; worth another attempt
+RETRYABLE_STATUS_CODES = (408, 429, 500, 502, 503, 504)
+
+
 class LocalLLMClient(BaseClient):
-    def __init__(self, endpoint="http://localhost:8000/v1/chat/completions", api_key=None):
+    # Local servers get the chunk as-is; the model's own system prompt frames the task
+    prompt_prefix = ""
+    retryable_errors = (requests.ConnectionError, requests.Timeout)
+    # Self-hosted models often run with a 4k context; the middle of an over-long prompt
+    # goes first so the OCR at the start and the latest narration at the end survive
+    truncation = "middle"
+
+    def __init__(self, endpoint="http://localhost:8000/v1/chat/completions", api_key=None, model="mistral",
+                 timeout=120, pool_size=16, stream=False, batch_size=1, batch_endpoint=None, max_prompt_tokens=3500):
         logger.info("Initializing Local LLM client")
         self.endpoint = endpoint
         self.api_key = api_key
-        logger.debug(f"Local LLM endpoint: {self.endpoint}")
+        self.model = model
+        # Seconds to connect and between bytes received; a hung server then surfaces as a retryable Timeout
+        self.timeout = timeout
+        self.stream = stream
+        self.max_prompt_tokens = max_prompt_tokens
+        self.batch_size = batch_size
+        # Several prompts per request need the legacy completions route, which takes a list of
+        # prompts (vLLM, llama.cpp server, TGI); chat completions only takes one conversation
+        self.batch_endpoint = batch_endpoint or endpoint.replace("/chat/completions", "/completions")
+
+        # One keep-alive connection per concurrent request instead of a new TCP connection per frame
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        if api_key:
+            self.session.headers["Authorization"] = f"Bearer {api_key}"
+        logger.debug(f"Local LLM endpoint: {self.endpoint} (model {model}, stream={stream}, batch_size={batch_size})")
+
+    def is_retryable(self, error):
+        if isinstance(error, requests.HTTPError) and error.response is not None:
+            return error.response.status_code in RETRYABLE_STATUS_CODES
+        return super().is_retryable(error)
 
-    def summarize_chunk(self, chunk_text):
-        logger.debug("Summarizing chunk with Local LLM.")
-        headers = {}
-        if self.api_key:
-            headers["Authorization"] = f"Bearer {self.api_key}"
+    def _post(self, url, data, stream=False):
+        response = self.session.post(url, json=data, timeout=self.timeout, stream=stream)
+        response.raise_for_status()
+        return response
 
+    def _record_usage(self, usage):
+        # OpenAI-compatible servers (vLLM, llama.cpp, Ollama) report usage; others may not
+        if usage:
+            self.record_usage(usage.get("prompt_tokens"), usage.get("completion_tokens"))
+
+    def complete(self, prompt):
         data = {
-            "model": "mistral",
-            "messages": [{"role": "user", "content": chunk_text}],
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
         }
-        response = requests.post(self.endpoint, json=data, headers=headers)
-        summary = response.json()['choices'][0]['message']['content']
-        logger.debug(f"Received summary from Local LLM: {summary}")
-        return summary
+        if self.stream:
+            return "".join(self.complete_stream(prompt))
+        body = self._post(self.endpoint, data).json()
+        self._record_usage(body.get("usage"))
+        return body['choices'][0]['message']['content']
+
+    def complete_stream(self, prompt):
+        # Server-sent events: the connection never idles for the whole generation, so a slow
+        # model does not trip the timeout, and the connection goes back to the pool when done
+        data = {
+            "model": self.model,
+            "messages": [{"role": "user", "content": prompt}],
+            "stream": True,
+            "stream_options": {"include_usage": True},
+        }
+        with self._post(self.endpoint, data, stream=True) as response:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                payload = line[len("data:"):].strip()
+                if payload == "[DONE]":
+                    break
+                event = json.loads(payload)
+                self._record_usage(event.get("usage"))
+                for choice in event.get("choices") or []:
+                    content = (choice.get("delta") or {}).get("content")
+                    if content:
+                        yield content
+
+    def complete_batch(self, prompts):
+        data = {"model": self.model, "prompt": prompts}
+        body = self._post(self.batch_endpoint, data).json()
+        self._record_usage(body.get("usage"))
+        choices = sorted(body["choices"], key=lambda choice: choice.get("index", 0))
+        return [choice["text"] for choice in choices]
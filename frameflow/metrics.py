@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+
+import cProfile
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+STAGE_FIELDS = ("wall_seconds", "cpu_seconds", "calls", "items", "bytes", "tokens_in", "tokens_out")
+
+
+class _Timer:
+    def __init__(self):
+        self.items = 0
+        self.bytes = 0
+
+    def add(self, items=0, bytes=0):
+        self.items += items
+        self.bytes += bytes
+
+
+class Metrics:
+    # Process-wide run statistics. Stages accumulate wall time, CPU time of the thread
+    # doing the work, call and item counts, bytes and LLM token usage; counters track
+    # events such as retries, rate-limit sleeps and cache hits.
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.profile_dir = None
+        self.reset()
+
+    def reset(self):
+        with self.lock:
+            self.started = time.time()
+            self.stages = {}
+            self.counters = {}
+
+    def record(self, stage, wall_seconds=0.0, cpu_seconds=0.0, calls=1, items=0, bytes=0, tokens_in=0, tokens_out=0):
+        with self.lock:
+            stats = self.stages.setdefault(stage, dict.fromkeys(STAGE_FIELDS, 0))
+            stats["wall_seconds"] += wall_seconds
+            stats["cpu_seconds"] += cpu_seconds
+            stats["calls"] += calls
+            stats["items"] += items
+            stats["bytes"] += bytes
+            stats["tokens_in"] += tokens_in
+            stats["tokens_out"] += tokens_out
+
+    def increment(self, name, value=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    @contextmanager
+    def timer(self, stage, items=0):
+        timer = _Timer()
+        timer.items = items
+        wall = time.perf_counter()
+        cpu = time.thread_time()
+        try:
+            yield timer
+        finally:
+            self.record(stage, time.perf_counter() - wall, time.thread_time() - cpu,
+                        items=timer.items, bytes=timer.bytes)
+
+    def timed_iter(self, stage, iterable):
+        # Charges the time spent producing each item (e.g. decoding a frame) to stage
+        iterator = iter(iterable)
+        while True:
+            with self.timer(stage) as timer:
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    timer.items = 0
+                    return
+                timer.items = 1
+            yield item
+
+    @contextmanager
+    def profiled(self, name):
+        # cProfile only sees the thread it was enabled on, so each pipeline stage thread
+        # writes its own <profile_dir>/<name>-<thread id>.prof
+        if not self.profile_dir:
+            yield
+            return
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            yield
+        finally:
+            profiler.disable()
+            os.makedirs(self.profile_dir, exist_ok=True)
+            path = os.path.join(self.profile_dir, f"{name}-{threading.get_ident()}.prof")
+            profiler.dump_stats(path)
+            logger.debug(f"Profile for {name} written to {path}")
+
+    def to_dict(self):
+        with self.lock:
+            return {
+                "started": self.started,
+                "duration_seconds": time.time() - self.started,
+                "stages": {stage: dict(stats) for stage, stats in self.stages.items()},
+                "counters": [
+                    {"name": name, "labels": dict(labels), "value": value}
+                    for (name, labels), value in sorted(self.counters.items())
+                ],
+            }
+
+    def write_json(self, path):
+        with open(path, "w") as f:
+            json.dump(self.to_dict(), f, indent=2)
+        logger.info(f"Run report written to {path}")
+
+    def to_prometheus(self):
+        report = self.to_dict()
+        lines = []
+        for field in STAGE_FIELDS:
+            metric = f"frameflow_stage_{field}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for stage, stats in sorted(report["stages"].items()):
+                lines.append(f'{metric}{{stage="{stage}"}} {stats[field]}')
+        for counter in report["counters"]:
+            labels = ",".join(f'{key}="{value}"' for key, value in counter["labels"].items())
+            lines.append(f"frameflow_{counter['name']}_total{{{labels}}} {counter['value']}")
+        lines.append(f"frameflow_run_duration_seconds {report['duration_seconds']}")
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path):
+        # Textfile-collector format: written to a temp file and renamed so the
+        # node exporter never reads a partial file
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w") as f:
+            f.write(self.to_prometheus())
+        os.replace(tmp_path, path)
+        logger.info(f"Prometheus metrics written to {path}")
+
+    def log_summary(self):
+        for stage, stats in sorted(self.to_dict()["stages"].items()):
+            logger.info(
+                f"⏱️ {stage}: {stats['wall_seconds']:.2f}s wall, {stats['cpu_seconds']:.2f}s cpu, "
+                f"{stats['calls']} calls, {stats['items']} items"
+            )
+
+
+metrics = Metrics()
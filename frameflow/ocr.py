@@ -0,0 +1,346 @@
+#!/usr/bin/env python3
+
+import cProfile
+import logging
+import multiprocessing
+import os
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+import cv2
+import numpy as np
+import pytesseract
+
+from frameflow.cache import cache_key
+from frameflow.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+# Incremental OCR: grayscale difference counted as a change, gap (px) below which changed
+# rows are merged into one band, padding (px) around a band so its text lines are cropped
+# whole, and the changed share of the frame above which a full OCR is cheaper.
+REGION_PIXEL_DELTA = 24
+REGION_MERGE_GAP = 12
+REGION_PADDING = 6
+MAX_CHANGED_FRACTION = 0.5
+
+# Per-process tesserocr handle. When tesserocr is installed every worker keeps one
+# initialized engine instead of starting a tesseract subprocess per image.
+_tess_api = None
+# Per-process profiler when --profile is set; OCR runs in worker processes the parent can't see
+_profiler = None
+_profile_path = None
+
+
+def preprocess_image(image, grayscale=False, scale=1.0, binarize=False):
+    if scale and scale != 1.0:
+        interpolation = cv2.INTER_AREA if scale < 1.0 else cv2.INTER_CUBIC
+        image = cv2.resize(image, None, fx=scale, fy=scale, interpolation=interpolation)
+    if grayscale or binarize:
+        if image.ndim == 3:
+            image = cv2.cvtColor(image, cv2.COLOR_BGR2GRAY)
+        if binarize:
+            _, image = cv2.threshold(image, 0, 255, cv2.THRESH_BINARY + cv2.THRESH_OTSU)
+    elif image.ndim == 3:
+        # OpenCV frames are BGR; tesseract expects RGB
+        image = cv2.cvtColor(image, cv2.COLOR_BGR2RGB)
+    return image
+
+
+def _init_worker(profile_dir=None):
+    global _tess_api, _profiler, _profile_path
+    if profile_dir:
+        _profiler = cProfile.Profile()
+        _profile_path = os.path.join(profile_dir, f"ocr-worker-{os.getpid()}.prof")
+    try:
+        import tesserocr
+        _tess_api = tesserocr.PyTessBaseAPI()
+    except Exception:
+        _tess_api = None
+
+
+def ocr_image(image, grayscale=False, scale=1.0, binarize=False):
+    if isinstance(image, str):
+        image = cv2.imread(image)
+        if image is None:
+            raise ValueError("Unable to read image")
+    image = preprocess_image(image, grayscale, scale, binarize)
+    if _tess_api is not None:
+        from PIL import Image
+        _tess_api.SetImage(Image.fromarray(image))
+        return _tess_api.GetUTF8Text().strip()
+    return pytesseract.image_to_string(image).strip()
+
+
+def ocr_lines(image, grayscale=False, scale=1.0, binarize=False, top=0):
+    # Text lines with their boxes ([x0, y0, x1, y1] in the coordinates of the unscaled
+    # frame, shifted down by top for a crop) from tesseract's layout analysis
+    processed = preprocess_image(image, grayscale, scale, binarize)
+    factor = scale or 1.0
+    boxes = []
+    if _tess_api is not None:
+        from PIL import Image
+        from tesserocr import RIL, iterate_level
+        _tess_api.SetImage(Image.fromarray(processed))
+        _tess_api.Recognize()
+        for line in iterate_level(_tess_api.GetIterator(), RIL.TEXTLINE):
+            text = (line.GetUTF8Text(RIL.TEXTLINE) or "").strip()
+            if text:
+                boxes.append((text, line.BoundingBox(RIL.TEXTLINE)))
+    else:
+        data = pytesseract.image_to_data(processed, output_type=pytesseract.Output.DICT)
+        words = {}
+        for i, word in enumerate(data["text"]):
+            if not word.strip():
+                continue
+            line_id = (data["block_num"][i], data["par_num"][i], data["line_num"][i])
+            left, word_top = data["left"][i], data["top"][i]
+            words.setdefault(line_id, []).append((word, left, word_top, left + data["width"][i],
+                                                  word_top + data["height"][i]))
+        for line_id in sorted(words):
+            line = words[line_id]
+            boxes.append((" ".join(word[0] for word in line), (
+                min(word[1] for word in line), min(word[2] for word in line),
+                max(word[3] for word in line), max(word[4] for word in line),
+            )))
+    return [
+        {"text": text, "box": [int(x0 / factor), top + int(y0 / factor), int(x1 / factor), top + int(y1 / factor)]}
+        for text, (x0, y0, x1, y1) in boxes
+    ]
+
+
+def changed_bands(previous, image):
+    # Horizontal bands of rows that differ between two frames, as (top, bottom) pairs.
+    # Screen text is laid out in lines, so whole-width bands crop every changed line intact.
+    # None means the frames are not comparable or too much changed to be worth it.
+    if previous is None or previous.shape != image.shape:
+        return None
+    diff = cv2.absdiff(previous, image)
+    if diff.ndim == 3:
+        diff = diff.max(axis=2)
+    rows = np.flatnonzero((diff > REGION_PIXEL_DELTA).any(axis=1))
+    bands = []
+    for row in rows:
+        if bands and row - bands[-1][1] <= REGION_MERGE_GAP:
+            bands[-1][1] = row
+        else:
+            bands.append([row, row])
+    height = image.shape[0]
+    # Plain ints: band positions end up in cached JSON
+    bands = [
+        (int(max(0, top - REGION_PADDING)), int(min(height, bottom + 1 + REGION_PADDING))) for top, bottom in bands
+    ]
+    if sum(bottom - top for top, bottom in bands) > height * MAX_CHANGED_FRACTION:
+        return None
+    return bands
+
+
+def merge_lines(previous_lines, bands, new_lines):
+    # Lines of the previous frame outside every changed band are reused as they are
+    def changed(line):
+        center = (line["box"][1] + line["box"][3]) / 2
+        return any(top <= center < bottom for top, bottom in bands)
+    return reading_order([line for line in previous_lines if not changed(line)] + new_lines)
+
+
+def reading_order(lines):
+    # Top to bottom, then left to right, whichever mix of reused and fresh lines a frame has
+    return sorted(lines, key=lambda line: (line["box"][1], line["box"][0]))
+
+
+def lines_text(lines):
+    return "\n".join(line["text"] for line in lines)
+
+
+def _safe_ocr(image, options):
+    try:
+        return ocr_image(image, **options)
+    except Exception as e:
+        source = image if isinstance(image, str) else "in-memory frame"
+        logger.warning(f"OCR failed for {source}: {e}")
+        return ""
+
+
+def _timed_ocr(image, options):
+    # Runs in the worker; timings travel back with the text so the parent can report
+    # CPU time that never shows up in its own process
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    if _profiler is not None:
+        _profiler.enable()
+    try:
+        text = _safe_ocr(image, options)
+    finally:
+        if _profiler is not None:
+            _profiler.disable()
+            # Workers are never told when the pool shuts down, so the cumulative stats are rewritten each time
+            _profiler.dump_stats(_profile_path)
+    return text, time.perf_counter() - wall, time.process_time() - cpu
+
+
+def _timed_lines(crops, options):
+    # crops: (top, image) pairs; one full-frame crop at top 0 for a full OCR
+    wall = time.perf_counter()
+    cpu = time.process_time()
+    if _profiler is not None:
+        _profiler.enable()
+    lines = []
+    try:
+        for top, crop in crops:
+            lines.extend(ocr_lines(crop, top=top, **options))
+    except Exception as e:
+        logger.warning(f"Region OCR failed: {e}")
+    finally:
+        if _profiler is not None:
+            _profiler.disable()
+            _profiler.dump_stats(_profile_path)
+    return lines, time.perf_counter() - wall, time.process_time() - cpu
+
+
+class OCREngine:
+    def __init__(self, workers=None, grayscale=False, scale=1.0, binarize=False, cache=None, incremental=False):
+        self.cache = cache
+        # Only OCR the rows that changed since the previous frame and reuse the rest of its text
+        self.incremental = incremental
+        self.workers = workers or os.cpu_count() or 1
+        self.options = {"grayscale": grayscale, "scale": scale, "binarize": binarize}
+        self.executor = None
+        if self.workers > 1:
+            # spawn keeps workers independent of any threads running in the parent
+            self.executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(metrics.profile_dir,),
+            )
+        else:
+            _init_worker()
+        logger.info(f"OCR engine: {self.workers} worker(s), options={self.options}, incremental={incremental}")
+
+    def analyze(self, image):
+        return self._record(*_timed_ocr(image, self.options))
+
+    def _record(self, text, wall_seconds, cpu_seconds):
+        metrics.record("ocr", wall_seconds, cpu_seconds, items=1, bytes=len(text.encode("utf-8")))
+        return text
+
+    def window_full(self, pending, in_flight, max_bytes):
+        # At most two items per worker, and with max_bytes at most that many bytes of images.
+        # An image sent to a worker process also exists as a pickled copy, so it counts twice.
+        if len(pending) >= self.workers * 2:
+            return True
+        return bool(max_bytes) and in_flight * (2 if self.executor is not None else 1) > max_bytes
+
+    def map(self, items, image_of=None, key_of=None, max_bytes=None, size_of=None):
+        # Yields (item, text) in input order. Only a bounded window of items is in flight
+        # (see window_full; size_of(item) gives an item's bytes), so a long generator of
+        # frames is never fully held in memory.
+        # With a cache and key_of (content hash of the item), known frames skip OCR.
+        image_of = image_of or (lambda item: item)
+        size_of = size_of or (lambda item: 0)
+        if self.incremental:
+            yield from self._map_incremental(items, image_of, key_of, max_bytes, size_of)
+            return
+        pending = deque()
+        in_flight = 0
+        for item in items:
+            key = None
+            text = None
+            if self.cache is not None and key_of is not None:
+                key = cache_key("ocr", key_of(item), self.options)
+                text = self.cache.get_json("ocr", key)
+            if text is None:
+                if self.executor is None:
+                    text = self.analyze(image_of(item))
+                else:
+                    text = self.executor.submit(_timed_ocr, image_of(item), self.options)
+            else:
+                key = None
+            pending.append((item, text, key))
+            in_flight += size_of(item)
+            while pending and self.window_full(pending, in_flight, max_bytes):
+                entry = pending.popleft()
+                in_flight -= size_of(entry[0])
+                yield self._resolve(*entry)
+        while pending:
+            yield self._resolve(*pending.popleft())
+
+    def _resolve(self, item, text, key):
+        if isinstance(text, Future):
+            text = self._record(*text.result())
+        if key is not None:
+            self.cache.put_json("ocr", key, text)
+        return item, text
+
+    def _submit_lines(self, crops):
+        if self.executor is None:
+            return _timed_lines(crops, self.options)
+        return self.executor.submit(_timed_lines, crops, self.options)
+
+    def _map_incremental(self, items, image_of, key_of, max_bytes=None, size_of=lambda item: 0):
+        # Changed bands are found here against the previous frame's pixels, so region OCR
+        # still runs in parallel; merging with the previous frame's lines needs its result
+        # and happens in order as results are yielded.
+        pending = deque()
+        in_flight = 0
+        state = {"lines": []}
+        previous = None
+        for item in items:
+            image = image_of(item)
+            if isinstance(image, str):
+                image = cv2.imread(image)
+            bands = changed_bands(previous, image)
+            key = None
+            lines = None
+            if bands != [] and self.cache is not None and key_of is not None:
+                # Only the OCR of this frame's changed bands is cached; merging it with the
+                # previous frame's lines depends on that frame, so it is always redone
+                key = cache_key("ocr-bands", key_of(item), bands, self.options)
+                lines = self.cache.get_json("ocr", key)
+            if lines is not None:
+                key = None
+            elif bands is None:
+                metrics.increment("ocr_frames", mode="full")
+                lines = self._submit_lines([(0, image)])
+            elif bands:
+                metrics.increment("ocr_frames", mode="regions")
+                metrics.increment("ocr_regions", len(bands))
+                lines = self._submit_lines([(top, image[top:bottom]) for top, bottom in bands])
+            else:
+                metrics.increment("ocr_frames", mode="unchanged")
+                lines = []
+            previous = image
+            pending.append((item, lines, bands, key))
+            in_flight += size_of(item)
+            while pending and self.window_full(pending, in_flight, max_bytes):
+                entry = pending.popleft()
+                in_flight -= size_of(entry[0])
+                yield self._resolve_lines(state, *entry)
+        while pending:
+            yield self._resolve_lines(state, *pending.popleft())
+
+    def _resolve_lines(self, state, item, lines, bands, key):
+        if isinstance(lines, Future):
+            lines = lines.result()
+        if isinstance(lines, tuple):
+            lines, wall_seconds, cpu_seconds = lines
+            metrics.record("ocr", wall_seconds, cpu_seconds, items=1)
+        if key is not None:
+            self.cache.put_json("ocr", key, lines)
+        if bands is None:
+            lines = reading_order(lines)
+        else:
+            lines = merge_lines(state["lines"], bands, lines)
+        state["lines"] = lines
+        return item, lines_text(lines)
+
+    def close(self):
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
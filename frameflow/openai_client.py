@@ -1,14 +1,18 @@
 #!/usr/bin/env python3
 
 import logging
-import time
 from openai import OpenAI
 from openai import APIError, RateLimitError
+from frameflow.client import BaseClient
 
 logger = logging.getLogger(__name__)
 
-class OpenAIClient:
-    def __init__(self, api_key=None, model="gpt-4o"):
+class OpenAIClient(BaseClient):
+    retryable_errors = (RateLimitError, APIError)
+    # 128k context, less room for the answer
+    max_prompt_tokens = 120000
+
+    def __init__(self, api_key=None, model="gpt-4o", stream=False):
         logger.info("Initializing OpenAI client")
         if api_key:
             self.client = OpenAI(api_key=api_key)
@@ -17,40 +21,33 @@ class OpenAIClient:
             self.client = OpenAI()
             logger.debug("OpenAI client configured using environment variable.")
         self.model = model
+        self.stream = stream
         logger.info(f"Using OpenAI model: {model}")
 
-    def summarize_chunk(self, chunk_text, retries=5, initial_wait=2, max_wait=60):
-        prompt = f"Summarize this chunk:\n\n{chunk_text}"
-        attempt = 0
-
-        while attempt < retries:
-            try:
-                response = self.client.chat.completions.create(
-                    model=self.model,
-                    messages=[{"role": "user", "content": prompt}]
-                )
-                summary = response.choices[0].message.content
-                logger.debug(f"Received summary from OpenAI: {summary}")
-                return summary
-
-            except RateLimitError:
-                wait_time = min(initial_wait * (2 ** attempt), max_wait)
-                logger.warning(f"⚠️ Rate limit exceeded. Retry {attempt + 1}/{retries} in {wait_time}s.")
-                time.sleep(wait_time)
-                attempt += 1
-
-            except APIError as e:
-                logger.error(f"OpenAI API error: {e}. Retry {attempt + 1}/{retries}.")
-                wait_time = min(initial_wait * (2 ** attempt), max_wait)
-                time.sleep(wait_time)
-                attempt += 1
-
-            except Exception as e:
-                logger.error(f"Unexpected error summarizing chunk: {e}")
-                break
+    def complete(self, prompt):
+        response = self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}]
+        )
+        usage = getattr(response, "usage", None)
+        if usage is not None:
+            self.record_usage(usage.prompt_tokens, usage.completion_tokens)
+        return response.choices[0].message.content
 
-        logger.error("❌ Exceeded maximum retries due to rate limits or persistent errors.")
-        return "Rate limit exceeded or error occurred repeatedly."
+    def complete_stream(self, prompt):
+        stream = self.client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": prompt}],
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        for chunk in stream:
+            # The last chunk has no choices, only the usage of the whole request
+            if chunk.usage is not None:
+                self.record_usage(chunk.usage.prompt_tokens, chunk.usage.completion_tokens)
+            for choice in chunk.choices:
+                if choice.delta.content:
+                    yield choice.delta.content
 
     def list_models(self):
         logger.info("✅ Available OpenAI models:")
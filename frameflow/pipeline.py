@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+import logging
+import queue
+import threading
+from concurrent.futures import Future
+
+from frameflow.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+
+
+class _Failure:
+    def __init__(self, error):
+        self.error = error
+
+
+def _put(q, item, stop):
+    # Blocks while the queue is full (back-pressure) but gives up once the consumer is gone
+    while not stop.is_set():
+        try:
+            q.put(item, timeout=0.1)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+
+class _ByteBudget:
+    # Caps the bytes held by items waiting in a queue; a single item larger than the
+    # whole budget is still let through so the pipeline cannot deadlock
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.used = 0
+        self.condition = threading.Condition()
+
+    def acquire(self, size, stop):
+        with self.condition:
+            while self.used and self.used + size > self.max_bytes and not stop.is_set():
+                self.condition.wait(0.1)
+            self.used += size
+        return not stop.is_set()
+
+    def release(self, size):
+        with self.condition:
+            self.used -= size
+            self.condition.notify_all()
+
+
+def threaded(iterable, maxsize=8, name="stage", max_bytes=None, size_of=None):
+    # Runs an iterable (typically a generator stage) on its own thread and hands items
+    # over through a bounded queue, so the producer keeps working while the consumer is
+    # busy. With max_bytes, size_of(item) bytes are also counted against a memory budget.
+    # Exceptions are re-raised in the consumer; if the consumer stops early the
+    # producer is closed so generators can release files and decoders.
+    q = queue.Queue(maxsize)
+    stop = threading.Event()
+    budget = _ByteBudget(max_bytes) if max_bytes else None
+
+    def worker():
+        try:
+            with metrics.profiled(name):
+                for item in iterable:
+                    if budget is not None and not budget.acquire(size_of(item), stop):
+                        break
+                    if not _put(q, item, stop):
+                        break
+                else:
+                    _put(q, _DONE, stop)
+        except BaseException as e:
+            _put(q, _Failure(e), stop)
+        finally:
+            close = getattr(iterable, "close", None)
+            if close is not None:
+                close()
+
+    thread = threading.Thread(target=worker, name=name, daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = q.get()
+            if item is _DONE:
+                break
+            if isinstance(item, _Failure):
+                logger.error(f"Pipeline stage '{name}' failed: {item.error}")
+                raise item.error
+            if budget is not None:
+                budget.release(size_of(item))
+            yield item
+    finally:
+        stop.set()
+        thread.join()
+
+
+def background(fn, *args, name="background"):
+    # Runs fn(*args) on a daemon thread and returns a Future for its result. Unlike a
+    # ThreadPoolExecutor, nothing waits for the thread: a run that fails (or is
+    # interrupted) elsewhere returns, and the process exits, without waiting on it.
+    future = Future()
+
+    def run():
+        if not future.set_running_or_notify_cancel():
+            return
+        try:
+            future.set_result(fn(*args))
+        except BaseException as e:
+            future.set_exception(e)
+
+    threading.Thread(target=run, name=name, daemon=True).start()
+    return future
@@ -1,79 +1,489 @@
 #!/usr/bin/env python3
 
+import json
 import logging
 import os
+import shutil
+import tempfile
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 import cv2
-import whisper
-import pytesseract
 
-from frameflow.openai_client import OpenAIClient
-from frameflow.claude_client import ClaudeClient
-from frameflow.gemini_client import GeminiClient
-from frameflow.local_llm_client import LocalLLMClient
+from frameflow.assets import DEFAULT_ASSET_FORMAT, DEFAULT_ASSET_QUALITY, AssetWriter
+from frameflow.scene_detection import DEFAULT_SCENE_THRESHOLDS, SceneDetector
+from frameflow.streaming import StreamLog
+from frameflow.decoder import FFmpegDecoder
+from frameflow.ocr import OCREngine, ocr_image
+from frameflow.transcript import SpilledTranscript, TranscriptIndex
+from frameflow.steps import Step, group_frames, map_chunk, reduce_steps
+from frameflow.prompts import DEFAULT_PROMPT_BUDGET, PromptBuilder
+from frameflow.transcription import (
+    DEFAULT_CHUNK_SECONDS, SAMPLE_RATE, audio_window_seconds, get_backend, iter_audio, load_audio,
+    transcribe_parallel,
+)
+from frameflow.client import RateLimiter, RetryPolicy, create_client
+from frameflow.pipeline import background, threaded
+from frameflow.metrics import metrics
+from frameflow.cache import Cache, cache_key, hash_file, DEFAULT_CACHE_DIR, DEFAULT_CACHE_MAX_MB
 
 logger = logging.getLogger(__name__)
 
-def extract_frames(video_path, output_dir, fps=None, smart_mode=False):
+# A kept frame: file name, path on disk, position in the video (seconds) and, while
+# streaming out of iter_frames, the decoded BGR image.
+ExtractedFrame = namedtuple("ExtractedFrame", ["name", "path", "timestamp", "image"])
+
+# Threads encoding and writing extracted frames off the decode thread
+FRAME_WRITERS = 2
+
+# Assumed when the container does not report a frame rate (some webm/mkv screen captures)
+FALLBACK_VIDEO_FPS = 30.0
+
+
+def frame_interval_for(video_fps, fps):
+    # Never 0: asking for more fps than the source has simply keeps every frame
+    # Halves round up; round() would take 25 fps at --fps 2 to every 12th frame (2.08 fps)
+    return max(1, int(video_fps / fps + 0.5))
+
+
+def check_extraction_settings(decode_mode="grab", decoder="opencv", keyframes_only=False, decode_width=None,
+                              decoder_scene_threshold=None, scene_method="pixel"):
+    # The option errors iter_frames would raise, checked before a run starts any work
+    if decoder != "ffmpeg" and (keyframes_only or decode_width or decoder_scene_threshold):
+        raise ValueError("Keyframe-only decoding, decode width and decoder scene threshold need --decoder ffmpeg")
+    if decode_mode not in ("grab", "seek"):
+        raise ValueError(f"Unknown decode mode: {decode_mode}")
+    if scene_method not in DEFAULT_SCENE_THRESHOLDS:
+        raise ValueError(f"Unknown scene detection method: {scene_method}")
+
+
+def read_frames(cap, frame_interval, decode_mode="grab", video_fps=FALLBACK_VIDEO_FPS, total_frames=0):
+    if decode_mode == "grab":
+        # grab() demuxes and decodes but skips the copy and colour conversion done by retrieve()
+        frame_index = 0
+        while cap.grab():
+            if frame_index % frame_interval == 0:
+                ret, frame = cap.retrieve()
+                if not ret:
+                    break
+                yield frame_index, frame
+            frame_index += 1
+    elif decode_mode == "seek":
+        # Jump straight to each wanted timestamp; pays off when the interval spans several GOPs
+        frame_index = 0
+        while total_frames <= 0 or frame_index < total_frames:
+            cap.set(cv2.CAP_PROP_POS_MSEC, frame_index * 1000.0 / video_fps)
+            ret, frame = cap.read()
+            if not ret:
+                break
+            yield frame_index, frame
+            frame_index += frame_interval
+    else:
+        raise ValueError(f"Unknown decode mode: {decode_mode}")
+
+
+def ffmpeg_frames(cap, video_path, frame_interval, video_fps, keyframes_only=False, decode_threads=0,
+                  decode_width=None, decoder_scene_threshold=None):
+    # Same (frame_index, frame) stream as read_frames, decoded by an ffmpeg subprocess
+    width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+    height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    cap.release()
+    # Half a frame of slack so rounding in container timestamps never skips a sample
+    sample_seconds = (frame_interval - 0.5) / video_fps if frame_interval > 1 else None
+    decoder = FFmpegDecoder(video_path, width, height, sample_seconds, keyframes_only, decode_threads,
+                            decode_width, decoder_scene_threshold)
+    for timestamp, frame in decoder.frames():
+        yield int(round(timestamp * video_fps)), frame
+
+
+def frame_allowance(max_bytes, timestamp, duration=None, head_start=0.1):
+    # Bytes of frames allowed on disk by this point of the video. A small head start lets the
+    # opening scenes through; without a known duration the budget is a plain cap.
+    if not duration:
+        return max_bytes
+    return max_bytes * min(1.0, head_start + timestamp / duration)
+
+
+def write_frame(image, filename):
+    # Runs on the writer pool: cv2.imencode releases the GIL, so decoding carries on meanwhile
+    with metrics.timer("jpeg_write", items=1) as timer:
+        _, encoded = cv2.imencode(".jpg", image)
+        with open(filename, "wb") as f:
+            f.write(encoded.tobytes())
+        timer.add(bytes=encoded.size)
+    return encoded.size
+
+
+def iter_frames(video_path, output_dir, fps=None, smart_mode=False, scene_method="pixel",
+                scene_threshold=None, hash_threshold=6, dedup_window=8, decode_mode="grab", decoder="opencv",
+                keyframes_only=False, decode_threads=0, decode_width=None, decoder_scene_threshold=None,
+                max_frame_bytes=None):
+    check_extraction_settings(decode_mode, decoder, keyframes_only, decode_width, decoder_scene_threshold, scene_method)
     logger.info("Extracting frames...")
     os.makedirs(output_dir, exist_ok=True)
     cap = cv2.VideoCapture(video_path)
     video_fps = cap.get(cv2.CAP_PROP_FPS)
     total_frames = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+    if not video_fps or video_fps <= 0:
+        logger.warning(f"Video reports no frame rate, assuming {FALLBACK_VIDEO_FPS} fps")
+        video_fps = FALLBACK_VIDEO_FPS
 
+    detector = None
     if smart_mode:
-        logger.info("Smart mode enabled: extracting all frames for analysis")
+        logger.info("Smart mode enabled: scanning every frame for scene changes")
         frame_interval = 1
+        detector = SceneDetector(scene_method, scene_threshold, hash_threshold, dedup_window)
     elif fps:
-        frame_interval = int(video_fps / fps)
+        frame_interval = frame_interval_for(video_fps, fps)
     else:
-        frame_interval = int(video_fps)  # default to 1 fps
+        # Sample candidates at 1 fps and keep only the visually distinct ones
+        logger.info("No FPS set: extracting frames on scene change")
+        frame_interval = frame_interval_for(video_fps, 1.0)
+        detector = SceneDetector(scene_method, scene_threshold, hash_threshold, dedup_window)
 
-    frame_count = 0
+    decoded_count = 0
+    submitted = 0
     saved_count = 0
+    saved_bytes = 0
+    over_budget = 0
+    # A disk budget is spread evenly over the video so late steps still get their frames
+    duration = total_frames / video_fps if total_frames > 0 else None
+    # Frames being encoded and written, oldest first; each is passed on once its file is complete
+    writing = deque()
+    writer = ThreadPoolExecutor(max_workers=FRAME_WRITERS, thread_name_prefix="frame-writer")
 
-    while True:
-        ret, frame = cap.read()
-        if not ret:
-            break
-        if frame_count % frame_interval == 0:
-            filename = os.path.join(output_dir, f"frame_{saved_count:05d}.jpg")
-            cv2.imwrite(filename, frame)
-            saved_count += 1
-        frame_count += 1
+    def written():
+        nonlocal saved_count, saved_bytes, over_budget
+        frame, future = writing.popleft()
+        size = future.result()
+        if max_frame_bytes and saved_bytes + size > frame_allowance(max_frame_bytes, frame.timestamp, duration):
+            over_budget += 1
+            os.remove(frame.path)
+            return None
+        saved_count += 1
+        saved_bytes += size
+        return frame
 
-    cap.release()
-    logger.info(f"Extracted {saved_count} frames to {output_dir}")
+    if decoder == "ffmpeg":
+        source = ffmpeg_frames(cap, video_path, frame_interval, video_fps, keyframes_only, decode_threads,
+                               decode_width, decoder_scene_threshold)
+    else:
+        source = read_frames(cap, frame_interval, decode_mode, video_fps, total_frames)
+    decoded = metrics.timed_iter("decode", source)
+    try:
+        for frame_index, frame in decoded:
+            decoded_count += 1
+            if detector is not None:
+                with metrics.timer("scene_detection", items=1):
+                    keep = detector.should_keep(frame)
+                if not keep:
+                    continue
+            name = f"frame_{submitted:05d}.jpg"
+            filename = os.path.join(output_dir, name)
+            submitted += 1
+            writing.append((ExtractedFrame(name, filename, frame_index / video_fps, frame),
+                            writer.submit(write_frame, frame, filename)))
+            # Decoding only waits once every writer is busy with a frame queued behind it
+            if len(writing) > 2 * FRAME_WRITERS:
+                kept = written()
+                if kept is not None:
+                    yield kept
+        while writing:
+            kept = written()
+            if kept is not None:
+                yield kept
+    finally:
+        # Stops an ffmpeg decoder right away when the consumer gives up early
+        source.close()
+        cap.release()
+        writer.shutdown(wait=True)
+    logger.info(f"Extracted {saved_count} frames to {output_dir} (decoded {decoded_count}/{total_frames})")
+    if over_budget:
+        logger.warning(f"⚠️ Skipped {over_budget} scene changes to stay within the frames disk budget")
+        metrics.increment("frames_over_budget", over_budget)
+
+
+def extract_frames(video_path, output_dir, fps=None, smart_mode=False, scene_method="pixel",
+                   scene_threshold=None, hash_threshold=6, dedup_window=8, decode_mode="grab", **decoder_options):
+    frames = iter_frames(video_path, output_dir, fps, smart_mode, scene_method, scene_threshold,
+                         hash_threshold, dedup_window, decode_mode, **decoder_options)
+    # Pixel data is dropped so the returned list stays small; use iter_frames to consume images
+    return [frame._replace(image=None) for frame in frames]
 
-def analyze_frame(frame_path):
+def load_cached_frames(cache, key, output_dir):
+    entry = cache.get_dir("frames", key)
+    if entry is None:
+        return None
+    with open(os.path.join(entry, "manifest.json"), "r") as f:
+        manifest = json.load(f)
+    os.makedirs(output_dir, exist_ok=True)
+    frames = []
+    for name, timestamp in manifest:
+        path = os.path.join(output_dir, name)
+        shutil.copyfile(os.path.join(entry, name), path)
+        frames.append(ExtractedFrame(name, path, timestamp, None))
+    logger.info(f"Loaded {len(frames)} cached frames into {output_dir}")
+    return frames
+
+def cache_frames(cache, key, frames):
+    # Passes frames through unchanged; the entry is only published once the video is
+    # fully extracted, so an interrupted extraction is simply redone on the next run.
+    staging = cache.new_dir("frames")
+    manifest = []
+    published = False
+    try:
+        for frame in frames:
+            shutil.copyfile(frame.path, os.path.join(staging, frame.name))
+            manifest.append([frame.name, frame.timestamp])
+            yield frame
+        with open(os.path.join(staging, "manifest.json"), "w") as f:
+            json.dump(manifest, f)
+        cache.put_dir("frames", key, staging)
+        published = True
+    finally:
+        if not published:
+            shutil.rmtree(staging, ignore_errors=True)
+
+def analyze_frame(frame, grayscale=False, scale=1.0, binarize=False):
     image_text = ""
     try:
-        image_text = pytesseract.image_to_string(frame_path)
+        image_text = ocr_image(frame, grayscale, scale, binarize)
     except Exception as e:
-        logger.warning(f"OCR failed for {frame_path}: {e}")
+        logger.warning(f"OCR failed for {frame if isinstance(frame, str) else 'in-memory frame'}: {e}")
     return image_text.strip()
 
-def transcribe_audio(video_path, model_name="large"):
-    logger.info("Transcribing audio with Whisper...")
-    model = whisper.load_model(model_name)
-    result = model.transcribe(video_path)
-    transcript = result['text']
-    logger.info("Transcription complete.")
-    return transcript
-
-def get_client(client_name, client_token, client_model):
-    if client_name == "openai":
-        return OpenAIClient(api_key=client_token, model=client_model)
-    elif client_name == "claude":
-        return ClaudeClient(api_key=client_token, model=client_model)
-    elif client_name == "gemini":
-        return GeminiClient(api_key=client_token, model=client_model)
-    elif client_name == "local":
-        return LocalLLMClient(model=client_model)
+def transcribe_segments(video_path, model_name="large", backend="whisper", device=None, compute_type=None,
+                        workers=1, chunk_seconds=DEFAULT_CHUNK_SECONDS, window_seconds=None):
+    logger.info(f"Transcribing audio with {backend}...")
+    if window_seconds:
+        # Bounded mode: audio is decoded and transcribed one window at a time, so the
+        # transcription time below includes decoding
+        windows = metrics.timed_iter("audio_decode", iter_audio(video_path, window_seconds))
     else:
-        raise ValueError(f"Unknown client: {client_name}")
+        with metrics.timer("audio_decode", items=1) as timer:
+            audio = load_audio(video_path)
+            timer.add(bytes=audio.nbytes)
+        windows = [(0.0, audio)]
+    segments = []
+    with metrics.timer("transcription") as timer:
+        for offset, audio in windows:
+            # Splitting only pays off once there are at least two chunks per worker
+            if workers > 1 and len(audio) > 2 * chunk_seconds * SAMPLE_RATE:
+                window_segments = transcribe_parallel(audio, backend, model_name, workers, chunk_seconds,
+                                                      device=device, compute_type=compute_type)
+            else:
+                model = get_backend(backend, model_name, device=device, compute_type=compute_type)
+                window_segments = model.transcribe(audio)
+            segments.extend(
+                dict(segment, start=segment["start"] + offset, end=segment["end"] + offset) if offset else segment
+                for segment in window_segments
+            )
+        timer.add(items=len(segments))
+    logger.info(f"Transcription complete: {len(segments)} segments.")
+    return segments
+
+def transcribe_audio(video_path, model_name="large", backend="whisper", device=None, compute_type=None, workers=1,
+                     chunk_seconds=DEFAULT_CHUNK_SECONDS):
+    return TranscriptIndex(
+        transcribe_segments(video_path, model_name, backend, device, compute_type, workers, chunk_seconds)
+    ).text
+
+def get_client(client_name, client_token, client_model, client_options=None):
+    return create_client(client_name, api_key=client_token, model=client_model, **(client_options or {}))
+
+
+def build_client(client_name, client_token, client_model, llm_retries=5, requests_per_minute=None,
+                 tokens_per_minute=None, client_options=None):
+    client = get_client(client_name, client_token, client_model, client_options)
+    client.retry_policy = RetryPolicy(retries=llm_retries)
+    if requests_per_minute or tokens_per_minute:
+        client.rate_limiter = RateLimiter(requests_per_minute, tokens_per_minute)
+    return client
+
+
+def extraction_settings(fps=None, fps_smart_mode=False, scene_method="pixel", scene_threshold=None, hash_threshold=6,
+                        dedup_window=8, decode_mode="grab", decoder="opencv", keyframes_only=False, decode_threads=0,
+                        decode_width=None, decoder_scene_threshold=None, max_disk_mb=None):
+    # iter_frames keyword arguments; also the frames cache key
+    settings = {
+        "fps": fps, "smart_mode": fps_smart_mode, "scene_method": scene_method,
+        "scene_threshold": scene_threshold, "hash_threshold": hash_threshold,
+        "dedup_window": dedup_window, "decode_mode": decode_mode,
+    }
+    if decoder != "opencv":
+        # Keeps the cache keys of existing OpenCV extractions unchanged
+        settings.update(decoder=decoder, keyframes_only=keyframes_only, decode_threads=decode_threads,
+                        decode_width=decode_width, decoder_scene_threshold=decoder_scene_threshold)
+    if max_disk_mb:
+        settings.update(max_frame_bytes=int(max_disk_mb * 1024 * 1024))
+    return settings
+
+
+def transcription_settings(whisper_model="large", transcription_backend="whisper", transcription_device=None,
+                           compute_type=None, transcription_workers=1,
+                           transcription_chunk_seconds=DEFAULT_CHUNK_SECONDS, max_memory_mb=None):
+    # transcribe_segments keyword arguments; also the transcript cache key
+    settings = {
+        "model_name": whisper_model, "backend": transcription_backend,
+        "device": transcription_device, "compute_type": compute_type,
+    }
+    if transcription_workers > 1:
+        # Chunked transcripts differ slightly at the seams, so they are cached separately
+        settings.update(workers=transcription_workers, chunk_seconds=transcription_chunk_seconds)
+    if max_memory_mb:
+        # Decoded audio gets an eighth of the memory cap; windowed transcripts are cached
+        # separately for the same reason as chunked ones
+        settings.update(window_seconds=round(audio_window_seconds(max_memory_mb * 1024 * 1024 // 8), 1))
+    return settings
+
+
+def load_transcript_segments(input_file, transcription_options, cache=None, video_hash=None):
+    if cache is not None:
+        transcript_key = cache_key("transcript", video_hash, transcription_options)
+        segments = cache.get_json("transcripts", transcript_key)
+        if segments is not None:
+            logger.info("Loaded cached transcript.")
+            return segments
+    segments = transcribe_segments(input_file, **transcription_options)
+    if cache is not None:
+        cache.put_json("transcripts", transcript_key, segments)
+    return segments
+
+
+def load_transcript(input_file, transcription_options, cache=None, video_hash=None, spill_dir=None):
+    segments = load_transcript_segments(input_file, transcription_options, cache, video_hash)
+    if spill_dir is None:
+        return TranscriptIndex(segments)
+    return SpilledTranscript(segments, spill_dir)
+
+
+def image_bytes(frame):
+    return frame.image.nbytes if frame.image is not None else 0
 
 
-def process_video(input_file, output, fps, whisper_model, fps_smart_mode, transcribe, client_name, client_token, client_model):
+def without_images(ocr_results):
+    # OCR is the last stage that needs pixels; frames waiting for their summary keep only the file
+    for frame, text in ocr_results:
+        yield frame._replace(image=None), text
+
+
+def frame_source(input_file, frames_dir, extract_options, cache=None, video_hash=None):
+    if cache is None:
+        return iter_frames(input_file, frames_dir, **extract_options)
+    if extract_options.get("max_frame_bytes"):
+        # cache_frames keeps a second copy of every kept frame; both share the disk budget
+        extract_options = dict(extract_options, max_frame_bytes=extract_options["max_frame_bytes"] // 2)
+    frames_key = cache_key("frames", video_hash, extract_options)
+    frames = load_cached_frames(cache, frames_key, frames_dir)
+    if frames is not None:
+        return iter(frames)
+    return cache_frames(cache, frames_key, iter_frames(input_file, frames_dir, **extract_options))
+
+
+def frame_markdown(frame, frames_link, assets=None):
+    # Without an asset stage the extracted frame is linked where it is
+    if assets is not None:
+        return assets.add(frame)
+    return f"![{frame.name}]({frames_link}/{frame.name})"
+
+
+def write_frame_howto(client, ocr_results, transcript_future, output, frames_link, llm_concurrency=4,
+                      transcript_window=30.0, builder=None, assets=None, stream_log=None):
+    # One step per frame. Frames waiting for their summary, oldest first; summaries arrive in the same order
+    pending_frames = deque()
+    builder = builder or PromptBuilder(client.token_counter, budget=None, dedup=False)
+
+    def chunks():
+        transcript = None
+        for frame, ocr_text in ocr_results:
+            if transcript is None:
+                transcript = transcript_future.result()
+            pending_frames.append(frame)
+            # Only the narration around this frame; the full transcript would be resent for every step
+            transcript_text = transcript.window(frame.timestamp, transcript_window)
+            yield builder.build(ocr_text, transcript_text)
+
+    logger.info(f"Summarizing frames as OCR completes ({llm_concurrency} concurrent requests)...")
+    with open(output, "w") as f:
+        f.write("# FrameFlow How-To Documentation\n\n")
+        for idx, summary in enumerate(client.summarize_chunks(chunks(), llm_concurrency, stream_log), start=1):
+            frame = pending_frames.popleft()
+            f.write(f"## Step {idx}\n")
+            f.write(frame_markdown(frame, frames_link, assets) + "\n\n")
+            f.write(summary + "\n\n")
+            # Each step is on disk as soon as its summary arrives
+            f.flush()
+
+
+def narrated_frames(ocr_results, transcript_future):
+    # Pairs each frame with the narration that starts while it is on screen, i.e. until
+    # the next kept frame, so a step's narration is never repeated across frames
+    transcript = None
+    previous = None
+    start = float("-inf")
+    for frame, ocr_text in ocr_results:
+        if transcript is None:
+            transcript = transcript_future.result()
+        if previous is not None:
+            yield previous[0], previous[1], transcript.starting_between(start, frame.timestamp)
+            start = frame.timestamp
+        previous = (frame, ocr_text)
+    if previous is not None:
+        yield previous[0], previous[1], transcript.starting_between(start, float("inf"))
+
+
+def write_hierarchical_howto(client, frames, output, frames_link, llm_concurrency=4, step_similarity=0.5,
+                             max_frames_per_step=8, reduce_size=20, builder=None, assets=None, stream_log=None):
+    # Map: one request per group of similar adjacent frames. Reduce: merge and reorder the
+    # drafts in windows of reduce_size. Requests scale with steps, not frames.
+    # Only the frame shown for each candidate step is kept, not its OCR text and narration
+    shown_frames = []
+    frame_count = 0
+
+    def chunks():
+        nonlocal frame_count
+        for step in group_frames(frames, step_similarity, max_frames_per_step):
+            # The last frame of a group shows the screen once the step is done
+            shown_frames.append(step.frames[-1])
+            frame_count += len(step.frames)
+            yield map_chunk(step, builder)
+
+    logger.info(f"Summarizing candidate steps as OCR completes ({llm_concurrency} concurrent requests)...")
+    drafts = list(client.summarize_chunks(chunks(), llm_concurrency, stream_log, "draft"))
+    logger.info(f"🧩 Grouped {frame_count} frames into {len(drafts)} candidate steps")
+    if len(drafts) > 1:
+        steps = reduce_steps(client, drafts, reduce_size, llm_concurrency, stream_log)
+    else:
+        steps = [Step("", draft, [index]) for index, draft in enumerate(drafts)]
+    logger.info(f"Merged into {len(steps)} steps")
+
+    with open(output, "w") as f:
+        f.write("# FrameFlow How-To Documentation\n\n")
+        for idx, step in enumerate(steps, start=1):
+            f.write(f"## Step {idx}: {step.title}\n" if step.title else f"## Step {idx}\n")
+            for source in step.sources:
+                f.write(frame_markdown(shown_frames[source], frames_link, assets) + "\n\n")
+            f.write(step.text + "\n\n")
+
+
+def close_transcript(future):
+    if not future.cancelled() and future.exception() is None:
+        future.result().close()
+
+
+def process_video(input_file, output, fps, whisper_model, fps_smart_mode, transcribe, client_name, client_token, client_model,
+                  scene_method="pixel", scene_threshold=None, hash_threshold=6, dedup_window=8,
+                  decode_mode="grab", decoder="opencv", keyframes_only=False, decode_threads=0, decode_width=None,
+                  decoder_scene_threshold=None, ocr_workers=None, ocr_grayscale=False, ocr_scale=1.0, ocr_binarize=False,
+                  ocr_incremental=False, transcript_window=30.0, llm_concurrency=4, requests_per_minute=None,
+                  tokens_per_minute=None, llm_retries=5, cache_dir=DEFAULT_CACHE_DIR, cache_max_mb=DEFAULT_CACHE_MAX_MB,
+                  queue_size=8, prompt_budget=DEFAULT_PROMPT_BUDGET, ocr_dedup=True,
+                  transcription_backend="whisper", transcription_device=None, compute_type=None,
+                  transcription_workers=1, transcription_chunk_seconds=DEFAULT_CHUNK_SECONDS, client_options=None,
+                  summary_mode="frame", step_similarity=0.5, max_frames_per_step=8, max_memory_mb=None, max_disk_mb=None,
+                  assets_dir=None, asset_format=DEFAULT_ASSET_FORMAT, asset_quality=DEFAULT_ASSET_QUALITY,
+                  asset_max_width=None, thumbnail_width=None, stream_log=None, work_dir=None, client=None, ocr_engine=None,
+                  cache=None):
     logger.info(f"Processing: {input_file}")
     logger.info(f"Output: {output}")
     logger.info(f"Whisper Model: {whisper_model}")
@@ -81,41 +491,112 @@ def process_video(input_file, output, fps, whisper_model, fps_smart_mode, transc
     logger.info(f"Client: {client_name}")
     logger.info(f"Client Model: {client_model}")
 
-    # Initialize AI client
-    client = get_client(client_name, client_token, client_model)
-
-    # Step 1: Extract frames
-    frames_dir = "frames"
-    extract_frames(input_file, frames_dir, fps, fps_smart_mode)
-
-    # Step 2: Analyze frames with OCR
-    logger.info("Analyzing frames with OCR...")
-    frame_texts = {}
-    for frame_file in sorted(os.listdir(frames_dir)):
-        frame_path = os.path.join(frames_dir, frame_file)
-        ocr_text = analyze_frame(frame_path)
-        frame_texts[frame_file] = ocr_text
-
-    # Step 3: Transcribe audio
-    transcript = transcribe_audio(input_file, whisper_model)
-
-    if transcribe:
-        with open(output, "w") as f:
-            f.write("# FrameFlow Transcript Output\n\n")
-            f.write(transcript)
-        logger.info(f"Transcript saved to {output}")
-        return
-
-    # Step 4: Summarize each frame + transcript chunk
-    logger.info("Summarizing frames and transcription...")
-    with open(output, "w") as f:
-        f.write("# FrameFlow How-To Documentation\n\n")
-        for idx, (frame_file, ocr_text) in enumerate(frame_texts.items(), start=1):
-            combined_input = f"OCR Text:\n{ocr_text}\n\nTranscript:\n{transcript}\n\n"
-            summary = client.summarize_chunk(combined_input)
-            f.write(f"## Step {idx}\n")
-            f.write(f"![{frame_file}](frames/{frame_file})\n\n")
-            f.write(summary + "\n\n")
+    # Initialize AI client, unless the caller (e.g. a batch) shares one across videos
+    if client is None:
+        client = build_client(client_name, client_token, client_model, llm_retries, requests_per_minute,
+                              tokens_per_minute, client_options)
 
-    logger.info(f"How-To Markdown file generated at: {output}")
+    # Content-addressed cache: every stage below is skipped when its inputs were seen before,
+    # which is also how an interrupted run resumes. A cache shared by the caller (a batch)
+    # is evicted by the caller once no job can be reading from it.
+    owns_cache = cache is None
+    if cache is None and cache_dir:
+        cache = Cache(cache_dir, cache_max_mb * 1024 * 1024)
+        cache.evict()
+    video_hash = None
+    if cache is not None:
+        video_hash = cache.file_digest(input_file)
+        client.cache = cache
+
+    # Bounded mode: decoded frames waiting between stages share half the memory cap, OCR
+    # results queue up only so far ahead of the LLM (which in turn holds back decoding),
+    # and the transcript is queried from disk instead of memory
+    frame_buffer_bytes = max_memory_mb * 1024 * 1024 // 2 if max_memory_mb else None
+    # Frames in flight to OCR (and their pickled copies) get a quarter
+    ocr_window_bytes = max_memory_mb * 1024 * 1024 // 4 if max_memory_mb else None
+    ocr_queue_size = queue_size * 4 if max_memory_mb else 0
+    spill_dir = (work_dir or os.path.dirname(os.path.abspath(output))) if max_memory_mb else None
+    if max_memory_mb or max_disk_mb:
+        logger.info(f"Bounded mode: memory cap {max_memory_mb or '-'} MB, frames disk cap {max_disk_mb or '-'} MB")
+
+    # Transcription needs nothing from the frame stages, so it runs alongside them
+    transcription_options = transcription_settings(whisper_model, transcription_backend, transcription_device,
+                                                   compute_type, transcription_workers, transcription_chunk_seconds,
+                                                   max_memory_mb)
+    extract_options = extraction_settings(fps, fps_smart_mode, scene_method, scene_threshold, hash_threshold,
+                                          dedup_window, decode_mode, decoder, keyframes_only, decode_threads,
+                                          decode_width, decoder_scene_threshold, max_disk_mb)
+    if not transcribe:
+        check_extraction_settings(decode_mode, decoder, keyframes_only, decode_width, decoder_scene_threshold,
+                                  scene_method)
+    transcript_future = background(load_transcript, input_file, transcription_options, cache, video_hash, spill_dir,
+                                   name="transcribe")
+    assets = None
+    scratch_dir = None
+    log = None
+    try:
+        if transcribe:
+            with open(output, "w") as f:
+                f.write("# FrameFlow Transcript Output\n\n")
+                f.write(transcript_future.result().text)
+            logger.info(f"Transcript saved to {output}")
+            return
+
+        # Decode -> OCR -> summarize -> write, each stage on its own thread(s). Decoded
+        # images travel through a bounded queue; OCR output is only text, so by default
+        # that queue is unbounded and OCR never waits on a slow transcription or LLM.
+        output_dir = os.path.dirname(os.path.abspath(output))
+        if assets_dir:
+            # The asset stage writes the images the document links to (relative to the output
+            # file); extracted frames are then only scratch files for OCR
+            assets_dir = os.path.join(output_dir, assets_dir)
+            assets = AssetWriter(assets_dir, os.path.relpath(assets_dir, output_dir), asset_format, asset_quality,
+                                 asset_max_width, thumbnail_width)
+            frames_dir = scratch_dir = tempfile.mkdtemp(prefix="frames-", dir=work_dir or output_dir)
+        else:
+            frames_dir = os.path.join(work_dir, "frames") if work_dir else "frames"
+        frames_link = os.path.relpath(frames_dir, output_dir)
+        if stream_log:
+            # LLM output as it arrives, next to the output file unless the path is absolute
+            log = StreamLog(os.path.join(output_dir, stream_log))
+        frames = threaded(frame_source(input_file, frames_dir, extract_options, cache, video_hash), queue_size,
+                          "decode", frame_buffer_bytes, image_bytes)
 
+        if ocr_engine is None:
+            ocr_engine = OCREngine(ocr_workers, ocr_grayscale, ocr_scale, ocr_binarize, cache, ocr_incremental)
+            engine_context = ocr_engine
+        else:
+            engine_context = nullcontext(ocr_engine)
+        with engine_context as engine:
+            def image_of(frame):
+                return frame.path if frame.image is None else frame.image
+
+            def key_of(frame):
+                return hash_file(frame.path)
+
+            recognized = engine.map(frames, image_of, key_of, ocr_window_bytes, image_bytes)
+            ocr_results = threaded(without_images(recognized), ocr_queue_size, "ocr")
+
+            # Counts tokens for the client's model; prompts must be built in step order for dedup
+            builder = PromptBuilder(client.token_counter, prompt_budget, ocr_dedup)
+            if summary_mode == "hierarchical":
+                write_hierarchical_howto(client, narrated_frames(ocr_results, transcript_future), output,
+                                         frames_link, llm_concurrency, step_similarity, max_frames_per_step,
+                                         builder=builder, assets=assets, stream_log=log)
+            else:
+                write_frame_howto(client, ocr_results, transcript_future, output, frames_link, llm_concurrency,
+                                  transcript_window, builder, assets, log)
+    finally:
+        if log is not None:
+            log.close()
+        if assets is not None:
+            assets.close()
+        if scratch_dir is not None:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+        # A failed run does not wait for the transcription; a spilled transcript removes
+        # its file once it is finished, now or later
+        transcript_future.add_done_callback(close_transcript)
+
+    if cache is not None and owns_cache:
+        cache.evict()
+    logger.info(f"How-To Markdown file generated at: {output}")
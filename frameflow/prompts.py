@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+
+import logging
+import threading
+from collections import OrderedDict
+
+from frameflow.client import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_PROMPT_BUDGET = 3000
+TRUNCATION_MARKER = "\n[...]\n"
+
+# tiktoken encodings are loaded (and on first use downloaded) once per process
+_ENCODINGS = {}
+_ENCODINGS_LOCK = threading.Lock()
+
+
+def _encoding_for(model):
+    with _ENCODINGS_LOCK:
+        if model not in _ENCODINGS:
+            encoding = None
+            try:
+                import tiktoken
+                try:
+                    encoding = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    # Not an OpenAI model; cl100k is a close enough proxy for other BPE tokenizers
+                    encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:
+                logger.warning(f"⚠️ No tokenizer for {model} ({e}); estimating token counts from length")
+            _ENCODINGS[model] = encoding
+        return _ENCODINGS[model]
+
+
+class TokenCounter:
+    # Counts and truncates by the target model's tokens; falls back to a length estimate
+    # when tiktoken or its encoding files are unavailable (e.g. offline)
+    def __init__(self, model=None):
+        self.encoding = _encoding_for(str(model or "gpt-4o"))
+
+    def count(self, text):
+        if not text:
+            return 0
+        if self.encoding is None:
+            return estimate_tokens(text)
+        return len(self.encoding.encode(text, disallowed_special=()))
+
+    def truncate(self, text, max_tokens, keep="head"):
+        # keep: "head" drops the end, "tail" drops the start, "middle" keeps both ends
+        if max_tokens is None or self.count(text) <= max_tokens:
+            return text
+        max_tokens = max(0, max_tokens - self.count(TRUNCATION_MARKER))
+        if self.encoding is None:
+            pieces, limit, decode = text, max_tokens * 4, str
+        else:
+            pieces, limit, decode = self.encoding.encode(text, disallowed_special=()), max_tokens, self.encoding.decode
+        head = {"head": limit, "tail": 0}.get(keep, limit // 2)
+        tail = limit - head
+        return decode(pieces[:head]) + TRUNCATION_MARKER + decode(pieces[len(pieces) - tail:] if tail else pieces[:0])
+
+
+class PromptBuilder:
+    # Builds the per-step chunk text. OCR lines already sent in an earlier prompt (menus,
+    # toolbars, unchanged code) are dropped, then OCR and transcript are packed into a
+    # token budget. Chunks must be built in step order, since each one depends on what
+    # earlier ones sent.
+    def __init__(self, counter=None, budget=DEFAULT_PROMPT_BUDGET, dedup=True, min_line_chars=4,
+                 history_lines=5000):
+        self.counter = counter or TokenCounter()
+        self.budget = budget
+        self.dedup = dedup
+        # Short lines ("}", "$", "OK") are kept: they carry meaning only in context
+        self.min_line_chars = min_line_chars
+        self.history_lines = history_lines
+        self.seen = OrderedDict()
+
+    @staticmethod
+    def _key(line):
+        # Lines are compared with whitespace collapsed, so OCR spacing jitter still counts
+        # as a repeat; the emitted line keeps its own spacing
+        return " ".join(line.split())
+
+    def _is_repeat(self, line):
+        key = self._key(line)
+        return self.dedup and len(key) >= self.min_line_chars and key in self.seen
+
+    def _remember(self, line):
+        key = self._key(line)
+        if not self.dedup or len(key) < self.min_line_chars:
+            return
+        self.seen[key] = True
+        self.seen.move_to_end(key)
+        while len(self.seen) > self.history_lines:
+            self.seen.popitem(last=False)
+
+    def pack_lines(self, text, budget=None):
+        lines = []
+        used = 0
+        dropped = 0
+        for raw in text.splitlines():
+            # Only trailing whitespace is dropped: leading indentation is structure in code
+            line = raw.rstrip()
+            if not line:
+                # A run of blank lines becomes one, and none are kept at the start
+                if lines and lines[-1]:
+                    lines.append(line)
+                    used += 1
+                continue
+            if self._is_repeat(line):
+                continue
+            tokens = self.counter.count(line) + 1
+            if budget is not None and used + tokens > budget:
+                dropped += 1
+                continue
+            lines.append(line)
+            used += tokens
+        while lines and not lines[-1]:
+            lines.pop()
+        for line in lines:
+            self._remember(line)
+        if dropped:
+            logger.debug(f"Prompt budget: dropped {dropped} OCR lines")
+        return "\n".join(lines)
+
+    def build(self, ocr_text, transcript_text):
+        template = "OCR Text:\n{ocr}\n\nTranscript:\n{transcript}\n\n"
+        if not self.budget:
+            return template.format(ocr=self.pack_lines(ocr_text), transcript=transcript_text)
+        budget = max(0, self.budget - self.counter.count(template.format(ocr="", transcript="")))
+        # The transcript may take up to half; OCR gets the rest and the transcript any leftover
+        reserved = min(self.counter.count(transcript_text), budget // 2)
+        ocr = self.pack_lines(ocr_text, budget - reserved)
+        transcript_budget = budget - self.counter.count(ocr)
+        # Token counts of the parts don't add up exactly to the count of the whole
+        for _ in range(3):
+            transcript = self.counter.truncate(transcript_text, max(0, transcript_budget), keep="middle")
+            prompt = template.format(ocr=ocr, transcript=transcript)
+            excess = self.counter.count(prompt) - self.budget
+            if excess <= 0:
+                break
+            transcript_budget -= excess
+        return prompt
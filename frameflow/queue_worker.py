@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+
+import json
+import logging
+import os
+import socket
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+
+from frameflow.assets import DEFAULT_ASSET_FORMAT, DEFAULT_ASSET_QUALITY, AssetWriter
+from frameflow.batch import discover_jobs, job_work_dir
+from frameflow.cache import DEFAULT_CACHE_DIR, DEFAULT_CACHE_MAX_MB, Cache, hash_file
+from frameflow.metrics import metrics
+from frameflow.ocr import OCREngine
+from frameflow.processor import (
+    ExtractedFrame, build_client, extraction_settings, frame_source, load_transcript_segments, narrated_frames,
+    transcription_settings, write_frame_howto, write_hierarchical_howto,
+)
+from frameflow.prompts import DEFAULT_PROMPT_BUDGET, PromptBuilder
+from frameflow.streaming import StreamLog
+from frameflow.transcript import TranscriptIndex
+from frameflow.workqueue import DEFAULT_CACHE, STAGES
+
+logger = logging.getLogger(__name__)
+
+
+def submit_jobs(queue, source, output_dir, options):
+    # Same discovery and work-directory layout as batch mode; the work directories must be
+    # on storage every worker can reach
+    job_ids = []
+    for job in discover_jobs(source):
+        input_file = os.path.abspath(job["input"])
+        work_dir = os.path.abspath(job_work_dir(output_dir, input_file))
+        os.makedirs(work_dir, exist_ok=True)
+        output = os.path.abspath(job.get("output") or os.path.join(work_dir, "howto.md"))
+        job_ids.append(queue.submit(input_file, output, work_dir, options))
+    return job_ids
+
+
+class _Heartbeat:
+    # Renews a task's lease in the background while it runs
+    def __init__(self, queue, task, worker):
+        self.queue = queue
+        self.task = task
+        self.worker = worker
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self.run, name="heartbeat", daemon=True)
+
+    def run(self):
+        while not self.stop.wait(self.queue.lease_seconds / 3):
+            try:
+                self.queue.heartbeat(self.task, self.worker)
+            except sqlite3.Error as e:
+                logger.warning(f"⚠️ Heartbeat for task {self.task['id']} failed: {e}")
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop.set()
+        self.thread.join()
+
+
+class QueueWorker:
+    # Runs tasks of the given stages one at a time. Heavy resources (OCR process pool, LLM
+    # clients, transcription models via the process-wide backend cache) are created on first
+    # use and kept for the worker's lifetime.
+    def __init__(self, queue, stages=STAGES, client_token=None, ocr_workers=None, poll_seconds=2.0, name=None,
+                 cache_dir=None):
+        self.queue = queue
+        # Replaces the cache directory of jobs submitted with a cache
+        self.cache_dir = cache_dir
+        self.stages = tuple(stages)
+        self.client_token = client_token
+        self.ocr_workers = ocr_workers
+        self.poll_seconds = poll_seconds
+        self.name = name or f"{socket.gethostname()}:{os.getpid()}"
+        self.engines = {}
+        self.clients = {}
+        self.caches = {}
+
+    def run(self, exit_when_idle=False, max_tasks=None):
+        logger.info(f"Worker {self.name} serving stages: {', '.join(self.stages)}")
+        done = 0
+        try:
+            while max_tasks is None or done < max_tasks:
+                task = self.queue.claim(self.stages, self.name)
+                if task is None:
+                    if exit_when_idle and self.queue.idle(self.stages):
+                        logger.info("Queue drained; worker exiting")
+                        break
+                    time.sleep(self.poll_seconds)
+                    continue
+                self.run_task(task)
+                done += 1
+                # Between tasks only: evicting during one could drop entries it is about to read
+                for cache in self.caches.values():
+                    cache.evict()
+        finally:
+            self.close()
+        return done
+
+    def run_task(self, task):
+        logger.info(f"▶️ Task {task['id']}: {task['kind']} for {task['job']['input']} (attempt {task['attempts']})")
+        try:
+            with _Heartbeat(self.queue, task, self.name), metrics.timer(f"task_{task['kind']}", items=1):
+                result = getattr(self, f"run_{task['kind']}")(task)
+        except Exception as e:
+            logger.exception(f"Task {task['id']} failed")
+            if task["kind"] == "ocr":
+                # A crashed OCR process breaks the whole pool; start the retry with a fresh one
+                self.close()
+            self.queue.fail(task, self.name, f"{e.__class__.__name__}: {e}")
+            return False
+        return self.queue.complete(task, self.name, result)
+
+    def cache_for(self, options):
+        cache_dir = options.get("cache_dir")
+        if not cache_dir:
+            return None
+        if self.cache_dir:
+            cache_dir = self.cache_dir
+        elif cache_dir == DEFAULT_CACHE:
+            cache_dir = DEFAULT_CACHE_DIR
+        key = (cache_dir, options.get("cache_max_mb"))
+        if key not in self.caches:
+            self.caches[key] = Cache(cache_dir, (options.get("cache_max_mb") or DEFAULT_CACHE_MAX_MB) * 1024 * 1024)
+            self.caches[key].evict()
+        return self.caches[key]
+
+    def video_hash(self, job, cache):
+        return cache.file_digest(job["input"]) if cache is not None else None
+
+    def run_extract(self, task):
+        job = task["job"]
+        options = job["options"]
+        cache = self.cache_for(options)
+        extract_options = extraction_settings(
+            options.get("fps"), options.get("fps_smart_mode", False), options.get("scene_method", "pixel"),
+            options.get("scene_threshold"), options.get("hash_threshold", 6), options.get("dedup_window", 8),
+            options.get("decode_mode", "grab"), options.get("decoder", "opencv"), options.get("keyframes_only", False),
+            options.get("decode_threads", 0), options.get("decode_width"), options.get("decoder_scene_threshold"),
+            options.get("max_disk_mb"),
+        )
+        frames_dir = os.path.join(job["work_dir"], "frames")
+        frames = frame_source(job["input"], frames_dir, extract_options, cache, self.video_hash(job, cache))
+        return {"frames": [{"name": f.name, "path": f.path, "timestamp": f.timestamp} for f in frames]}
+
+    def run_transcribe(self, task):
+        job = task["job"]
+        options = job["options"]
+        cache = self.cache_for(options)
+        settings = transcription_settings(
+            options.get("whisper_model", "large"), options.get("transcription_backend", "whisper"),
+            options.get("transcription_device"), options.get("compute_type"),
+            options.get("transcription_workers", 1), options.get("transcription_chunk_seconds", 60.0),
+            options.get("max_memory_mb"),
+        )
+        segments = load_transcript_segments(job["input"], settings, cache, self.video_hash(job, cache))
+        if options.get("transcribe"):
+            with open(job["output"], "w") as f:
+                f.write("# FrameFlow Transcript Output\n\n")
+                f.write(" ".join(segment["text"].strip() for segment in segments).strip())
+        return {"segments": segments}
+
+    def run_ocr(self, task):
+        options = task["job"]["options"]
+        cache = self.cache_for(options)
+        settings = (
+            options.get("ocr_grayscale", False), options.get("ocr_scale", 1.0), options.get("ocr_binarize", False),
+            options.get("ocr_incremental", False),
+        )
+        key = (settings, id(cache))
+        if key not in self.engines:
+            self.engines[key] = OCREngine(self.ocr_workers or options.get("ocr_workers"), *settings[:3], cache,
+                                          settings[3])
+        frames = [ExtractedFrame(f["name"], f["path"], f["timestamp"], None) for f in task["payload"]["frames"]]
+        results = self.engines[key].map(frames, lambda frame: frame.path, lambda frame: hash_file(frame.path))
+        return {"texts": [text for _, text in results]}
+
+    def client_for(self, options):
+        key = json.dumps([options.get(name) for name in (
+            "client_name", "client_model", "client_options", "llm_retries", "requests_per_minute", "tokens_per_minute",
+        )], sort_keys=True, default=str)
+        if key not in self.clients:
+            self.clients[key] = build_client(
+                options.get("client_name", "openai"), self.client_token, options.get("client_model"),
+                options.get("llm_retries", 5), options.get("requests_per_minute"), options.get("tokens_per_minute"),
+                options.get("client_options"),
+            )
+        return self.clients[key]
+
+    def run_summarize(self, task):
+        job = task["job"]
+        options = job["options"]
+        job_id = task["job_id"]
+        frames = [
+            ExtractedFrame(f["name"], f["path"], f["timestamp"], None)
+            for f in self.queue.results(job_id, "extract")[0]["frames"]
+        ]
+        texts = [text for result in self.queue.results(job_id, "ocr") for text in result["texts"]]
+        transcript_future = Future()
+        transcript_future.set_result(TranscriptIndex(self.queue.results(job_id, "transcribe")[0]["segments"]))
+
+        client = self.client_for(options)
+        client.cache = self.cache_for(options)
+        output = job["output"]
+        frames_link = os.path.relpath(os.path.join(job["work_dir"], "frames"), os.path.dirname(output))
+        builder = PromptBuilder(client.token_counter, options.get("prompt_budget", DEFAULT_PROMPT_BUDGET),
+                                options.get("ocr_dedup", True))
+        ocr_results = zip(frames, texts)
+        concurrency = options.get("llm_concurrency", 4)
+        assets = None
+        if options.get("assets_dir"):
+            # Extracted frames stay in the work directory: a retried task may need them again
+            assets_dir = os.path.join(os.path.dirname(output), options["assets_dir"])
+            assets = AssetWriter(assets_dir, os.path.relpath(assets_dir, os.path.dirname(output)),
+                                 options.get("asset_format", DEFAULT_ASSET_FORMAT),
+                                 options.get("asset_quality", DEFAULT_ASSET_QUALITY), options.get("asset_max_width"),
+                                 options.get("thumbnail_width"))
+        log = None
+        if options.get("stream_log"):
+            log = StreamLog(os.path.join(os.path.dirname(output), options["stream_log"]))
+        try:
+            if options.get("summary_mode") == "hierarchical":
+                write_hierarchical_howto(client, narrated_frames(ocr_results, transcript_future), output, frames_link,
+                                         concurrency, options.get("step_similarity", 0.5),
+                                         options.get("max_frames_per_step", 8), builder=builder, assets=assets,
+                                         stream_log=log)
+            else:
+                write_frame_howto(client, ocr_results, transcript_future, output, frames_link, concurrency,
+                                  options.get("transcript_window", 30.0), builder, assets, log)
+        finally:
+            if log is not None:
+                log.close()
+            if assets is not None:
+                assets.close()
+        logger.info(f"How-To Markdown file generated at: {output}")
+        return {"output": output, "steps": len(frames)}
+
+    def close(self):
+        for engine in self.engines.values():
+            engine.close()
+        self.engines = {}
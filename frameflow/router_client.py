@@ -0,0 +1,259 @@
+#!/usr/bin/env python3
+
+import inspect
+import logging
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from frameflow.client import BaseClient, RetryPolicy, create_client, get_client_class
+from frameflow.metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BACKENDS = "openai,claude,gemini"
+
+
+class RouterError(Exception):
+    def __init__(self, errors):
+        self.errors = errors
+        super().__init__("; ".join(f"{name}: {error.__class__.__name__}: {error}" for name, error, _ in errors))
+
+    @property
+    def retryable(self):
+        return any(retryable for _, _, retryable in self.errors)
+
+
+class BackendStats:
+    # Latency and failure history of one backend. The EWMA ranks backends; the window of
+    # recent latencies gives the p95 that triggers a hedge.
+    def __init__(self, window=100, alpha=0.2):
+        self.latencies = deque(maxlen=window)
+        self.alpha = alpha
+        self.latency = None
+        self.error_rate = 0.0
+        self.failures = 0
+        self.cooldown_until = 0.0
+        self.in_flight = 0
+        self.lock = threading.Lock()
+
+    def started(self):
+        with self.lock:
+            self.in_flight += 1
+
+    def succeeded(self, seconds):
+        with self.lock:
+            self.in_flight -= 1
+            self.latencies.append(seconds)
+            self.latency = seconds if self.latency is None else self.alpha * seconds + (1 - self.alpha) * self.latency
+            self.error_rate *= 1 - self.alpha
+            self.failures = 0
+            self.cooldown_until = 0.0
+
+    def failed(self, cooldown):
+        with self.lock:
+            self.in_flight -= 1
+            self.error_rate = self.alpha + (1 - self.alpha) * self.error_rate
+            self.failures += 1
+            self.cooldown_until = max(self.cooldown_until, time.monotonic() + cooldown)
+
+    def healthy(self, now):
+        return self.cooldown_until <= now
+
+    def score(self):
+        # Expected seconds per request: untried backends go first so they get measured,
+        # errors count as extra latency and requests already queued on a backend add up
+        if self.latency is None:
+            return 0.0
+        return self.latency * (1 + self.in_flight) * (1 + 4 * self.error_rate)
+
+    def p95(self, min_samples):
+        with self.lock:
+            if len(self.latencies) < min_samples:
+                return None
+            ordered = sorted(self.latencies)
+        return ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+
+
+class RouterClient(BaseClient):
+    # Spreads requests over several clients. Each request goes to the healthy backend with
+    # the lowest expected latency; a backend that fails (rate limit, timeout, outage) is
+    # put in cooldown and the request fails over to the next one straight away instead of
+    # sleeping in that backend's backoff. With hedging, a request still running past its
+    # backend's p95 latency is duplicated on the next-best backend and the first answer wins.
+    failure_message = "All summarization backends failed."
+
+    def __init__(self, backends=DEFAULT_BACKENDS, api_key=None, model=None, hedge=False, hedge_min_samples=20,
+                 explore=0.05, cooldown=RetryPolicy(retries=1, initial_wait=5, max_wait=300), stream=False,
+                 **backend_options):
+        if isinstance(backends, str):
+            backends = [spec.strip() for spec in backends.split(",") if spec.strip()]
+        if api_key:
+            logger.warning("⚠️ The router ignores --client-token; each backend reads its own API key variable")
+        self.stream = stream
+        self.backends = [self._build(spec, model, dict(backend_options, stream=stream)) for spec in backends]
+        if not self.backends:
+            raise ValueError("The router needs at least one backend")
+        self.stats = {id(backend): BackendStats() for backend in self.backends}
+        self.hedge = hedge
+        self.hedge_min_samples = hedge_min_samples
+        self.explore = explore
+        self.cooldown = cooldown
+        # Prompts must fit the smallest context among the backends
+        limits = [backend.max_prompt_tokens for backend in self.backends if backend.max_prompt_tokens]
+        self.max_prompt_tokens = min(limits) if limits else None
+        # Hedged duplicates run here so the caller can wait on whichever returns first
+        self.executor = ThreadPoolExecutor(max_workers=32, thread_name_prefix="router") if hedge else None
+        logger.info(f"Router over {', '.join(self.label(b) for b in self.backends)} (hedging {'on' if hedge else 'off'})")
+
+    @staticmethod
+    def _build(spec, model, options):
+        if isinstance(spec, BaseClient):
+            return spec
+        # "name" or "name:model"; a model given for the router applies to backends without one
+        name, _, backend_model = spec.partition(":")
+        parameters = inspect.signature(get_client_class(name)).parameters
+        # Backend-specific settings (e.g. the local endpoint) only go to clients that take them
+        accepted = {key: value for key, value in options.items() if key in parameters}
+        return create_client(name, model=backend_model or model, **accepted)
+
+    @staticmethod
+    def label(backend):
+        return f"{backend.name}({backend.model_id})" if backend.model_id else backend.name
+
+    @property
+    def model_id(self):
+        return "+".join(str(backend.model_id) for backend in self.backends)
+
+    @property
+    def token_counter(self):
+        return self.backends[0].token_counter
+
+    def is_retryable(self, error):
+        return isinstance(error, RouterError) and error.retryable
+
+    def ranked(self, exclude=()):
+        now = time.monotonic()
+        candidates = [backend for backend in self.backends if id(backend) not in exclude]
+        healthy = sorted(
+            (backend for backend in candidates if self.stats[id(backend)].healthy(now)),
+            key=lambda backend: self.stats[id(backend)].score(),
+        )
+        if len(healthy) > 1 and random.random() < self.explore:
+            # Now and then a slower backend is tried so its numbers stay current
+            healthy.insert(0, healthy.pop(random.randrange(1, len(healthy))))
+        # Backends in cooldown remain a last resort, soonest available first
+        cooling = sorted(
+            (backend for backend in candidates if not self.stats[id(backend)].healthy(now)),
+            key=lambda backend: self.stats[id(backend)].cooldown_until,
+        )
+        return healthy + cooling
+
+    def _call(self, backend, prompt):
+        # One attempt on one backend: no retries and no sleeping here
+        stats = self.stats[id(backend)]
+        stats.started()
+        start = time.monotonic()
+        try:
+            result = backend.complete(backend.truncate_prompt(prompt))
+        except Exception as e:
+            self._failed(backend, e)
+            raise
+        stats.succeeded(time.monotonic() - start)
+        metrics.increment("llm_routed", client=backend.name)
+        return result
+
+    def _call_stream(self, backend, prompt):
+        # _call for a streamed request; the backend counts as answered once the stream ends
+        stats = self.stats[id(backend)]
+        stats.started()
+        start = time.monotonic()
+        try:
+            yield from backend.complete_stream(backend.truncate_prompt(prompt))
+        except Exception as e:
+            self._failed(backend, e)
+            raise
+        stats.succeeded(time.monotonic() - start)
+        metrics.increment("llm_routed", client=backend.name)
+
+    def _failed(self, backend, error):
+        stats = self.stats[id(backend)]
+        retryable = backend.is_retryable(error)
+        # Rate limits and transient errors back off briefly and grow with repeated
+        # failures; anything else (bad key, unknown model) sits out much longer
+        cooldown = self.cooldown.wait_time(stats.failures) if retryable else self.cooldown.max_wait
+        stats.failed(cooldown)
+        metrics.increment("llm_backend_errors", client=backend.name)
+        logger.warning(f"⚠️ {self.label(backend)} failed ({error.__class__.__name__}); cooling down {cooldown:.0f}s")
+
+    def _hedged(self, primary, secondary, prompt, failed):
+        # Returns (backend, result) from the first successful call. Every call that fails is
+        # added to failed as (backend, error); if none succeeds the first error is raised.
+        # The slower duplicate is left to finish in the background.
+        futures = {self.executor.submit(self._call, primary, prompt): primary}
+        delay = self.stats[id(primary)].p95(self.hedge_min_samples)
+        done, _ = wait(futures, timeout=delay)
+        if not done:
+            logger.debug(f"{self.label(primary)} slower than its p95 ({delay:.2f}s); hedging on {self.label(secondary)}")
+            metrics.increment("llm_hedged_requests", client=secondary.name)
+            futures[self.executor.submit(self._call, secondary, prompt)] = secondary
+        pending = set(futures)
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    if futures[future] is secondary:
+                        metrics.increment("llm_hedge_wins", client=secondary.name)
+                    return futures[future], future.result()
+                failed.append((futures[future], future.exception()))
+        raise failed[0][1]
+
+    def complete(self, prompt):
+        errors = []
+        tried = set()
+        while True:
+            candidates = self.ranked(exclude=tried)
+            if not candidates:
+                raise RouterError(errors)
+            backend = candidates[0]
+            tried.add(id(backend))
+            failed = []
+            try:
+                if self.hedge and len(candidates) > 1:
+                    return self._hedged(backend, candidates[1], prompt, failed)[1]
+                return self._call(backend, prompt)
+            except Exception as e:
+                # A hedged pair that failed used up both backends; each error is judged by
+                # the client that raised it
+                for failed_backend, error in failed or [(backend, e)]:
+                    tried.add(id(failed_backend))
+                    errors.append((self.label(failed_backend), error, failed_backend.is_retryable(error)))
+                if len(tried) < len(self.backends):
+                    metrics.increment("llm_failovers", client=backend.name)
+
+    def complete_stream(self, prompt):
+        # Streams from the best backend. A failure before its first piece fails over like
+        # complete(); after that the text already passed on cannot be taken back, so the
+        # request fails and is retried whole. Streamed requests are not hedged.
+        errors = []
+        tried = set()
+        while True:
+            candidates = self.ranked(exclude=tried)
+            if not candidates:
+                raise RouterError(errors)
+            backend = candidates[0]
+            tried.add(id(backend))
+            streamed = False
+            try:
+                for piece in self._call_stream(backend, prompt):
+                    streamed = streamed or bool(piece)
+                    yield piece
+                return
+            except Exception as e:
+                errors.append((self.label(backend), e, backend.is_retryable(e)))
+                if streamed:
+                    raise RouterError(errors) from e
+                if len(tried) < len(self.backends):
+                    metrics.increment("llm_failovers", client=backend.name)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+import logging
+from collections import deque
+import cv2
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Frames are scored on a grayscale thumbnail. It has to stay large enough for a new
+# line of terminal text to register, but full resolution adds cost without signal.
+ANALYSIS_SIZE = (320, 180)
+
+# Gray-level change below which a pixel counts as unchanged (compression noise, dithering)
+PIXEL_DELTA = 24
+
+DEFAULT_SCENE_THRESHOLDS = {
+    # Bhattacharyya distance between gray-level histograms
+    "histogram": 0.2,
+    # Fraction of thumbnail pixels that changed; roughly one new line of text on a 1080p screen
+    "pixel": 0.002,
+}
+
+
+def thumbnail(frame):
+    if frame.ndim == 3:
+        frame = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    return cv2.resize(frame, ANALYSIS_SIZE, interpolation=cv2.INTER_AREA)
+
+
+def histogram_distance(thumb_a, thumb_b, bins=64):
+    hist_a = cv2.calcHist([thumb_a], [0], None, [bins], [0, 256])
+    hist_b = cv2.calcHist([thumb_b], [0], None, [bins], [0, 256])
+    cv2.normalize(hist_a, hist_a)
+    cv2.normalize(hist_b, hist_b)
+    # 0.0 for identical histograms, 1.0 for disjoint ones
+    return float(cv2.compareHist(hist_a, hist_b, cv2.HISTCMP_BHATTACHARYYA))
+
+
+def pixel_distance(thumb_a, thumb_b):
+    return float(np.count_nonzero(cv2.absdiff(thumb_a, thumb_b) > PIXEL_DELTA)) / thumb_a.size
+
+
+def perceptual_hash(frame, hash_size=8):
+    # Classic pHash: low-frequency DCT coefficients compared against their median
+    gray = frame if frame.ndim == 2 else cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    resized = cv2.resize(gray, (hash_size * 4, hash_size * 4), interpolation=cv2.INTER_AREA)
+    dct = cv2.dct(np.float32(resized))
+    low = dct[:hash_size, :hash_size].flatten()
+    bits = low > np.median(low[1:])
+    value = 0
+    for bit in bits:
+        value = (value << 1) | int(bit)
+    return value
+
+
+def hamming_distance(hash_a, hash_b):
+    return bin(hash_a ^ hash_b).count("1")
+
+
+class SceneDetector:
+    def __init__(self, method="pixel", scene_threshold=None, hash_threshold=6, dedup_window=8):
+        if method not in DEFAULT_SCENE_THRESHOLDS:
+            raise ValueError(f"Unknown scene detection method: {method}")
+        self.method = method
+        self.scene_threshold = DEFAULT_SCENE_THRESHOLDS[method] if scene_threshold is None else scene_threshold
+        self.hash_threshold = hash_threshold
+        self.recent = deque(maxlen=max(1, dedup_window))
+        self.last_thumb = None
+        logger.debug(
+            f"Scene detector: method={method}, scene_threshold={self.scene_threshold}, "
+            f"hash_threshold={hash_threshold}, dedup_window={dedup_window}"
+        )
+
+    def score(self, thumb_a, thumb_b):
+        if self.method == "pixel":
+            return pixel_distance(thumb_a, thumb_b)
+        return histogram_distance(thumb_a, thumb_b)
+
+    def is_duplicate(self, thumb, frame_hash):
+        # The hash is a cheap prefilter; a thumbnail comparison confirms the match so that
+        # small text changes, which barely move a 64-bit hash, are not thrown away.
+        for seen_hash, seen_thumb in self.recent:
+            if hamming_distance(frame_hash, seen_hash) <= self.hash_threshold \
+                    and self.score(seen_thumb, thumb) < self.scene_threshold:
+                return True
+        return False
+
+    def should_keep(self, frame):
+        thumb = thumbnail(frame)
+        if self.last_thumb is not None and self.score(self.last_thumb, thumb) < self.scene_threshold:
+            return False
+
+        # The scene changed; drop it anyway if it matches a recently kept frame
+        # (e.g. toggling back and forth between two windows).
+        self.last_thumb = thumb
+        frame_hash = perceptual_hash(thumb)
+        if self.is_duplicate(thumb, frame_hash):
+            logger.debug("Skipping near-duplicate frame")
+            return False
+        self.recent.append((frame_hash, thumb))
+        return True
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+
+import json
+import logging
+import re
+from collections import namedtuple
+
+from frameflow.prompts import PromptBuilder
+
+logger = logging.getLogger(__name__)
+
+# A candidate how-to step: consecutive frames with their OCR text and the narration
+# spoken while they were on screen.
+CandidateStep = namedtuple("CandidateStep", ["frames", "ocr_texts", "narrations"])
+
+# A final step after the reduce pass, with the candidate steps it was merged from
+Step = namedtuple("Step", ["title", "text", "sources"])
+
+MAP_INSTRUCTIONS = (
+    "The frames below are consecutive screenshots of one step in a technical screen recording, "
+    "with the narration around them. Describe this step as a how-to instruction: what the user "
+    "does, which commands or settings are involved, and the expected result."
+)
+
+REDUCE_INSTRUCTIONS = (
+    "Below are draft how-to steps, in recording order, summarized from a technical screen recording. "
+    "Merge drafts that describe the same action, drop repetition, and put the steps in the order a "
+    "reader should follow. Answer with only a JSON array; each element is an object with "
+    '"title" (short imperative heading), "text" (the step instructions in Markdown) and '
+    '"sources" (the draft numbers it covers).'
+)
+
+
+def words(text):
+    return set(re.findall(r"\w+", text.lower()))
+
+
+def similarity(a, b):
+    # Jaccard similarity of word sets; two frames with no text at all count as the same screen
+    if not a and not b:
+        return 1.0
+    return len(a & b) / len(a | b)
+
+
+def group_frames(items, similarity_threshold=0.5, max_frames=8, max_chars=4000):
+    # items yields (frame, ocr_text, narration). A frame joins the current candidate step
+    # while its text is similar to the previous frame's; size and text limits keep every
+    # map prompt bounded however long a screen stays similar.
+    step = None
+    previous = None
+    chars = 0
+    for frame, ocr_text, narration in items:
+        current = words(ocr_text) | words(narration)
+        text_chars = len(ocr_text) + len(narration)
+        if step is not None and (
+            similarity(previous, current) < similarity_threshold
+            or len(step.frames) >= max_frames
+            or chars + text_chars > max_chars
+        ):
+            yield step
+            step = None
+        if step is None:
+            step = CandidateStep([], [], [])
+            chars = 0
+        step.frames.append(frame)
+        step.ocr_texts.append(ocr_text)
+        step.narrations.append(narration)
+        chars += text_chars
+        previous = current
+    if step is not None:
+        yield step
+
+
+def map_chunk(step, builder=None):
+    # builder dedups OCR lines against earlier steps and packs the prompt into its budget
+    builder = builder or PromptBuilder(budget=None, dedup=False)
+    sections = []
+    last_ocr = None
+    for index, (frame, ocr_text) in enumerate(zip(step.frames, step.ocr_texts), start=1):
+        # Repeated screens add nothing but tokens
+        if ocr_text == last_ocr:
+            continue
+        last_ocr = ocr_text
+        sections.append(f"Frame {index} at {frame.timestamp:.1f}s:\n{ocr_text}")
+    narration = " ".join(text for text in step.narrations if text).strip()
+    return f"{MAP_INSTRUCTIONS}\n\n" + builder.build("\n".join(sections), narration)
+
+
+def reduce_chunk(summaries, first_number=1):
+    drafts = [f"Draft {number}:\n{summary}" for number, summary in enumerate(summaries, start=first_number)]
+    return REDUCE_INSTRUCTIONS + "\n\n" + "\n\n".join(drafts)
+
+
+def parse_reduced(text, numbers):
+    # Returns the merged steps, or None when the answer is not the requested JSON so the
+    # caller can keep the draft steps unchanged
+    start = text.find("[")
+    end = text.rfind("]")
+    if start < 0 or end < start:
+        return None
+    try:
+        entries = json.loads(text[start:end + 1])
+    except ValueError:
+        return None
+    steps = []
+    for entry in entries:
+        if not isinstance(entry, dict) or not str(entry.get("text", "")).strip():
+            return None
+        sources = []
+        for number in entry.get("sources") or []:
+            try:
+                number = int(number)
+            except (TypeError, ValueError):
+                continue
+            if number in numbers and number not in sources:
+                sources.append(number)
+        steps.append(Step(str(entry.get("title", "")).strip(), str(entry["text"]).strip(), sources))
+    return steps or None
+
+
+def reduce_steps(client, summaries, reduce_size=20, max_workers=4, stream_log=None):
+    # Drafts are merged in consecutive windows of reduce_size so each reduce prompt stays
+    # bounded; windows are independent and run concurrently. Sources are 0-based indexes
+    # into summaries.
+    windows = [(start, summaries[start:start + reduce_size]) for start in range(0, len(summaries), reduce_size)]
+    chunks = (reduce_chunk(window, start + 1) for start, window in windows)
+    steps = []
+    for (start, window), answer in zip(windows, client.summarize_chunks(chunks, max_workers, stream_log, "reduce")):
+        numbers = range(start + 1, start + len(window) + 1)
+        merged = parse_reduced(answer, numbers)
+        if merged is None:
+            logger.warning(f"⚠️ Could not parse the merged steps for drafts {numbers[0]}-{numbers[-1]}; keeping drafts.")
+            merged = [Step("", summary, [number]) for number, summary in zip(numbers, window)]
+        for step in merged:
+            steps.append(Step(step.title, step.text, [number - 1 for number in step.sources]))
+    return steps
@@ -0,0 +1,75 @@
+#!/usr/bin/env python3
+
+import json
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class StreamLog:
+    # JSON-lines sidecar of LLM output as it arrives, for watching a long run live. Each
+    # request writes "delta" events with its text, then a "done" event with its time to
+    # first token. Concurrent requests interleave; "stage" and "step" say which request a
+    # line belongs to. A "retry" event means the deltas written so far for it are void.
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, "w")
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def write(self, event):
+        with self.lock:
+            self.file.write(json.dumps(event) + "\n")
+            # Flushed line by line so a reader tailing the file sees tokens as they come
+            self.file.flush()
+
+    def request(self, stage, step):
+        return RequestStream(self, stage, step)
+
+    def close(self):
+        with self.lock:
+            self.file.close()
+        logger.info(f"LLM stream log written to {self.path}")
+
+
+class RequestStream:
+    # The sidecar events of one summarization request
+    def __init__(self, log, stage, step):
+        self.log = log
+        self.stage = stage
+        self.step = step
+        self.started = time.monotonic()
+        self.first_token_seconds = None
+        self.attempts = 0
+        self.streamed = False
+
+    def event(self, event, **fields):
+        self.log.write({"stage": self.stage, "step": self.step, "event": event, **fields})
+
+    def attempt(self):
+        self.attempts += 1
+        if self.streamed:
+            self.event("retry", attempt=self.attempts)
+            self.streamed = False
+
+    def first_token(self, seconds):
+        self.first_token_seconds = seconds
+
+    def delta(self, text):
+        self.streamed = True
+        self.event("delta", text=text)
+
+    def finish(self, summary, failed=False):
+        # Cached, batched and failed requests never streamed; their text goes out in one piece
+        if not self.streamed and not failed:
+            self.delta(summary)
+        self.event("done", seconds=round(time.monotonic() - self.started, 3),
+                   first_token_seconds=None if self.first_token_seconds is None else round(self.first_token_seconds, 3),
+                   attempts=self.attempts, failed=failed)
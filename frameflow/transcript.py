@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+
+import bisect
+import logging
+import os
+import sqlite3
+import tempfile
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptIndex:
+    # Whisper segments ({"start", "end", "text"}) indexed by start time so each frame
+    # can pull only the narration around it.
+    def __init__(self, segments):
+        self.segments = sorted(segments, key=lambda segment: segment["start"])
+        self.starts = [segment["start"] for segment in self.segments]
+        # Running maximum of end times lets window() skip everything that finished
+        # before the window opens without assuming segments never overlap.
+        self.max_ends = []
+        latest = float("-inf")
+        for segment in self.segments:
+            latest = max(latest, segment["end"])
+            self.max_ends.append(latest)
+
+    @property
+    def text(self):
+        return " ".join(segment["text"].strip() for segment in self.segments).strip()
+
+    def window(self, timestamp, window_seconds):
+        if not window_seconds or window_seconds <= 0:
+            return self.text
+        return self.between(timestamp - window_seconds / 2, timestamp + window_seconds / 2)
+
+    def between(self, window_start, window_end):
+        first = bisect.bisect_right(self.max_ends, window_start)
+        last = bisect.bisect_left(self.starts, window_end)
+        texts = [
+            segment["text"].strip()
+            for segment in self.segments[first:last]
+            if segment["end"] > window_start
+        ]
+        return " ".join(texts).strip()
+
+    def starting_between(self, window_start, window_end):
+        # Segments are assigned by start time, so consecutive ranges never repeat a segment
+        first = bisect.bisect_left(self.starts, window_start)
+        last = bisect.bisect_left(self.starts, window_end)
+        return " ".join(segment["text"].strip() for segment in self.segments[first:last]).strip()
+
+    def close(self):
+        pass
+
+
+class SpilledTranscript(TranscriptIndex):
+    # Same queries as TranscriptIndex, answered from a temporary SQLite file so a
+    # multi-hour transcript does not stay in memory for the whole run
+    def __init__(self, segments, directory=None):
+        fd, self.path = tempfile.mkstemp(prefix="frameflow-transcript-", suffix=".db", dir=directory)
+        os.close(fd)
+        self.db = sqlite3.connect(self.path, check_same_thread=False)
+        self.lock = threading.Lock()
+        self.db.execute("CREATE TABLE segments (start REAL, end REAL, text TEXT)")
+        # Longest segment bounds how far before a window an overlapping segment can start
+        self.max_duration = 0.0
+        with self.db:
+            for segment in segments:
+                self.max_duration = max(self.max_duration, segment["end"] - segment["start"])
+                self.db.execute("INSERT INTO segments VALUES (?, ?, ?)",
+                                (segment["start"], segment["end"], segment["text"].strip()))
+            self.db.execute("CREATE INDEX segments_start ON segments (start)")
+
+    def _join(self, query, params=()):
+        with self.lock:
+            rows = self.db.execute(query, params).fetchall()
+        return " ".join(text for text, in rows).strip()
+
+    @property
+    def text(self):
+        return self._join("SELECT text FROM segments ORDER BY start, rowid")
+
+    def between(self, window_start, window_end):
+        return self._join(
+            "SELECT text FROM segments WHERE start >= ? AND start < ? AND end > ? ORDER BY start, rowid",
+            (window_start - self.max_duration, window_end, window_start),
+        )
+
+    def starting_between(self, window_start, window_end):
+        return self._join(
+            "SELECT text FROM segments WHERE start >= ? AND start < ? ORDER BY start, rowid",
+            (window_start, window_end),
+        )
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+        os.remove(self.path)
@@ -0,0 +1,270 @@
+#!/usr/bin/env python3
+
+import logging
+import multiprocessing
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+from frameflow.client import registered_entry_points
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = 16000
+
+# Voice activity detection: analysis frame length, how far above the noise floor a frame
+# must be to count as speech, and the shortest pause a chunk may be cut at
+VAD_FRAME_SECONDS = 0.03
+VAD_NOISE_RATIO = 3.0
+VAD_MIN_SILENCE_SECONDS = 0.5
+DEFAULT_CHUNK_SECONDS = 60.0
+# Decoded audio costs about this much memory per sample: ffmpeg's int16 output plus the float32 copy
+AUDIO_BYTES_PER_SAMPLE = 6
+MIN_AUDIO_WINDOW_SECONDS = 30.0
+
+# Loaded models are expensive (seconds to minutes, GBs of RAM), so every backend
+# instance is kept for the life of the process and shared by all callers.
+_BACKENDS = {}
+_BACKENDS_LOCK = threading.Lock()
+# Worker pools for parallel transcription, each worker holding one loaded model; kept
+# like _BACKENDS so a batch of videos loads the models once
+_POOLS = {}
+
+
+def load_audio(path, sample_rate=SAMPLE_RATE):
+    # Decode once to mono 16 kHz float32 PCM, the input format every Whisper backend expects
+    cmd = [
+        "ffmpeg", "-nostdin", "-threads", "0", "-i", path,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate), "-",
+    ]
+    try:
+        out = subprocess.run(cmd, capture_output=True, check=True).stdout
+    except FileNotFoundError as e:
+        raise RuntimeError("ffmpeg is required to decode audio; see the README prerequisites") from e
+    except subprocess.CalledProcessError as e:
+        raise RuntimeError(f"Failed to load audio: {e.stderr.decode(errors='ignore')}") from e
+    return np.frombuffer(out, np.int16).astype(np.float32) / 32768.0
+
+
+def audio_window_seconds(max_bytes, sample_rate=SAMPLE_RATE):
+    return max(MIN_AUDIO_WINDOW_SECONDS, max_bytes / (AUDIO_BYTES_PER_SAMPLE * sample_rate))
+
+
+def last_pause(audio, sample_rate=SAMPLE_RATE):
+    # Sample index in the last quiet frame of the final quarter, where a window can be cut
+    # without splitting a word; the end of the audio when there is none
+    frame_length = max(1, int(sample_rate * VAD_FRAME_SECONDS))
+    speech = speech_frames(audio, sample_rate)
+    quiet = np.flatnonzero(~speech[len(speech) * 3 // 4:])
+    if not len(quiet):
+        return len(audio)
+    return (len(speech) * 3 // 4 + int(quiet[-1])) * frame_length + frame_length // 2
+
+
+def iter_audio(path, window_seconds, sample_rate=SAMPLE_RATE):
+    # Like load_audio, but streamed from one ffmpeg process as (offset seconds, audio)
+    # windows of about window_seconds, so a long recording is never in memory at once.
+    # Each window ends at a pause; the audio after it starts the next window.
+    cmd = [
+        "ffmpeg", "-nostdin", "-threads", "0", "-loglevel", "error", "-i", path,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(sample_rate), "-",
+    ]
+    window_bytes = int(window_seconds * sample_rate) * 2
+    with tempfile.TemporaryFile() as stderr:
+        try:
+            process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr)
+        except FileNotFoundError as e:
+            raise RuntimeError("ffmpeg is required to decode audio; see the README prerequisites") from e
+        try:
+            offset = 0
+            carry = np.zeros(0, dtype=np.float32)
+            while True:
+                data = process.stdout.read(window_bytes)
+                audio = np.concatenate([carry, np.frombuffer(data, np.int16).astype(np.float32) / 32768.0])
+                if len(data) < window_bytes:
+                    break
+                cut = last_pause(audio, sample_rate)
+                carry = audio[cut:]
+                yield offset / sample_rate, audio[:cut]
+                offset += cut
+            if process.wait() != 0:
+                stderr.seek(0)
+                raise RuntimeError(f"Failed to load audio: {stderr.read().decode(errors='ignore')}")
+            if len(audio):
+                yield offset / sample_rate, audio
+        finally:
+            if process.poll() is None:
+                process.kill()
+            process.stdout.close()
+            process.wait()
+
+
+class WhisperBackend:
+    # Reference openai-whisper implementation (PyTorch)
+    def __init__(self, model_name="large", device=None, compute_type=None):
+        import whisper
+        import torch
+        self.device = device or ("cuda" if torch.cuda.is_available() else "cpu")
+        # fp16 is not supported on CPU; whisper would warn and fall back to fp32 anyway
+        self.fp16 = compute_type == "float16" if compute_type else self.device != "cpu"
+        logger.info(f"Loading Whisper model '{model_name}' on {self.device}")
+        self.model = whisper.load_model(model_name, device=self.device)
+        # Decoding installs kv-cache hooks on the shared model, so calls must not overlap
+        self.lock = threading.Lock()
+
+    def transcribe(self, audio):
+        with self.lock:
+            result = self.model.transcribe(audio, fp16=self.fp16)
+        return [{"start": s["start"], "end": s["end"], "text": s["text"]} for s in result["segments"]]
+
+
+class FasterWhisperBackend:
+    # CTranslate2 implementation; int8 weights make CPU inference several times faster
+    def __init__(self, model_name="large", device=None, compute_type=None):
+        try:
+            from faster_whisper import WhisperModel
+        except ImportError as e:
+            raise RuntimeError("The faster-whisper backend requires: pip install faster-whisper") from e
+        self.device = device or "auto"
+        compute_type = compute_type or "int8"
+        logger.info(f"Loading faster-whisper model '{model_name}' on {self.device} ({compute_type})")
+        self.model = WhisperModel(model_name, device=self.device, compute_type=compute_type)
+
+    def transcribe(self, audio):
+        segments, _ = self.model.transcribe(audio)
+        return [{"start": s.start, "end": s.end, "text": s.text} for s in segments]
+
+
+BACKENDS = {
+    "whisper": WhisperBackend,
+    "faster-whisper": FasterWhisperBackend,
+}
+# Third-party backends register under this entry-point group
+BACKEND_ENTRY_POINT_GROUP = "frameflow.transcription_backends"
+
+
+def available_backends():
+    plugins = set(registered_entry_points(BACKEND_ENTRY_POINT_GROUP)) - set(BACKENDS)
+    return list(BACKENDS) + sorted(plugins)
+
+
+def get_backend_class(name):
+    if name in BACKENDS:
+        return BACKENDS[name]
+    entry_point = registered_entry_points(BACKEND_ENTRY_POINT_GROUP).get(name)
+    if entry_point is None:
+        raise ValueError(f"Unknown transcription backend: {name}")
+    return entry_point.load()
+
+
+def get_backend(name="whisper", model_name="large", **options):
+    backend_class = get_backend_class(name)
+    key = (name, model_name, tuple(sorted(options.items())))
+    with _BACKENDS_LOCK:
+        if key not in _BACKENDS:
+            _BACKENDS[key] = backend_class(model_name, **options)
+        else:
+            logger.debug(f"Reusing loaded {name} model '{model_name}'")
+        return _BACKENDS[key]
+
+
+def speech_frames(audio, sample_rate=SAMPLE_RATE, frame_seconds=VAD_FRAME_SECONDS):
+    # Energy-based VAD: one bool per frame, True where the RMS clearly exceeds the noise
+    # floor (estimated from the quietest frames, so it adapts to hum and room tone)
+    frame_length = max(1, int(sample_rate * frame_seconds))
+    count = len(audio) // frame_length
+    if count == 0:
+        return np.zeros(0, dtype=bool)
+    frames = audio[:count * frame_length].reshape(count, frame_length)
+    rms = np.sqrt(np.mean(frames.astype(np.float64) ** 2, axis=1))
+    noise_floor = np.percentile(rms, 10)
+    if rms.max() <= noise_floor * VAD_NOISE_RATIO:
+        # No quiet stretches to learn the floor from: anything audible is speech
+        return rms > 1e-3
+    return rms > max(noise_floor * VAD_NOISE_RATIO, 1e-3)
+
+
+def split_on_silence(audio, sample_rate=SAMPLE_RATE, chunk_seconds=DEFAULT_CHUNK_SECONDS,
+                     min_silence_seconds=VAD_MIN_SILENCE_SECONDS):
+    # (start, end) sample ranges of about chunk_seconds, cut in the middle of pauses so no
+    # word is split. Without a pause a chunk is cut at its quietest point by 1.5x the
+    # target. Chunks with no speech at all are left out.
+    speech = speech_frames(audio, sample_rate)
+    frame_length = max(1, int(sample_rate * VAD_FRAME_SECONDS))
+    target = max(1, int(chunk_seconds / VAD_FRAME_SECONDS))
+    limit = int(target * 1.5)
+    min_silence = max(1, int(min_silence_seconds / VAD_FRAME_SECONDS))
+
+    cuts = [0]
+    silence_start = None
+    for index, is_speech in enumerate(speech):
+        if not is_speech:
+            if silence_start is None:
+                silence_start = index
+            if index - cuts[-1] >= target and index + 1 - silence_start >= min_silence:
+                cuts.append((silence_start + index + 1) // 2)
+                silence_start = None
+            continue
+        silence_start = None
+        if index - cuts[-1] >= limit:
+            # No usable pause: fall back to the last non-speech frame, or a hard cut
+            window = speech[cuts[-1] + target:index]
+            quiet = np.flatnonzero(~window)
+            cuts.append(cuts[-1] + target + int(quiet[-1]) if len(quiet) else index)
+    cuts.append(len(speech))
+
+    chunks = []
+    for start, end in zip(cuts, cuts[1:]):
+        if end > start and speech[start:end].any():
+            chunks.append((start * frame_length, end * frame_length if end < len(speech) else len(audio)))
+    return chunks
+
+
+def _init_transcriber(name, backend_class, model_name, options, threads):
+    # Runs once per worker process: load the model and split the cores between workers
+    BACKENDS.setdefault(name, backend_class)
+    get_backend(name, model_name, **options)
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.set_num_threads(threads)
+
+
+def _transcribe_chunk(name, model_name, options, audio, offset):
+    segments = get_backend(name, model_name, **options).transcribe(audio)
+    return [dict(segment, start=segment["start"] + offset, end=segment["end"] + offset) for segment in segments]
+
+
+def _transcription_pool(name, model_name, options, workers):
+    key = (name, model_name, tuple(sorted(options.items())), workers)
+    with _BACKENDS_LOCK:
+        if key not in _POOLS:
+            logger.info(f"Starting {workers} transcription workers ({name} '{model_name}')")
+            threads = max(1, (os.cpu_count() or 1) // workers)
+            _POOLS[key] = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_transcriber,
+                initargs=(name, get_backend_class(name), model_name, options, threads),
+            )
+        return _POOLS[key]
+
+
+def transcribe_parallel(audio, name="whisper", model_name="large", workers=2, chunk_seconds=DEFAULT_CHUNK_SECONDS,
+                        sample_rate=SAMPLE_RATE, **options):
+    # Long-audio mode: chunks split at silences are transcribed concurrently, one model per
+    # worker process, and stitched back in order with timestamps shifted to the whole file
+    chunks = split_on_silence(audio, sample_rate, chunk_seconds)
+    logger.info(f"Transcribing {len(chunks)} speech chunks on {workers} workers")
+    pool = _transcription_pool(name, model_name, options, workers)
+    futures = [
+        pool.submit(_transcribe_chunk, name, model_name, options, audio[start:end], start / sample_rate)
+        for start, end in chunks
+    ]
+    segments = []
+    for future in futures:
+        segments.extend(future.result())
+    return segments
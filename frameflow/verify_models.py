@@ -2,19 +2,14 @@
 
 import logging
 
-# Gemini
-import google.generativeai as genai
-
-# OpenAI
-from openai import OpenAI
-
-# Anthropic Claude
-from anthropic import Anthropic
+# Each verifier imports its SDK on first use, so listing one provider's models
+# doesn't pay for loading the other two
 
 logger = logging.getLogger(__name__)
 
 class GeminiModelVerifier:
     def __init__(self, api_key):
+        import google.generativeai as genai
         genai.configure(api_key=api_key)
         self.client = genai
 
@@ -30,6 +25,7 @@ class GeminiModelVerifier:
 
 class OpenAIModelVerifier:
     def __init__(self, api_key):
+        from openai import OpenAI
         self.client = OpenAI(api_key=api_key)
 
     def list_models(self):
@@ -44,6 +40,7 @@ class OpenAIModelVerifier:
 
 class ClaudeModelVerifier:
     def __init__(self, api_key):
+        from anthropic import Anthropic
         self.client = Anthropic(api_key=api_key)
 
     def list_models(self):
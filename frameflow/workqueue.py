@@ -0,0 +1,266 @@
+#!/usr/bin/env python3
+
+import json
+import logging
+import sqlite3
+import time
+
+logger = logging.getLogger(__name__)
+
+STAGES = ("extract", "ocr", "transcribe", "summarize")
+DEFAULT_LEASE_SECONDS = 600
+DEFAULT_MAX_ATTEMPTS = 3
+# Frames per OCR task: enough to keep a worker's process pool busy, small enough to spread out
+OCR_TASK_FRAMES = 16
+RETRY_DELAY_SECONDS = 30
+# Stored as a job's cache_dir when the submitter used the default cache: each worker then
+# uses its own default rather than a path under the submitter's home directory
+DEFAULT_CACHE = "default"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    input TEXT NOT NULL,
+    output TEXT NOT NULL,
+    work_dir TEXT NOT NULL,
+    options TEXT NOT NULL,
+    status TEXT NOT NULL DEFAULT 'running',
+    error TEXT,
+    created REAL NOT NULL,
+    updated REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY,
+    job_id INTEGER NOT NULL REFERENCES jobs(id),
+    kind TEXT NOT NULL,
+    position INTEGER NOT NULL DEFAULT 0,
+    payload TEXT NOT NULL DEFAULT '{}',
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker TEXT,
+    available_at REAL NOT NULL DEFAULT 0,
+    lease_until REAL,
+    result TEXT,
+    error TEXT,
+    updated REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS tasks_claim ON tasks (status, kind, available_at);
+CREATE INDEX IF NOT EXISTS tasks_job ON tasks (job_id, kind);
+"""
+
+
+class WorkQueue:
+    # SQLite job queue shared by workers on any number of hosts (the database must live on
+    # a filesystem with working locks). A video is a job; its stages are tasks. Workers
+    # claim tasks under a lease they keep renewing, so a task whose worker died is claimed
+    # again once the lease runs out. Results are checkpointed in the database, and
+    # completing a task enqueues the stages that were waiting on it in the same transaction.
+    def __init__(self, path, lease_seconds=DEFAULT_LEASE_SECONDS, max_attempts=DEFAULT_MAX_ATTEMPTS):
+        self.path = path
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        db = self.connect()
+        try:
+            db.executescript(SCHEMA)
+        finally:
+            db.close()
+
+    def connect(self):
+        db = sqlite3.connect(self.path, timeout=60, isolation_level=None)
+        db.row_factory = sqlite3.Row
+        return db
+
+    def transaction(self):
+        return _Transaction(self.connect())
+
+    def submit(self, input_file, output, work_dir, options):
+        now = time.time()
+        with self.transaction() as db:
+            job_id = db.execute(
+                "INSERT INTO jobs (input, output, work_dir, options, created, updated) VALUES (?, ?, ?, ?, ?, ?)",
+                (input_file, output, work_dir, json.dumps(options), now, now),
+            ).lastrowid
+            # Extraction and transcription only need the video, so both start right away
+            if not options.get("transcribe"):
+                self._enqueue(db, job_id, "extract")
+            self._enqueue(db, job_id, "transcribe")
+        logger.info(f"Queued job {job_id}: {input_file}")
+        return job_id
+
+    def _enqueue(self, db, job_id, kind, position=0, payload=None):
+        db.execute(
+            "INSERT INTO tasks (job_id, kind, position, payload, updated) VALUES (?, ?, ?, ?, ?)",
+            (job_id, kind, position, json.dumps(payload or {}), time.time()),
+        )
+
+    def claim(self, stages, worker):
+        now = time.time()
+        placeholders = ",".join("?" for _ in stages)
+        with self.transaction() as db:
+            while True:
+                # Tasks of a job that already failed are never run
+                row = db.execute(
+                    f"SELECT tasks.* FROM tasks JOIN jobs ON jobs.id = tasks.job_id "
+                    f"WHERE tasks.kind IN ({placeholders}) AND jobs.status != 'failed' AND ("
+                    "(tasks.status = 'pending' AND tasks.available_at <= ?) "
+                    "OR (tasks.status = 'running' AND tasks.lease_until < ?)"
+                    ") ORDER BY tasks.job_id, tasks.id LIMIT 1",
+                    (*stages, now, now),
+                ).fetchone()
+                if row is None:
+                    return None
+                if row["status"] != "running":
+                    break
+                if row["attempts"] < self.max_attempts:
+                    logger.warning(f"⚠️ Lease of task {row['id']} ({row['kind']}) held by {row['worker']} expired; reclaiming")
+                    break
+                # Its worker died on every attempt (e.g. killed for running out of memory), so
+                # fail() never ran; running it again would only kill another worker
+                error = f"worker {row['worker']} stopped responding on attempt {row['attempts']}"
+                db.execute(
+                    "UPDATE tasks SET status = 'failed', error = ?, lease_until = NULL, updated = ? WHERE id = ?",
+                    (error, now, row["id"]),
+                )
+                self._fail_job(db, dict(row), error)
+            db.execute(
+                "UPDATE tasks SET status = 'running', worker = ?, attempts = attempts + 1, lease_until = ?, "
+                "updated = ? WHERE id = ?",
+                (worker, now + self.lease_seconds, now, row["id"]),
+            )
+            task = dict(row)
+            task["attempts"] += 1
+            task["payload"] = json.loads(task["payload"])
+            job = db.execute("SELECT * FROM jobs WHERE id = ?", (task["job_id"],)).fetchone()
+            task["job"] = dict(job, options=json.loads(job["options"]))
+        return task
+
+    def heartbeat(self, task, worker):
+        with self.transaction() as db:
+            db.execute(
+                "UPDATE tasks SET lease_until = ? WHERE id = ? AND status = 'running' AND worker = ?",
+                (time.time() + self.lease_seconds, task["id"], worker),
+            )
+
+    def complete(self, task, worker, result):
+        with self.transaction() as db:
+            updated = db.execute(
+                "UPDATE tasks SET status = 'done', result = ?, error = NULL, lease_until = NULL, updated = ? "
+                "WHERE id = ? AND status = 'running' AND worker = ?",
+                (json.dumps(result), time.time(), task["id"], worker),
+            ).rowcount
+            if not updated:
+                # The lease ran out and another worker took the task over; its result wins
+                logger.warning(f"⚠️ Task {task['id']} was reclaimed by another worker; discarding result")
+                return False
+            if task["kind"] == "extract":
+                frames = result["frames"]
+                for position, start in enumerate(range(0, len(frames), OCR_TASK_FRAMES)):
+                    self._enqueue(db, task["job_id"], "ocr", position, {"frames": frames[start:start + OCR_TASK_FRAMES]})
+            self._advance(db, task["job_id"])
+        return True
+
+    def fail(self, task, worker, error):
+        with self.transaction() as db:
+            if task["attempts"] < self.max_attempts:
+                delay = RETRY_DELAY_SECONDS * (2 ** (task["attempts"] - 1))
+                updated = db.execute(
+                    "UPDATE tasks SET status = 'pending', error = ?, available_at = ?, lease_until = NULL, "
+                    "updated = ? WHERE id = ? AND worker = ?",
+                    (error, time.time() + delay, time.time(), task["id"], worker),
+                ).rowcount
+                if updated:
+                    logger.warning(f"⚠️ Task {task['id']} ({task['kind']}) failed, retrying in {delay}s: {error}")
+                    return
+            else:
+                updated = db.execute(
+                    "UPDATE tasks SET status = 'failed', error = ?, lease_until = NULL, updated = ? "
+                    "WHERE id = ? AND worker = ?",
+                    (error, time.time(), task["id"], worker),
+                ).rowcount
+            if not updated:
+                # The lease expired and another worker owns the task now; its outcome decides
+                logger.warning(f"⚠️ Task {task['id']} was reclaimed by another worker; ignoring failure")
+                return
+            self._fail_job(db, task, error)
+
+    def _fail_job(self, db, task, error):
+        db.execute(
+            "UPDATE jobs SET status = 'failed', error = ?, updated = ? WHERE id = ?",
+            (f"{task['kind']}: {error}", time.time(), task["job_id"]),
+        )
+        logger.error(f"❌ Task {task['id']} ({task['kind']}) failed after {task['attempts']} attempts: {error}")
+
+    def _advance(self, db, job_id):
+        job = db.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        tasks = db.execute("SELECT kind, status FROM tasks WHERE job_id = ?", (job_id,)).fetchall()
+        kinds = {}
+        for row in tasks:
+            kinds.setdefault(row["kind"], []).append(row["status"])
+        options = json.loads(job["options"])
+
+        if options.get("transcribe"):
+            if kinds.get("transcribe") == ["done"]:
+                self._finish(db, job_id)
+            return
+        if "summarize" in kinds:
+            if kinds["summarize"] == ["done"]:
+                self._finish(db, job_id)
+            return
+        ready = (
+            kinds.get("extract") == ["done"]
+            and kinds.get("transcribe") == ["done"]
+            and all(status == "done" for status in kinds.get("ocr", []))
+        )
+        if ready:
+            self._enqueue(db, job_id, "summarize")
+
+    def _finish(self, db, job_id):
+        db.execute("UPDATE jobs SET status = 'done', updated = ? WHERE id = ?", (time.time(), job_id))
+        logger.info(f"✅ Job {job_id} complete")
+
+    def results(self, job_id, kind):
+        with self.transaction() as db:
+            rows = db.execute(
+                "SELECT result FROM tasks WHERE job_id = ? AND kind = ? AND status = 'done' ORDER BY position",
+                (job_id, kind),
+            ).fetchall()
+        return [json.loads(row["result"]) for row in rows]
+
+    def status(self):
+        with self.transaction() as db:
+            tasks = db.execute("SELECT kind, status, COUNT(*) AS count FROM tasks GROUP BY kind, status").fetchall()
+            jobs = db.execute("SELECT status, COUNT(*) AS count FROM jobs GROUP BY status").fetchall()
+            failed = db.execute("SELECT id, input, error FROM jobs WHERE status = 'failed' ORDER BY id").fetchall()
+        report = {"jobs": {row["status"]: row["count"] for row in jobs}, "tasks": {}, "failed": []}
+        for row in tasks:
+            report["tasks"].setdefault(row["kind"], {})[row["status"]] = row["count"]
+        report["failed"] = [dict(row) for row in failed]
+        return report
+
+    def idle(self, stages):
+        # True when no task of these stages is waiting or running and no job could still create one
+        placeholders = ",".join("?" for _ in stages)
+        with self.transaction() as db:
+            busy = db.execute(
+                f"SELECT COUNT(*) FROM tasks JOIN jobs ON jobs.id = tasks.job_id WHERE tasks.kind IN ({placeholders}) "
+                "AND tasks.status IN ('pending', 'running') AND jobs.status != 'failed'",
+                stages,
+            ).fetchone()[0]
+            running_jobs = db.execute("SELECT COUNT(*) FROM jobs WHERE status = 'running'").fetchone()[0]
+        return busy == 0 and running_jobs == 0
+
+
+class _Transaction:
+    # BEGIN IMMEDIATE takes the write lock up front, so two workers can never claim the same task
+    def __init__(self, db):
+        self.db = db
+
+    def __enter__(self):
+        self.db.execute("BEGIN IMMEDIATE")
+        return self.db
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.db.execute("ROLLBACK" if exc_type else "COMMIT")
+        finally:
+            self.db.close()
@@ -8,3 +8,58 @@ logging.getLogger().setLevel(logging.CRITICAL)
 @pytest.fixture
 def sample_chunk():
     return [{"start": 0.0, "end": 10.0, "text": "Install build tools using apt-get."}]
+
+
+@pytest.fixture
+def synthetic_video(tmp_path):
+    import cv2
+    import numpy as np
+
+    path = str(tmp_path / "synthetic.mp4")
+    writer = cv2.VideoWriter(path, cv2.VideoWriter_fourcc(*"mp4v"), 10, (320, 180))
+    for index in range(40):
+        frame = np.full((180, 320, 3), 255, dtype=np.uint8)
+        cv2.putText(frame, f"$ step {index // 10}", (20, 90), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
+        writer.write(frame)
+    writer.release()
+    return path
+
+
+@pytest.fixture
+def fake_pipeline(monkeypatch):
+    # Stands in for tesseract, Whisper and the LLM in end-to-end runs. screens is the OCR
+    # text of every frame, or a list of texts in frame order; reply answers every prompt,
+    # or is a function of the prompt. Returns the client, which records the prompts it
+    # was sent and counts OCR and transcription calls.
+    import frameflow.ocr as ocr
+    import frameflow.processor as processor
+    from frameflow.client import BaseClient
+
+    class FakeClient(BaseClient):
+        def __init__(self, reply):
+            self.reply = reply
+            self.prompts = []
+            self.calls = {"ocr": 0, "transcribe": 0}
+
+        def complete(self, prompt):
+            self.prompts.append(prompt)
+            return self.reply(prompt) if callable(self.reply) else self.reply
+
+    def install(screens="$ step", segments=(), reply="Do the step."):
+        client = FakeClient(reply)
+        texts = iter(screens) if isinstance(screens, list) else None
+
+        def image_to_string(image):
+            client.calls["ocr"] += 1
+            return screens if texts is None else next(texts)
+
+        def transcribe_segments(video_path, **options):
+            client.calls["transcribe"] += 1
+            return list(segments)
+
+        monkeypatch.setattr(ocr.pytesseract, "image_to_string", image_to_string)
+        monkeypatch.setattr(processor, "transcribe_segments", transcribe_segments)
+        monkeypatch.setattr(processor, "get_client", lambda *args: client)
+        return client
+
+    return install
@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+
+import cv2
+import numpy as np
+import pytest # type: ignore
+from frameflow.assets import AssetWriter, downscale
+from frameflow.metrics import metrics
+from frameflow.processor import ExtractedFrame
+import logging
+logging.getLogger().setLevel(logging.CRITICAL)
+
+
+def test_downscale_keeps_aspect_ratio_and_small_images():
+    image = np.zeros((720, 1280, 3), dtype=np.uint8)
+    assert downscale(image, 640).shape == (360, 640, 3)
+    assert downscale(image, 4000) is image
+    assert downscale(image, None) is image
+
+
+@pytest.mark.parametrize("image_format, extension", [("webp", ".webp"), ("jpeg", ".jpg"), ("png", ".png")])
+def test_asset_writer_converts_each_frame_once(tmp_path, image_format, extension):
+    path = str(tmp_path / "frame_00000.jpg")
+    image = np.random.default_rng(0).integers(0, 255, (90, 160, 3), dtype=np.uint8)
+    cv2.imwrite(path, image)
+    frame = ExtractedFrame("frame_00000.jpg", path, 0.0, None)
+    with AssetWriter(str(tmp_path / "assets"), "assets", image_format, quality=50) as assets:
+        markdown = assets.add(frame)
+        assert assets.add(frame) == markdown
+    assert markdown == f"![frame_00000.jpg](assets/frame_00000{extension})"
+    assert len(assets.futures) == 1
+    assert cv2.imread(str(tmp_path / "assets" / f"frame_00000{extension}")).shape == image.shape
+
+
+def test_asset_writer_reports_unreadable_frames(tmp_path):
+    metrics.reset()
+    with AssetWriter(str(tmp_path / "assets"), "assets") as assets:
+        assets.add(ExtractedFrame("frame_00000.jpg", str(tmp_path / "missing.jpg"), 0.0, None))
+    counters = metrics.to_dict()["counters"]
+    assert {"name": "assets_failed", "labels": {}, "value": 1} in counters
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+
+import time
+
+import pytest # type: ignore
+import frameflow.client as base
+import logging
+logging.getLogger().setLevel(logging.CRITICAL)
+
+
+class FlakyError(Exception):
+    pass
+
+
+class FlakyClient(base.BaseClient):
+    retryable_errors = (FlakyError,)
+    retry_policy = base.RetryPolicy(retries=3, initial_wait=0, max_wait=0)
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.calls = 0
+
+    def complete(self, prompt):
+        self.calls += 1
+        if self.calls <= self.failures:
+            raise FlakyError("busy")
+        return prompt.upper()
+
+
+def test_retry_policy_applies_to_every_client():
+    assert FlakyClient(failures=2).summarize_chunk("x") == "SUMMARIZE THIS CHUNK:\n\nX"
+    client = FlakyClient(failures=3)
+    assert client.summarize_chunk("x") == client.failure_message
+    assert client.calls == 3
+
+
+def test_summarize_chunks_keeps_order():
+    client = FlakyClient(failures=0)
+    client.prompt_prefix = ""
+    assert list(client.summarize_chunks(["a", "b", "c", "d"], max_workers=3)) == ["A", "B", "C", "D"]
+
+
+def test_rate_limiter_spaces_requests():
+    limiter = base.RateLimiter(requests_per_minute=600)
+    limiter.request_allowance = 0
+    start = time.monotonic()
+    for _ in range(3):
+        limiter.acquire()
+    assert time.monotonic() - start >= 0.25
+
+
+def test_create_client_keeps_default_model():
+    from frameflow.local_llm_client import LocalLLMClient
+    assert base.get_client_class("local") is LocalLLMClient
+    assert base.create_client("local").model == "mistral"
+    assert base.create_client("local", model="llama3").model == "llama3"
+
+
+def test_unknown_client_is_rejected():
+    try:
+        base.create_client("nope")
+    except ValueError as e:
+        assert "nope" in str(e)
+    else:
+        raise AssertionError("expected ValueError")
+
+
+def test_streamed_summaries_are_logged_as_they_arrive(tmp_path):
+    import json
+    from frameflow.metrics import metrics
+    from frameflow.streaming import StreamLog
+
+    class StreamingClient(FlakyClient):
+        stream = True
+        prompt_prefix = ""
+
+        def complete_stream(self, prompt):
+            yield "Do "
+            self.calls += 1
+            if self.calls <= self.failures:
+                raise FlakyError("connection dropped")
+            yield prompt
+
+    metrics.reset()
+    path = tmp_path / "stream.jsonl"
+    with StreamLog(str(path)) as log:
+        assert list(StreamingClient(failures=1).summarize_chunks(["a", "b"], 1, log)) == ["Do a", "Do b"]
+    events = [json.loads(line) for line in path.read_text().splitlines()]
+    first = [event for event in events if event["step"] == 1]
+    # The first attempt broke off after one delta; the reader is told to discard it
+    assert [event["event"] for event in first] == ["delta", "retry", "delta", "delta", "done"]
+    assert first[-1]["attempts"] == 2 and first[-1]["first_token_seconds"] is not None
+    assert [event.get("text") for event in events if event["step"] == 2] == ["Do ", "b", None]
+    assert metrics.to_dict()["stages"]["llm_first_token"]["calls"] == 3
+
+
+def test_unstreamed_and_failed_summaries_are_logged_whole(tmp_path):
+    import json
+    from frameflow.streaming import StreamLog
+
+    path = tmp_path / "stream.jsonl"
+    with StreamLog(str(path)) as log:
+        client = FlakyClient(failures=3)
+        client.prompt_prefix = ""
+        assert list(client.summarize_chunks(["a"], 1, log)) == [client.failure_message]
+        client.failures = 0
+        assert list(client.summarize_chunks(["b"], 1, log, stage="reduce")) == ["B"]
+    events = [json.loads(line) for line in path.read_text().splitlines()]
+    assert [(event["stage"], event["event"], event.get("failed")) for event in events] == [
+        ("step", "done", True), ("reduce", "delta", None), ("reduce", "done", False),
+    ]
+
+
+@pytest.mark.parametrize("client_name", ["openai", "claude"])
+def test_local_client_options_do_not_break_other_clients(client_name):
+    from frameflow.processor import build_client
+    options = {"endpoint": "http://localhost:8000/v1/chat/completions", "timeout": 30.0, "batch_size": 4}
+    client = build_client(client_name, "test-key", None, client_options=options)
+    assert client.name != "LocalLLMClient"
+    assert not hasattr(client, "timeout")
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+
+import frameflow.batch as batch
+import logging
+logging.getLogger().setLevel(logging.CRITICAL)
+
+
+def test_discover_jobs_from_directory_and_manifest(tmp_path):
+    (tmp_path / "b.mp4").write_bytes(b"")
+    (tmp_path / "a.MOV").write_bytes(b"")
+    (tmp_path / "notes.txt").write_text("skip me")
+    assert [job["input"] for job in batch.discover_jobs(str(tmp_path))] == [
+        str(tmp_path / "a.MOV"), str(tmp_path / "b.mp4")
+    ]
+
+    manifest = tmp_path / "jobs.jsonl"
+    manifest.write_text('# nightly\nb.mp4\n{"input": "a.MOV", "output": "/tmp/a.md"}\n'
+                        '{"input": "b.mp4", "output": "docs/b.md"}\n')
+    assert batch.discover_jobs(str(manifest)) == [
+        {"input": str(tmp_path / "b.mp4")},
+        {"input": str(tmp_path / "a.MOV"), "output": "/tmp/a.md"},
+        {"input": str(tmp_path / "b.mp4"), "output": str(tmp_path / "docs" / "b.md")},
+    ]
+
+
+def test_run_batch_shares_client_and_isolates_work_dirs(tmp_path, monkeypatch):
+    (tmp_path / "videos" / "x").mkdir(parents=True)
+    (tmp_path / "videos" / "y").mkdir()
+    manifest = tmp_path / "jobs.txt"
+    manifest.write_text("videos/x/demo.mp4\nvideos/y/demo.mp4\n")
+    calls = []
+
+    def fake_process_video(input_file, output, **options):
+        calls.append((options["work_dir"], options["client"]))
+        if "/y/" in input_file:
+            raise RuntimeError("corrupt video")
+
+    monkeypatch.setattr(batch, "process_video", fake_process_video)
+    class FakeClient:
+        cache = None
+
+    monkeypatch.setattr(batch, "build_client", lambda *args: FakeClient())
+    results = batch.run_batch(str(manifest), str(tmp_path / "out"), jobs=2, ocr_workers=1)
+
+    assert len({work_dir for work_dir, _ in calls}) == 2
+    assert len({id(client) for _, client in calls}) == 1
+    assert sorted(error is None for error in results.values()) == [False, True]
+
+
+def test_run_batch_shares_cache_and_evicts_only_between_batches(tmp_path, monkeypatch):
+    (tmp_path / "a.mp4").write_bytes(b"")
+    (tmp_path / "b.mp4").write_bytes(b"")
+    caches = []
+    events = []
+
+    def fake_process_video(input_file, output, **options):
+        caches.append(options["cache"])
+        events.append("job")
+
+    monkeypatch.setattr(batch, "process_video", fake_process_video)
+    monkeypatch.setattr(batch, "build_client", lambda *args: type("FakeClient", (), {"cache": None})())
+    monkeypatch.setattr(batch.Cache, "evict", lambda self: events.append("evict"))
+    batch.run_batch(str(tmp_path), str(tmp_path / "out"), jobs=2, ocr_workers=1, cache_dir=str(tmp_path / "cache"))
+    assert caches[0] is caches[1] is not None
+    # Never while a job may be reading cached frames
+    assert events == ["evict", "job", "job", "evict"]
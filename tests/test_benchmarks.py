@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+
+import json
+
+import cv2
+from benchmarks.stub_llm import StubLLMServer
+from benchmarks.synthetic import generate_screencast
+from frameflow.local_llm_client import LocalLLMClient
+from frameflow.streaming import StreamLog
+import logging
+logging.getLogger().setLevel(logging.CRITICAL)
+
+
+def test_synthetic_screencast_has_expected_frames(tmp_path):
+    video = generate_screencast(str(tmp_path / "bench.mp4"), duration=4, fps=5, scene_seconds=2,
+                                size=(320, 180), with_audio=False)
+    cap = cv2.VideoCapture(video["path"])
+    assert int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) == video["frames"] == 20
+    assert video["scenes"] == 2
+    cap.release()
+
+
+def test_stub_llm_answers_local_client():
+    with StubLLMServer(latency=0) as stub:
+        client = LocalLLMClient(endpoint=stub.endpoint)
+        assert list(client.summarize_chunks(["a", "b"], max_workers=2))[0].startswith("Step summary")
+        assert stub.requests == 2
+
+
+def test_local_client_reuses_connections():
+    with StubLLMServer(latency=0) as stub:
+        client = LocalLLMClient(endpoint=stub.endpoint)
+        for chunk in ["a", "b", "c", "d"]:
+            client.summarize_chunk(chunk)
+        assert stub.requests == 4
+        assert stub.connections == 1
+
+
+def test_local_client_streams_and_batches(tmp_path):
+    with StubLLMServer(latency=0) as stub:
+        client = LocalLLMClient(endpoint=stub.endpoint, stream=True)
+        assert client.summarize_chunk("abc") == "Step summary (3 chars in)."
+
+        client = LocalLLMClient(endpoint=stub.endpoint, batch_size=3)
+        summaries = list(client.summarize_chunks(["a", "bb", "ccc", "dddd"], max_workers=2))
+        assert summaries == [f"Step summary ({n} chars in)." for n in (1, 2, 3, 4)]
+        # One request for the first three prompts, one for the remainder
+        assert stub.requests == 3
+
+        # Streamed text reaches the sidecar piece by piece
+        client = LocalLLMClient(endpoint=stub.endpoint, stream=True)
+        with StreamLog(str(tmp_path / "stream.jsonl")) as log:
+            list(client.summarize_chunks(["abc"], 1, log))
+        texts = [json.loads(line).get("text") for line in (tmp_path / "stream.jsonl").read_text().splitlines()]
+        assert texts == ["Step", " summary", " (3", " chars", " in).", None]
@@ -0,0 +1,28 @@
+#!/usr/bin/env python3
+
+import os
+import time
+from frameflow.cache import Cache, cache_key
+import logging
+logging.getLogger().setLevel(logging.CRITICAL)
+
+
+def test_cache_round_trip_and_key_stability(tmp_path):
+    cache = Cache(str(tmp_path))
+    key = cache_key("summary", "OpenAIClient", "gpt-4o", "prompt")
+    assert key == cache_key("summary", "OpenAIClient", "gpt-4o", "prompt")
+    assert cache.get_json("summaries", key) is None
+    cache.put_json("summaries", key, "cached summary")
+    assert cache.get_json("summaries", key) == "cached summary"
+
+
+def test_evict_removes_least_recently_used(tmp_path):
+    cache = Cache(str(tmp_path), max_bytes=2500)
+    for index, name in enumerate(["old", "recent", "newest"]):
+        cache.put_json("ocr", cache_key(name), "x" * 1000)
+        path = cache.entry_path("ocr", cache_key(name))
+        os.utime(path, (time.time() - 100 + index, time.time() - 100 + index))
+    cache.get_json("ocr", cache_key("old"))
+    assert cache.evict() == 1
+    assert cache.get_json("ocr", cache_key("recent")) is None
+    assert cache.get_json("ocr", cache_key("old")) is not None
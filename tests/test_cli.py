@@ -9,3 +9,16 @@ def test_cli_help():
     result = subprocess.run(["python", "-m", "frameflow.cli", "--help"], capture_output=True, text=True)
     assert result.returncode == 0
     assert "FrameFlow" in result.stdout
+
+
+def test_cli_batch_help():
+    result = subprocess.run(["python", "-m", "frameflow.cli", "batch", "--help"], capture_output=True, text=True)
+    assert result.returncode == 0
+    assert "--jobs" in result.stdout
+
+
+def test_cli_import_is_lazy():
+    # --help must not pay for OpenCV or the LLM SDKs
+    code = "import sys, frameflow.cli; print(sorted(m for m in ('cv2', 'openai', 'anthropic', 'torch') if m in sys.modules))"
+    result = subprocess.run(["python", "-c", code], capture_output=True, text=True)
+    assert result.stdout.strip() == "[]"
@@ -71,10 +71,11 @@ def test_claude_client(monkeypatch):
 
 def test_local_llm_client(monkeypatch):
     class MockResponse:
+        def raise_for_status(self): pass
         def json(self):
             return {'choices': [{'message': {'content': 'local summary'}}]}
 
-    monkeypatch.setattr(lclient.requests, "post", lambda *a, **k: MockResponse())
+    monkeypatch.setattr(lclient.requests.Session, "post", lambda *a, **k: MockResponse())
     client = lclient.LocalLLMClient()
     result = client.summarize_chunk("test chunk")
     assert "local summary" in result
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+
+import shutil
+
+import cv2
+import pytest # type: ignore
+
+import frameflow.processor as processor
+from frameflow.decoder import scaled_size, select_filters
+import logging
+logging.getLogger().setLevel(logging.CRITICAL)
+
+needs_ffmpeg = pytest.mark.skipif(shutil.which("ffmpeg") is None, reason="ffmpeg not installed")
+
+
+def test_scaled_size_only_downscales():
+    assert scaled_size(1920, 1080, None) == (1920, 1080)
+    assert scaled_size(1920, 1080, 4000) == (1920, 1080)
+    assert scaled_size(1920, 1080, 961) == (960, 540)
+
+
+def test_select_filters():
+    assert select_filters() == []
+    sampling, scene = select_filters(0.95, 0.3)
+    assert "prev_selected_t\\,0.950000" in sampling
+    assert "gt(scene\\,0.3)" in scene
+
+
+@needs_ffmpeg
+def test_ffmpeg_decoder_matches_opencv(synthetic_video, tmp_path):
+    for options in ({"fps": 5}, {}):
+        frames = {
+            decoder: processor.extract_frames(synthetic_video, str(tmp_path / decoder), decoder=decoder, **options)
+            for decoder in ("opencv", "ffmpeg")
+        }
+        assert [f.timestamp for f in frames["ffmpeg"]] == [f.timestamp for f in frames["opencv"]]
+
+
+@needs_ffmpeg
+def test_ffmpeg_decoder_downscales_and_stops_early(synthetic_video, tmp_path):
+    frames = processor.iter_frames(synthetic_video, str(tmp_path), fps=10, decoder="ffmpeg", decode_width=160)
+    first = next(frames)
+    assert first.image.shape == (90, 160, 3)
+    assert cv2.imread(first.path).shape == (90, 160, 3)
+    # Closing early must not wait for (or complain about) the killed ffmpeg process
+    frames.close()
+
+
+def test_ffmpeg_only_options_need_ffmpeg_decoder(synthetic_video, tmp_path):
+    with pytest.raises(ValueError):
+        processor.extract_frames(synthetic_video, str(tmp_path), keyframes_only=True)
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+
+import json
+import os
+
+from frameflow.metrics import Metrics
+
+
+def test_timer_accumulates_stage_stats():
+    metrics = Metrics()
+    for _ in range(3):
+        with metrics.timer("ocr", items=2) as timer:
+            timer.add(bytes=10)
+    metrics.record("llm_request", calls=0, tokens_in=100, tokens_out=20)
+
+    stages = metrics.to_dict()["stages"]
+    assert stages["ocr"]["calls"] == 3
+    assert stages["ocr"]["items"] == 6
+    assert stages["ocr"]["bytes"] == 30
+    assert stages["ocr"]["wall_seconds"] >= 0
+    assert stages["llm_request"]["tokens_in"] == 100
+    assert stages["llm_request"]["tokens_out"] == 20
+
+
+def test_timed_iter_counts_items():
+    metrics = Metrics()
+    assert list(metrics.timed_iter("decode", range(5))) == [0, 1, 2, 3, 4]
+    stats = metrics.to_dict()["stages"]["decode"]
+    assert stats["items"] == 5
+    # One extra call notices the end of the iterable
+    assert stats["calls"] == 6
+
+
+def test_reports(tmp_path):
+    metrics = Metrics()
+    metrics.record("ocr", 1.5, 1.0, items=4)
+    metrics.increment("cache_hits", namespace="ocr")
+    metrics.increment("cache_hits", 2, namespace="ocr")
+
+    json_path = tmp_path / "metrics.json"
+    metrics.write_json(str(json_path))
+    report = json.loads(json_path.read_text())
+    assert report["counters"] == [{"name": "cache_hits", "labels": {"namespace": "ocr"}, "value": 3}]
+
+    prom_path = tmp_path / "frameflow.prom"
+    metrics.write_prometheus(str(prom_path))
+    text = prom_path.read_text()
+    assert 'frameflow_stage_wall_seconds_total{stage="ocr"} 1.5' in text
+    assert 'frameflow_stage_items_total{stage="ocr"} 4' in text
+    assert 'frameflow_cache_hits_total{namespace="ocr"} 3' in text
+
+
+def test_profiled_writes_stats(tmp_path):
+    metrics = Metrics()
+    with metrics.profiled("noop"):
+        pass
+    assert not os.listdir(tmp_path)
+
+    metrics.profile_dir = str(tmp_path)
+    with metrics.profiled("stage"):
+        sum(range(1000))
+    assert any(name.startswith("stage-") for name in os.listdir(tmp_path))
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+import numpy as np
+import frameflow.ocr as ocr
+import logging
+logging.getLogger().setLevel(logging.CRITICAL)
+
+
+def test_preprocess_image_grayscale_downscale_binarize():
+    image = np.zeros((100, 200, 3), dtype=np.uint8)
+    image[:, 100:] = 200
+    result = ocr.preprocess_image(image, scale=0.5, binarize=True)
+    assert result.shape == (50, 100)
+    assert set(np.unique(result)) == {0, 255}
+
+
+def test_engine_map_keeps_input_order(monkeypatch):
+    monkeypatch.setattr(ocr.pytesseract, "image_to_string", lambda image: f"width {image.shape[1]}")
+    frames = [np.zeros((10, width, 3), dtype=np.uint8) for width in (30, 10, 20)]
+    with ocr.OCREngine(workers=1) as engine:
+        results = [text for _, text in engine.map(frames)]
+    assert results == ["width 30", "width 10", "width 20"]
+
+
+def test_engine_map_byte_budget_limits_frames_in_flight(monkeypatch):
+    monkeypatch.setattr(ocr.pytesseract, "image_to_string", lambda image: "text")
+    frames = [np.zeros((10, 10, 3), dtype=np.uint8) for _ in range(8)]
+
+    def pulled_before_first_result(**budget):
+        pulled = []
+
+        def source():
+            for frame in frames:
+                pulled.append(frame)
+                yield frame
+
+        with ocr.OCREngine(workers=1) as engine:
+            # Window of eight frames; no process pool is started
+            engine.workers = 4
+            next(engine.map(source(), size_of=lambda frame: frame.nbytes, **budget))
+        return len(pulled)
+
+    assert pulled_before_first_result() == 8
+    assert pulled_before_first_result(max_bytes=3 * frames[0].nbytes) == 4
+
+
+def fake_image_to_data(calls):
+    # Every horizontal run of rows with the same non-zero value is one "line" of text
+    def image_to_data(image, output_type=None):
+        calls.append(image.shape[0])
+        data = {key: [] for key in ("text", "block_num", "par_num", "line_num", "left", "top", "width", "height")}
+        rows = image[:, :, 0].max(axis=1) if image.ndim == 3 else image.max(axis=1)
+        start = 0
+        for row in range(1, len(rows) + 1):
+            if row == len(rows) or rows[row] != rows[start]:
+                if rows[start]:
+                    for key, value in (("text", f"w{rows[start]}"), ("block_num", 1), ("par_num", 1),
+                                       ("line_num", start), ("left", 0), ("top", start),
+                                       ("width", image.shape[1]), ("height", row - start)):
+                        data[key].append(value)
+                start = row
+        return data
+    return image_to_data
+
+
+def test_incremental_ocr_only_reads_changed_rows(monkeypatch):
+    calls = []
+    monkeypatch.setattr(ocr.pytesseract, "image_to_data", fake_image_to_data(calls))
+    first = np.zeros((100, 200, 3), dtype=np.uint8)
+    for line, value in enumerate((10, 20, 30)):
+        first[line * 10:(line + 1) * 10] = value
+    second = first.copy()
+    second[30:40] = 40
+    third = second.copy()
+
+    with ocr.OCREngine(workers=1, incremental=True) as engine:
+        results = [text for _, text in engine.map([first, second, third])]
+    assert results[0] == "w10\nw20\nw30"
+    assert results[1].split("\n")[-1] == "w40"
+    assert results[1].count("w10") == 1 and results[1].count("w30") == 1
+    assert results[2] == results[1]
+    # Full frame, then a band around the new line; the unchanged third frame needs no OCR
+    assert calls[0] == 100
+    assert len(calls) == 2 and calls[1] < 30
+
+
+def test_incremental_cache_stores_band_ocr_not_merged_text(monkeypatch, tmp_path):
+    from frameflow.cache import Cache
+    calls = []
+    monkeypatch.setattr(ocr.pytesseract, "image_to_data", fake_image_to_data(calls))
+    first = np.zeros((100, 200, 3), dtype=np.uint8)
+    for line, value in enumerate((10, 20, 30)):
+        first[line * 10:(line + 1) * 10] = value
+    second = first.copy()
+    second[30:40] = 40
+    other = second.copy()
+    other[0:10] = 50
+    frames = {"first": first, "second": second, "other": other}
+
+    def run(names):
+        with ocr.OCREngine(workers=1, cache=Cache(str(tmp_path)), incremental=True) as engine:
+            return [text for _, text in engine.map(names, frames.get, lambda name: name)]
+
+    assert run(["first", "second"])[1] == "w10\nw20\nw30\nw40"
+    calls.clear()
+    # Same frames and bands: nothing is read again
+    assert run(["first", "second"])[1] == "w10\nw20\nw30\nw40"
+    assert calls == []
+    # A different predecessor changes the bands; the merge uses that predecessor's lines
+    assert run(["other", "second"]) == ["w50\nw20\nw30\nw40", "w10\nw20\nw30\nw40"]
+    # The new predecessor is read in full, then only the band where the frames differ
+    assert calls[0] == 100 and len(calls) == 2 and calls[1] < 100
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+
+import time
+
+import pytest # type: ignore
+from frameflow.pipeline import threaded
+import logging
+logging.getLogger().setLevel(logging.CRITICAL)
+
+
+def test_threaded_preserves_order_through_bounded_queue():
+    assert list(threaded(iter(range(50)), maxsize=2)) == list(range(50))
+
+
+def test_threaded_reraises_and_closes_producer():
+    closed = []
+
+    def producer():
+        try:
+            yield 1
+            raise RuntimeError("decoder failed")
+        finally:
+            closed.append(True)
+
+    with pytest.raises(RuntimeError):
+        list(threaded(producer(), maxsize=1))
+    assert closed == [True]
+
+
+def test_threaded_byte_budget_holds_back_producer():
+    produced = []
+
+    def producer():
+        for size in (4, 4, 4, 20, 1):
+            produced.append(size)
+            yield size
+
+    items = threaded(producer(), maxsize=0, max_bytes=8, size_of=lambda size: size)
+    assert next(items) == 4
+    time.sleep(0.2)
+    # Two items fit in the budget; the large one is read but waits until the queue drains
+    assert produced == [4, 4, 4, 20]
+    # An item larger than the budget still passes once the queue drains
+    assert list(items) == [4, 4, 20, 1]
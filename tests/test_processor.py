@@ -1,5 +1,10 @@
 #!/usr/bin/env python3
 
+import os
+
+import cv2
+import pytest # type: ignore
+
 import frameflow.processor as processor
 import logging
 logging.getLogger().setLevel(logging.CRITICAL)
@@ -8,3 +13,136 @@ logging.getLogger().setLevel(logging.CRITICAL)
 def test_process_video_runs():
     processor.process_video("demo.mp4", "out.md", None, "large", False, False, "openai", None)
 
+
+def test_frame_interval_never_zero():
+    assert processor.frame_interval_for(30.0, 60.0) == 1
+    assert processor.frame_interval_for(30.0, 2.0) == 15
+    # Halves round up, not to even as with round()
+    assert processor.frame_interval_for(25.0, 2.0) == 13
+    assert processor.frame_interval_for(29.97, 2.0) == 15
+
+
+def test_read_frames_modes_agree(synthetic_video):
+    indices = {}
+    for mode in ("grab", "seek"):
+        cap = cv2.VideoCapture(synthetic_video)
+        indices[mode] = [index for index, _ in processor.read_frames(cap, 10, mode, 10.0, 40)]
+        cap.release()
+    assert indices["grab"] == indices["seek"] == [0, 10, 20, 30]
+
+
+def test_extract_frames_keeps_scene_changes(synthetic_video, tmp_path):
+    output_dir = tmp_path / "frames"
+    processor.extract_frames(synthetic_video, str(output_dir))
+    assert len(list(output_dir.iterdir())) == 4
+
+
+def test_process_video_reuses_cache(synthetic_video, tmp_path, monkeypatch, fake_pipeline):
+    client = fake_pipeline(screens=[f"$ step {index}" for index in range(4)],
+                           segments=[{"start": 0.0, "end": 4.0, "text": "Run each step."}])
+    monkeypatch.chdir(tmp_path)
+    for _ in range(2):
+        processor.process_video(synthetic_video, "out.md", None, "tiny", False, False, "openai", None, None,
+                                ocr_workers=1, cache_dir=str(tmp_path / "cache"))
+    assert client.calls == {"ocr": 4, "transcribe": 1}
+    assert len(client.prompts) == 4
+    assert (tmp_path / "out.md").read_text().count("Do the step.") == 4
+
+
+def test_process_video_fails_without_waiting_for_transcription(synthetic_video, tmp_path, monkeypatch,
+                                                               fake_pipeline):
+    import threading
+    import time
+    release = threading.Event()
+    started = []
+
+    def slow_transcribe(video_path, **options):
+        started.append(True)
+        release.wait(10)
+        return []
+
+    fake_pipeline()
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(processor, "transcribe_segments", slow_transcribe)
+    begin = time.monotonic()
+    # A bad option is caught before transcription starts
+    with pytest.raises(ValueError, match="--decoder ffmpeg"):
+        processor.process_video(synthetic_video, "out.md", None, "tiny", False, False, "openai", None, None,
+                                keyframes_only=True, cache_dir=None)
+    assert started == []
+    # A later stage failing does not wait for the transcription either
+    monkeypatch.setattr(processor, "frame_source", lambda *args: (_ for _ in ()).throw(RuntimeError("decode failed")))
+    with pytest.raises(RuntimeError, match="decode failed"):
+        processor.process_video(synthetic_video, "out.md", None, "tiny", False, False, "openai", None, None,
+                                cache_dir=None)
+    assert started == [True]
+    assert time.monotonic() - begin < 5
+    release.set()
+
+
+def test_process_video_hierarchical_groups_frames(synthetic_video, tmp_path, monkeypatch, fake_pipeline):
+    import json
+    reduced = json.dumps([{"title": "List and test", "text": "Run ls, then make test.", "sources": [1, 2]}])
+    client = fake_pipeline(screens=["$ ls", "$ ls", "$ make test", "$ make test"],
+                           reply=lambda prompt: reduced if "Draft 1" in prompt else "Draft step.")
+    monkeypatch.chdir(tmp_path)
+    processor.process_video(synthetic_video, "out.md", None, "tiny", False, False, "openai", None, None,
+                            ocr_workers=1, cache_dir=None, summary_mode="hierarchical")
+    # Two candidate steps from four frames, then one reduce request
+    assert len(client.prompts) == 3
+    text = (tmp_path / "out.md").read_text()
+    assert "## Step 1: List and test" in text
+    assert text.count("![frame_") == 2
+
+
+def test_frame_disk_budget_is_spread_over_the_video(synthetic_video, tmp_path):
+    full = processor.extract_frames(synthetic_video, str(tmp_path / "full"), fps=2)
+    sizes = [os.path.getsize(frame.path) for frame in full]
+    budget = sum(sizes) // 2
+    capped = processor.extract_frames(synthetic_video, str(tmp_path / "capped"), fps=2, max_frame_bytes=budget)
+    assert 0 < len(capped) < len(full)
+    assert sum(os.path.getsize(frame.path) for frame in capped) <= budget
+    # Kept frames cover the whole video, not just its beginning
+    assert capped[-1].timestamp >= 3.0
+
+
+def test_bounded_mode_spills_transcript(synthetic_video, tmp_path, fake_pipeline):
+    fake_pipeline(segments=[{"start": 0.0, "end": 4.0, "text": "Run each step."}],
+                  reply=lambda prompt: "Do the step." if "Run each step." in prompt else "Missing narration.")
+    processor.process_video(synthetic_video, str(tmp_path / "out.md"), None, "tiny", False, False, "openai", None,
+                            None, ocr_workers=1, cache_dir=None, max_memory_mb=1, max_disk_mb=1,
+                            work_dir=str(tmp_path))
+    assert (tmp_path / "out.md").read_text().count("Do the step.") == 4
+    assert not list(tmp_path.glob("frameflow-transcript-*"))
+
+
+def test_asset_stage_writes_only_referenced_frames(synthetic_video, tmp_path, monkeypatch, fake_pipeline):
+    import json
+    reduced = json.dumps([{"title": "Test", "text": "Run make test.", "sources": [2]}])
+    fake_pipeline(screens=["$ ls", "$ ls", "$ make test", "$ make test"],
+                  reply=lambda prompt: reduced if "Draft 1" in prompt else "Draft step.")
+    monkeypatch.chdir(tmp_path)
+    processor.process_video(synthetic_video, "out.md", None, "tiny", False, False, "openai", None, None,
+                            ocr_workers=1, cache_dir=None, summary_mode="hierarchical",
+                            assets_dir="assets", asset_max_width=64, thumbnail_width=16)
+    text = (tmp_path / "out.md").read_text()
+    # The reduce step dropped the first candidate, so only the frame of the second is written
+    assert text.count("![frame_") == 1
+    assert sorted(path.name for path in (tmp_path / "assets").iterdir()) == [
+        "frame_00003.webp", "frame_00003_thumb.webp",
+    ]
+    assert "[![frame_00003.jpg](assets/frame_00003_thumb.webp)](assets/frame_00003.webp)" in text
+    assert cv2.imread(str(tmp_path / "assets" / "frame_00003.webp")).shape[1] == 64
+    # Extracted frames were scratch files
+    assert not list(tmp_path.glob("frames*"))
+
+
+def test_frame_disk_budget_covers_the_cache_copy(synthetic_video, tmp_path):
+    from frameflow.cache import Cache
+    full = processor.extract_frames(synthetic_video, str(tmp_path / "full"), fps=2)
+    budget = sum(os.path.getsize(frame.path) for frame in full) // 2
+    cache = Cache(str(tmp_path / "cache"))
+    options = processor.extraction_settings(fps=2, max_disk_mb=budget / 1024 / 1024)
+    frames = list(processor.frame_source(synthetic_video, str(tmp_path / "frames"), options, cache, "video"))
+    on_disk = sum(path.stat().st_size for root in ("frames", "cache") for path in (tmp_path / root).rglob("*.jpg"))
+    assert frames and on_disk <= budget
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+from frameflow.client import BaseClient
+from frameflow.prompts import PromptBuilder, TokenCounter, TRUNCATION_MARKER
+import logging
+logging.getLogger().setLevel(logging.CRITICAL)
+
+
+def test_builder_drops_lines_sent_before():
+    builder = PromptBuilder(budget=None)
+    first = builder.build("File  Edit  View\n$ make build\n}", "Build it.")
+    second = builder.build("File Edit View\n$ make test\n}", "Now test.")
+    assert "File  Edit  View" in first
+    # Spacing differences from OCR still count as a repeat
+    assert "File Edit View" not in second
+    assert "$ make test" in second
+    # Short lines are always kept
+    assert second.count("}") == 1
+
+
+def test_builder_keeps_indentation_and_collapses_blank_lines():
+    builder = PromptBuilder(budget=None)
+    code = "def main():\n    if ready:\n        run()   \n\n\n\n    return 0\n\n"
+    assert builder.pack_lines(code) == "def main():\n    if ready:\n        run()\n\n    return 0"
+    # Already sent, whatever its indentation; new lines keep theirs
+    assert builder.pack_lines("  def main():\n            run(fast=True)") == "            run(fast=True)"
+
+
+def test_builder_respects_budget():
+    counter = TokenCounter()
+    builder = PromptBuilder(counter, budget=200, dedup=False)
+    ocr = "\n".join(f"line {i} of a very long terminal session output" for i in range(200))
+    transcript = "narration " * 500
+    prompt = builder.build(ocr, transcript)
+    assert counter.count(prompt) <= 200
+    assert "line 0 " in prompt
+    assert TRUNCATION_MARKER in prompt
+
+
+def test_truncation_keeps_requested_part():
+    counter = TokenCounter()
+    text = " ".join(f"w{i}" for i in range(1000))
+    head = counter.truncate(text, 50, keep="head")
+    tail = counter.truncate(text, 50, keep="tail")
+    middle = counter.truncate(text, 50, keep="middle")
+    assert head.startswith("w0 ") and not head.rstrip().endswith("w999")
+    assert tail.endswith("w999") and not tail.startswith("w0 ")
+    assert middle.startswith("w0 ") and middle.endswith("w999")
+    assert counter.truncate("short", 50) == "short"
+
+
+class SmallClient(BaseClient):
+    max_prompt_tokens = 20
+    truncation = "tail"
+
+    def complete(self, prompt):
+        return prompt
+
+
+def test_client_truncation_policy():
+    prompt = SmallClient().build_prompt("start " + "filler " * 200 + "end")
+    assert prompt.endswith("end")
+    assert SmallClient().count_tokens(prompt) <= 20
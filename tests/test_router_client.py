@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+
+import time
+
+from benchmarks.stub_llm import StubLLMServer
+from frameflow.client import BaseClient, RetryPolicy, create_client
+from frameflow.metrics import metrics
+from frameflow.router_client import RouterClient
+import logging
+logging.getLogger().setLevel(logging.CRITICAL)
+
+
+class Overloaded(Exception):
+    pass
+
+
+class FakeBackend(BaseClient):
+    retryable_errors = (Overloaded,)
+
+    def __init__(self, name, latency=0.0, failing=False):
+        self.model = name
+        self.latency = latency
+        self.failing = failing
+        self.calls = 0
+
+    def complete(self, prompt):
+        self.calls += 1
+        time.sleep(self.latency() if callable(self.latency) else self.latency)
+        if self.failing:
+            raise Overloaded("429")
+        return f"summary from {self.model}"
+
+
+def test_router_prefers_the_faster_backend():
+    slow, fast = FakeBackend("slow", 0.03), FakeBackend("fast", 0.0)
+    router = RouterClient([slow, fast], explore=0)
+    answers = [router.complete("prompt") for _ in range(10)]
+    # Each backend is measured once, then the fast one takes everything
+    assert slow.calls == 1
+    assert answers[-1] == "summary from fast"
+
+
+def test_router_fails_over_and_cools_down_rate_limited_backend():
+    metrics.reset()
+    limited, spare = FakeBackend("limited", failing=True), FakeBackend("spare", 0.01)
+    router = RouterClient([limited, spare], explore=0)
+    assert router.complete("prompt") == "summary from spare"
+    assert router.complete("prompt") == "summary from spare"
+    # The rate-limited backend sits out its cooldown instead of being retried
+    assert limited.calls == 1
+    assert {"name": "llm_failovers", "labels": {"client": "FakeBackend"}, "value": 1} in metrics.to_dict()["counters"]
+
+
+def test_router_hedges_requests_past_p95():
+    latencies = iter([0.01] * 5 + [1.0])
+    primary = FakeBackend("primary", lambda: next(latencies, 0.01))
+    backup = FakeBackend("backup", 0.2)
+    router = RouterClient([primary, backup], hedge=True, hedge_min_samples=5, explore=0)
+    # Measured already, so the untried backup is not preferred while it is being sampled
+    router.stats[id(backup)].started()
+    router.stats[id(backup)].succeeded(0.2)
+    for _ in range(5):
+        router.complete("prompt")
+    start = time.monotonic()
+    assert router.complete("prompt") == "summary from backup"
+    assert time.monotonic() - start < 0.6
+
+
+def test_router_gives_up_when_every_backend_fails():
+    router = RouterClient([FakeBackend("a", failing=True), FakeBackend("b", failing=True)])
+    router.retry_policy = RetryPolicy(retries=1)
+    assert router.summarize_chunk("text") == router.failure_message
+
+
+def test_router_builds_backends_from_specs():
+    with StubLLMServer(latency=0) as stub:
+        router = create_client("router", backends="local:m1, local:m2", endpoint=stub.endpoint, stream=True)
+        assert router.model_id == "m1+m2"
+        assert router.summarize_chunk("abc").startswith("Step summary")
+
+
+def test_router_counts_both_backends_of_a_failed_hedge():
+    import pytest # type: ignore
+    from frameflow.router_client import RouterError
+
+    class Broken(FakeBackend):
+        def complete(self, prompt):
+            self.calls += 1
+            raise ValueError("bad model")
+
+    primary, secondary = FakeBackend("primary", 0.1, failing=True), Broken("secondary")
+    router = RouterClient([primary, secondary], hedge=True, hedge_min_samples=5, explore=0)
+    for backend, latency in ((primary, 0.01), (secondary, 0.02)):
+        for _ in range(5):
+            router.stats[id(backend)].started()
+            router.stats[id(backend)].succeeded(latency)
+    with pytest.raises(RouterError) as raised:
+        router.complete("prompt")
+    # Neither backend is tried twice, and each error is judged by the backend that raised it
+    assert primary.calls == secondary.calls == 1
+    assert sorted((label, retryable) for label, _, retryable in raised.value.errors) == [
+        ("Broken(secondary)", False), ("FakeBackend(primary)", True),
+    ]
+
+
+def test_router_flags_are_ignored_by_other_clients():
+    from frameflow.processor import build_client
+    client = build_client("local", None, None, client_options={"backends": "openai,claude", "hedge": True})
+    assert client.name == "LocalLLMClient"
+
+
+class StreamingBackend(FakeBackend):
+    def complete_stream(self, prompt):
+        self.calls += 1
+        if self.failing:
+            raise Overloaded("429")
+        yield "summary "
+        yield f"from {self.model}"
+
+
+def test_router_streams_from_the_chosen_backend(tmp_path):
+    import json
+    import pytest # type: ignore
+    from frameflow.router_client import RouterError
+    from frameflow.streaming import StreamLog
+
+    broken, good = StreamingBackend("broken", failing=True), StreamingBackend("good")
+    router = RouterClient([broken, good], explore=0, stream=True)
+    with StreamLog(str(tmp_path / "stream.jsonl")) as log:
+        assert list(router.summarize_chunks(["abc"], 1, log)) == ["summary from good"]
+    # Failed over before any text arrived; the backend's pieces are passed on as they come
+    texts = [json.loads(line).get("text") for line in (tmp_path / "stream.jsonl").read_text().splitlines()]
+    assert texts == ["summary ", "from good", None]
+
+    class Dropping(StreamingBackend):
+        def complete_stream(self, prompt):
+            self.calls += 1
+            yield "partial"
+            raise Overloaded("connection dropped")
+
+    dropping, spare = Dropping("dropping"), StreamingBackend("spare")
+    router = RouterClient([dropping, spare], explore=0, stream=True)
+    # Text was already passed on, so there is no failover mid-stream
+    with pytest.raises(RouterError) as raised:
+        list(router.complete_stream("prompt"))
+    assert spare.calls == 0 and raised.value.retryable
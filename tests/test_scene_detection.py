@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+
+import numpy as np
+import cv2
+from frameflow.scene_detection import SceneDetector, perceptual_hash, hamming_distance
+import logging
+logging.getLogger().setLevel(logging.CRITICAL)
+
+
+def _slide(lines, shade=255):
+    frame = np.full((360, 640, 3), shade, dtype=np.uint8)
+    cv2.rectangle(frame, (0, 0), (160, 360), (60, 60, 60), -1)
+    for row, text in enumerate(lines):
+        cv2.putText(frame, text, (180, 50 + 45 * row), cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 0, 0), 2)
+    return frame
+
+
+def test_scene_detector_drops_repeated_frames():
+    detector = SceneDetector(scene_threshold=0.2)
+    first = _slide(["$ ls -la", "total 42"])
+    second = _slide(["$ make install", "Building wheel", "Done"], shade=30)
+    kept = [detector.should_keep(f) for f in [first, first.copy(), first, second, second, first]]
+    assert kept == [True, False, False, True, False, False]
+
+
+def test_perceptual_hash_is_stable_under_noise():
+    frame = _slide(["$ git status", "On branch main", "nothing to commit"])
+    frame[:, :, 1] = np.linspace(0, 200, 640, dtype=np.uint8)
+    noisy = cv2.add(frame, np.random.default_rng(0).integers(0, 8, frame.shape, dtype=np.uint8))
+    assert hamming_distance(perceptual_hash(frame), perceptual_hash(noisy)) <= 4
@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+
+import json
+from collections import namedtuple
+
+from frameflow.client import BaseClient
+from frameflow.steps import group_frames, map_chunk, parse_reduced, reduce_steps
+import logging
+logging.getLogger().setLevel(logging.CRITICAL)
+
+Frame = namedtuple("Frame", ["name", "timestamp"])
+
+
+def test_group_frames_splits_on_new_content():
+    items = [
+        (Frame("a", 0), "git clone repo", ""),
+        (Frame("b", 1), "git clone repo done", ""),
+        (Frame("c", 2), "pip install frameflow", "now install it"),
+        (Frame("d", 3), "pip install frameflow", ""),
+    ]
+    steps = list(group_frames(items, similarity_threshold=0.5))
+    assert [[frame.name for frame in step.frames] for step in steps] == [["a", "b"], ["c", "d"]]
+
+
+def test_group_frames_bounds_step_size():
+    items = [(Frame(str(i), i), "same screen", "") for i in range(10)]
+    steps = list(group_frames(items, max_frames=4))
+    assert [len(step.frames) for step in steps] == [4, 4, 2]
+
+
+def test_map_chunk_skips_repeated_screens():
+    step = next(group_frames([(Frame("a", 0), "same", "first"), (Frame("b", 1), "same", "second")], 0.3))
+    chunk = map_chunk(step)
+    assert "Frame 1" in chunk and "Frame 2" not in chunk
+    assert "first second" in chunk
+
+
+def test_parse_reduced_validates_answer():
+    answer = 'Here you go: [{"title": "Install", "text": "Run pip.", "sources": [1, "2", 9]}]'
+    steps = parse_reduced(answer, range(1, 4))
+    assert steps[0].title == "Install"
+    assert steps[0].sources == [1, 2]
+    assert parse_reduced("not json", range(1, 4)) is None
+
+
+class ReduceClient(BaseClient):
+    def __init__(self):
+        self.prompts = []
+
+    def complete(self, prompt):
+        self.prompts.append(prompt)
+        if "Draft 3" in prompt:
+            return "garbled"
+        return json.dumps([{"title": "Merged", "text": "Both drafts.", "sources": [1, 2]}])
+
+
+def test_reduce_steps_merges_windows_and_keeps_unparsed_drafts():
+    steps = reduce_steps(ReduceClient(), ["one", "two", "three"], reduce_size=2, max_workers=1)
+    assert [(step.title, step.text, step.sources) for step in steps] == [
+        ("Merged", "Both drafts.", [0, 1]),
+        ("", "three", [2]),
+    ]
@@ -0,0 +1,36 @@
+#!/usr/bin/env python3
+
+from frameflow.transcript import SpilledTranscript, TranscriptIndex
+import logging
+logging.getLogger().setLevel(logging.CRITICAL)
+
+
+def test_window_returns_only_nearby_segments(sample_chunk):
+    segments = sample_chunk + [
+        {"start": 10.0, "end": 40.0, "text": " Then run make."},
+        {"start": 95.0, "end": 100.0, "text": " Finally push the tag."},
+    ]
+    index = TranscriptIndex(segments)
+    assert index.window(5.0, 10) == "Install build tools using apt-get."
+    assert index.window(50.0, 30) == "Then run make."
+    assert index.window(97.0, 4) == "Finally push the tag."
+    assert index.window(70.0, 10) == ""
+
+
+def test_zero_window_returns_full_transcript(sample_chunk):
+    index = TranscriptIndex(sample_chunk + [{"start": 10.0, "end": 12.0, "text": " Done."}])
+    assert index.window(0.0, 0) == index.text == "Install build tools using apt-get. Done."
+
+
+def test_spilled_transcript_matches_index(sample_chunk, tmp_path):
+    segments = sample_chunk + [
+        {"start": 10.0, "end": 40.0, "text": " Then run make."},
+        {"start": 95.0, "end": 100.0, "text": " Finally push the tag."},
+    ]
+    index = TranscriptIndex(segments)
+    spilled = SpilledTranscript(segments, str(tmp_path))
+    for timestamp, window in ((5.0, 10), (50.0, 30), (97.0, 4), (70.0, 10), (0.0, 0)):
+        assert spilled.window(timestamp, window) == index.window(timestamp, window)
+    assert spilled.starting_between(5.0, 96.0) == index.starting_between(5.0, 96.0) == "Then run make. Finally push the tag."
+    spilled.close()
+    assert list(tmp_path.iterdir()) == []
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+import frameflow.transcription as transcription
+import logging
+logging.getLogger().setLevel(logging.CRITICAL)
+
+
+def test_get_backend_loads_each_model_once(monkeypatch):
+    loads = []
+
+    class FakeBackend:
+        def __init__(self, model_name, device=None, compute_type=None):
+            loads.append((model_name, compute_type))
+
+    monkeypatch.setitem(transcription.BACKENDS, "fake", FakeBackend)
+    monkeypatch.setattr(transcription, "_BACKENDS", {})
+    first = transcription.get_backend("fake", "tiny", compute_type="int8")
+    assert transcription.get_backend("fake", "tiny", compute_type="int8") is first
+    transcription.get_backend("fake", "base", compute_type="int8")
+    assert loads == [("tiny", "int8"), ("base", "int8")]
+
+
+def tone_with_pauses(pattern, sample_rate=transcription.SAMPLE_RATE):
+    # pattern: (seconds, is_speech) pairs rendered as a 220 Hz tone or near-silence
+    import numpy as np
+    parts = []
+    for seconds, speech in pattern:
+        t = np.arange(int(seconds * sample_rate)) / sample_rate
+        amplitude = 0.3 if speech else 0.001
+        parts.append((amplitude * np.sin(2 * np.pi * 220 * t)).astype(np.float32))
+    return np.concatenate(parts)
+
+
+def test_split_on_silence_cuts_in_pauses():
+    audio = tone_with_pauses([(4, True), (1, False), (4, True), (1, False), (4, True), (3, False)])
+    chunks = transcription.split_on_silence(audio, chunk_seconds=4)
+    rate = transcription.SAMPLE_RATE
+    assert len(chunks) == 3
+    # Every cut falls inside a pause, and the trailing silence is dropped
+    assert 4 * rate <= chunks[0][1] <= 5 * rate
+    assert 9 * rate <= chunks[1][1] <= 10 * rate
+    assert chunks[2][1] < 15 * rate
+
+
+def test_split_on_silence_forces_cut_without_pause():
+    audio = tone_with_pauses([(10, True)])
+    chunks = transcription.split_on_silence(audio, chunk_seconds=2)
+    assert len(chunks) >= 3
+    assert chunks[-1][1] == len(audio)
+
+
+class ChunkBackend:
+    # One segment per chunk, spanning it, so offsets can be checked
+    def __init__(self, model_name, device=None, compute_type=None):
+        pass
+
+    def transcribe(self, audio):
+        return [{"start": 0.0, "end": len(audio) / transcription.SAMPLE_RATE, "text": "chunk"}]
+
+
+def test_transcribe_parallel_stitches_timestamps(monkeypatch):
+    monkeypatch.setitem(transcription.BACKENDS, "chunk", ChunkBackend)
+    audio = tone_with_pauses([(4, True), (1, False), (4, True), (1, False), (4, True)])
+    segments = transcription.transcribe_parallel(audio, "chunk", "tiny", workers=2, chunk_seconds=4)
+    assert [segment["text"] for segment in segments] == ["chunk"] * 3
+    starts = [segment["start"] for segment in segments]
+    assert starts[0] == 0.0 and 4 <= starts[1] <= 5 and 9 <= starts[2] <= 10
+    assert all(a["end"] <= b["start"] + 1e-6 for a, b in zip(segments, segments[1:]))
+
+
+def write_wav(path, audio, sample_rate=transcription.SAMPLE_RATE):
+    import wave
+    import numpy as np
+    with wave.open(path, "wb") as f:
+        f.setnchannels(1)
+        f.setsampwidth(2)
+        f.setframerate(sample_rate)
+        f.writeframes((audio * 32767).astype(np.int16).tobytes())
+
+
+def test_iter_audio_streams_windows_cut_in_pauses(tmp_path, monkeypatch):
+    import numpy as np
+    import frameflow.processor as processor
+    rate = transcription.SAMPLE_RATE
+    audio = tone_with_pauses([(3.5, True), (1, False), (3.5, True), (1, False), (3.5, True)])
+    path = str(tmp_path / "talk.wav")
+    write_wav(path, audio)
+
+    windows = list(transcription.iter_audio(path, window_seconds=4))
+    assert len(windows) == 4
+    # Windows are contiguous and together are the whole track
+    offset = 0
+    for start, window in windows:
+        assert start == offset / rate
+        offset += len(window)
+    assert np.allclose(np.concatenate([window for _, window in windows]), audio, atol=1e-3)
+    # Every cut but the last falls inside a pause
+    assert 3.5 <= windows[1][0] <= 4.5 and 8 <= windows[2][0] <= 9
+
+    monkeypatch.setitem(transcription.BACKENDS, "chunk", ChunkBackend)
+    segments = processor.transcribe_segments(path, "tiny", "chunk", window_seconds=4)
+    assert [segment["start"] for segment in segments] == [start for start, _ in windows]
+    assert segments[-1]["end"] == len(audio) / rate
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+
+import time
+
+from frameflow.queue_worker import QueueWorker, submit_jobs
+from frameflow.workqueue import WorkQueue
+import logging
+logging.getLogger().setLevel(logging.CRITICAL)
+
+
+def options(**overrides):
+    base = {"transcribe": False, "client_name": "openai", "client_model": None, "whisper_model": "tiny",
+            "cache_dir": None, "ocr_workers": 1}
+    base.update(overrides)
+    return base
+
+
+def test_workers_split_stages_and_finish_job(synthetic_video, tmp_path, fake_pipeline):
+    fake_pipeline(segments=[{"start": 0.0, "end": 4.0, "text": "Run each step."}])
+    queue = WorkQueue(str(tmp_path / "queue.db"))
+    job_id, = submit_jobs(queue, synthetic_video, str(tmp_path / "work"), options())
+    # One worker only extracts and OCRs, the other transcribes and summarizes
+    frames_worker = QueueWorker(queue, ["extract", "ocr"], poll_seconds=0, name="frames")
+    text_worker = QueueWorker(queue, ["transcribe", "summarize"], poll_seconds=0, name="text")
+    assert text_worker.run(max_tasks=1) == 1
+    assert frames_worker.run(max_tasks=2) == 2
+    assert text_worker.run(exit_when_idle=True) == 1
+
+    status = queue.status()
+    assert status["jobs"] == {"done": 1}
+    assert status["tasks"]["ocr"] == {"done": 1}
+    output = tmp_path / "work"
+    howto, = output.rglob("howto.md")
+    assert howto.read_text().count("Do the step.") == 4
+
+
+def test_expired_lease_is_reclaimed(tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue.db"), lease_seconds=0.1)
+    queue.submit("in.mp4", "out.md", str(tmp_path), options(transcribe=True))
+    task = queue.claim(["transcribe"], "dead")
+    assert queue.claim(["transcribe"], "alive") is None
+    time.sleep(0.2)
+    reclaimed = queue.claim(["transcribe"], "alive")
+    assert reclaimed["id"] == task["id"] and reclaimed["attempts"] == 2
+    # The first worker lost its lease, so its late result is discarded
+    assert not queue.complete(task, "dead", {"segments": []})
+    assert queue.complete(reclaimed, "alive", {"segments": []})
+    assert queue.status()["jobs"] == {"done": 1}
+
+
+def test_failed_task_retries_then_fails_job(tmp_path, monkeypatch):
+    import frameflow.workqueue as workqueue
+    monkeypatch.setattr(workqueue, "RETRY_DELAY_SECONDS", 0)
+    queue = WorkQueue(str(tmp_path / "queue.db"), max_attempts=2)
+    queue.submit("missing.mp4", "out.md", str(tmp_path), options(transcribe=True))
+    for _ in range(2):
+        task = queue.claim(["transcribe"], "worker")
+        queue.fail(task, "worker", "boom")
+    assert queue.claim(["transcribe"], "worker") is None
+    status = queue.status()
+    assert status["jobs"] == {"failed": 1}
+    assert status["failed"][0]["error"] == "transcribe: boom"
+
+
+def test_worker_with_expired_lease_cannot_fail_task(tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue.db"), lease_seconds=0.1, max_attempts=2)
+    queue.submit("in.mp4", "out.md", str(tmp_path), options(transcribe=True))
+    task = queue.claim(["transcribe"], "dead")
+    time.sleep(0.2)
+    reclaimed = queue.claim(["transcribe"], "alive")
+    # The task belongs to "alive" now: a late failure neither retries it nor fails the job
+    queue.fail(task, "dead", "boom")
+    queue.fail(dict(task, attempts=2), "dead", "boom")
+    assert queue.status()["jobs"] == {"running": 1}
+    assert queue.complete(reclaimed, "alive", {"segments": []})
+    assert queue.status()["jobs"] == {"done": 1}
+
+
+def test_task_that_kills_its_worker_fails_after_max_attempts(tmp_path):
+    queue = WorkQueue(str(tmp_path / "queue.db"), lease_seconds=0.05, max_attempts=2)
+    queue.submit("in.mp4", "out.md", str(tmp_path), options())
+    # The worker "dies" on each attempt: it never completes or fails the task
+    for attempt in (1, 2):
+        task = queue.claim(["transcribe"], f"worker{attempt}")
+        assert task["attempts"] == attempt
+        time.sleep(0.1)
+    assert queue.claim(["transcribe"], "worker3") is None
+    status = queue.status()
+    assert status["jobs"] == {"failed": 1}
+    assert status["tasks"]["transcribe"] == {"failed": 1}
+    assert "worker2 stopped responding" in status["failed"][0]["error"]
+    # The job's other stages are not run, and workers waiting for them can exit
+    assert queue.claim(["extract"], "worker3") is None
+    assert queue.idle(["extract", "transcribe"])
+
+
+def test_submitted_default_cache_resolves_on_each_worker(synthetic_video, tmp_path, monkeypatch):
+    import frameflow.queue_worker as queue_worker
+    from frameflow.cli import main
+    monkeypatch.chdir(tmp_path)
+    main(["queue", "submit", synthetic_video, "--db", "queue.db", "--output-dir", "work", "--log-level", "ERROR"])
+    main(["queue", "submit", synthetic_video, "--db", "queue.db", "--output-dir", "other", "--no-cache",
+          "--log-level", "ERROR"])
+    queue = WorkQueue(str(tmp_path / "queue.db"))
+    cached, uncached = (queue.claim(["extract"], "worker")["job"]["options"] for _ in range(2))
+    assert cached["cache_dir"] == "default"
+    monkeypatch.setattr(queue_worker, "DEFAULT_CACHE_DIR", str(tmp_path / "worker-cache"))
+    assert QueueWorker(queue).cache_for(cached).root == str(tmp_path / "worker-cache")
+    assert QueueWorker(queue, cache_dir=str(tmp_path / "shared")).cache_for(cached).root == str(tmp_path / "shared")
+    assert QueueWorker(queue, cache_dir=str(tmp_path / "shared")).cache_for(uncached) is None
+
+
+def test_worker_evicts_cache_between_tasks(tmp_path, monkeypatch):
+    import frameflow.queue_worker as queue_worker
+    events = []
+    monkeypatch.setattr(queue_worker.Cache, "evict", lambda self: events.append("evict"))
+    monkeypatch.setattr(queue_worker.Cache, "file_digest", lambda self, path: path)
+
+    def load_transcript_segments(*args):
+        events.append("task")
+        return []
+
+    monkeypatch.setattr(queue_worker, "load_transcript_segments", load_transcript_segments)
+    queue = WorkQueue(str(tmp_path / "queue.db"))
+    for name in ("a", "b"):
+        queue.submit(f"{name}.mp4", str(tmp_path / f"{name}.md"), str(tmp_path),
+                     options(transcribe=True, cache_dir=str(tmp_path / "cache")))
+    assert QueueWorker(queue, ["transcribe"], poll_seconds=0).run(exit_when_idle=True) == 2
+    # Once when the worker opens the cache, then after each task but never during one
+    assert events == ["evict", "task", "evict", "task", "evict"]